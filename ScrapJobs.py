@@ -1,26 +1,196 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+# pandas, requests, BeautifulSoup, soupsieve, webdriver_manager y el resto de Selenium se
+# importan de forma perezosa en las funciones que los usan: importarlos tarda casi un segundo
+# y una ejecución incremental por HTTP no necesita la mayoría
 import time
 import random
 import os
-from datetime import datetime
+import sys
+import argparse
+import csv
+import hashlib
+import json
+from datetime import datetime, timedelta
 import re
-from urllib.parse import urljoin
+import queue
+import sqlite3
+import threading
+import traceback
+import unicodedata
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse, parse_qs
 
 # --- Selenium Imports ---
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+# Solo las excepciones (ligeras, y necesarias en los except); el resto en create_driver y wait_for_element
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, SessionNotCreatedException, JavascriptException
+
+# lxml es opcional: si está instalado, BeautifulSoup lo usa como parser (mucho más rápido que html.parser)
+try:
+    import lxml # noqa: F401
+    SOUP_PARSER = 'lxml'
+except ImportError:
+    SOUP_PARSER = 'html.parser'
 
 # --- Configuration Constants ---
 OUTPUT_FILE = 'ScrapJobs.xlsx'
+# Índice SQLite con todas las ofertas vistas: fuente de verdad para la deduplicación
+INDEX_FILE = 'ScrapJobs.db'
+# Diario append-only con los trabajos nuevos que todavía no se volcaron a OUTPUT_FILE
+JOURNAL_FILE = 'ScrapJobs_pendientes.csv'
+# El diario se vuelca al Excel al llegar a este número de filas...
+EXCEL_COMPACT_THRESHOLD = 500
+# ...o cuando el Excel lleva estas horas sin actualizarse
+EXCEL_COMPACT_MAX_AGE_HOURS = 24
+# Informe JSON de la última ejecución: tiempos por sitio, iteración y fase (ver RunMetrics)
+METRICS_REPORT_FILE = 'ScrapJobs_metricas.json'
+# Las mismas métricas en formato de texto de Prometheus (para el textfile collector de node_exporter)
+METRICS_PROM_FILE = 'ScrapJobs.prom'
+# Trabajos que los sinks de índice y diario acumulan antes de escribir (ver IndexSink y CsvSink)
+SINK_BATCH_SIZE = 50
+# Destinos de los trabajos nuevos, en el orden en que se escriben (ver build_sinks)
+SINK_NAMES = ('sqlite', 'csv', 'xlsx', 'jsonl')
+DEFAULT_SINKS = ('sqlite', 'csv', 'xlsx')
+# Ruta fija de chromedriver (ej. '/usr/local/bin/chromedriver'); si se define, no se usa webdriver_manager
+CHROMEDRIVER_PATH = None
+# Caché de la ruta de chromedriver resuelta por webdriver_manager, válida durante CHROMEDRIVER_CACHE_TTL_HOURS
+CHROMEDRIVER_CACHE_FILE = 'ScrapJobs_chromedriver.json'
+CHROMEDRIVER_CACHE_TTL_HOURS = 24
+# Punto de control de la ejecución en curso (ver RunCheckpoint y la opción --resume)
+CHECKPOINT_FILE = 'ScrapJobs_checkpoint.jsonl'
 # HISTORY_FILE is no longer needed, it will be managed within OUTPUT_FILE
 
+# Número de navegadores Chrome que se ejecutan en paralelo (1 = modo secuencial)
+MAX_WORKERS = 4
+
+# Perfil de rendimiento del navegador: estrategia de carga ("eager" vuelve de driver.get() en
+# DOMContentLoaded, sin esperar imágenes ni iframes; "normal" espera a la carga completa)
+PAGE_LOAD_STRATEGY = "eager"
+# Tipos de recurso que el navegador no descarga (claves de RESOURCE_TYPE_URL_PATTERNS; () = ninguno).
+# Las extensiones se anclan al final de la ruta o antes de la query ('*.ico', '*.ico?*'): con '*.ico*'
+# se bloquearía también https://careers.iconplc.com/...
+BLOCKED_RESOURCE_TYPES = ('image', 'font', 'media')
+RESOURCE_TYPE_URL_PATTERNS = {
+    'image': [f'*.{extension}{suffix}' for extension in ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico')
+              for suffix in ('', '?*')],
+    'font': [f'*.{extension}{suffix}' for extension in ('woff', 'woff2', 'ttf', 'otf', 'eot') for suffix in ('', '?*')]
+            + ['*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'media': [f'*.{extension}{suffix}' for extension in ('mp4', 'webm', 'mp3', 'm3u8', 'ogg') for suffix in ('', '?*')]
+             + ['*youtube.com/embed*', '*player.vimeo.com*'],
+}
+# Además, analítica y publicidad: no aportan nada a los listados y retrasan la carga
+BLOCKED_URL_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*connect.facebook.net*',
+    '*hotjar.com*', '*clarity.ms*', '*linkedin.com/px*', '*snap.licdn.com*', '*bat.bing.com*',
+]
+
+# Esperas en el navegador: en lugar de pausas fijas se espera a que el listado cambie y se asiente.
+# Cada espera tiene un timeout por sitio aprendido de ejecuciones anteriores (ver JobIndex.load_wait_timeouts):
+# el percentil 95 de las últimas WAIT_HISTORY_SAMPLES esperas por WAIT_TIMEOUT_MARGIN,
+# acotado entre WAIT_TIMEOUT_MIN y WAIT_TIMEOUT_MAX (el valor usado mientras no haya historial)
+WAIT_TIMEOUT_MAX = 60
+WAIT_TIMEOUT_MIN = 5
+WAIT_TIMEOUT_MARGIN = 3
+WAIT_HISTORY_SAMPLES = 50
+WAIT_MIN_SAMPLES = 5
+WAIT_POLL_SECONDS = 0.2
+# El listado se da por asentado tras SETTLE_QUIET_MS sin mutaciones en su contenedor (como mucho SETTLE_MAX_MS)
+SETTLE_QUIET_MS = 300
+SETTLE_MAX_MS = 3000
+
+# Extracción de tarjetas en páginas cargadas en el navegador: "script" (execute_script) o "soup" (page_source + BeautifulSoup)
+EXTRACTION_MODE = "script"
+# Atributo con el que se marcan en el DOM las tarjetas ya extraídas en la paginación acumulativa ("scroll", "Ver más")
+SEEN_CARD_ATTRIBUTE = "data-scrapjobs-seen"
+
+# Modo incremental: páginas seguidas solo con trabajos ya conocidos tras las que se deja de paginar
+# un sitio (se puede ajustar por sitio con "stop_after_known_pages" en su paginación; 0 = sin parada)
+STOP_AFTER_KNOWN_PAGES = 2
+# Cada cuántos días se hace un rastreo completo, sin parada temprana, para recuperar lo que se haya saltado
+FULL_CRAWL_EVERY_DAYS = 7
+
+# Deduplicación en memoria con digests de ancho fijo (blake2b) de cada job_id en lugar de las cadenas completas:
+# 64 o 128 bits por ID en un array ordenado de NumPy (ver JobIdSet); 0 = conjunto de cadenas. Los job_id
+# completos se siguen guardando en el índice y en el Excel. Con 64 bits, la probabilidad de que alguna
+# oferta nueva choque con otra del historial es del orden de 1e-8 con un millón de ofertas
+JOB_ID_DIGEST_BITS = 64
+# Filtro de Bloom opcional delante del array ordenado (bits por ID; 0 = sin filtro) y sus funciones hash
+JOB_ID_BLOOM_BITS_PER_ID = 0
+JOB_ID_BLOOM_HASHES = 4
+
+# Casi duplicados entre fuentes (ver NearDuplicateIndex): la misma oferta publicada en varios sitios de una
+# misma empresa (ej. IQVIA y IQVIA WorkDay) o con el título cambiado solo en espacios o puntuación.
+# "flag" los registra en la tabla near_duplicates del índice, "merge" además no los guarda; None lo desactiva
+NEAR_DUP_ACTION = "flag"
+# Similitud mínima (Jaccard de trigramas del título normalizado) y de las palabras de la ubicación
+NEAR_DUP_THRESHOLD = 0.8
+NEAR_DUP_LOCATION_THRESHOLD = 0.5
+# MinHash con NEAR_DUP_BANDS * NEAR_DUP_ROWS permutaciones, indexado por bandas (LSH): dos títulos pasan a
+# ser candidatos si coinciden en alguna banda, lo que ocurre casi siempre por encima de NEAR_DUP_THRESHOLD
+NEAR_DUP_BANDS = 8
+NEAR_DUP_ROWS = 4
+# Palabras que no distinguen a una empresa al formar su grupo (ver get_company_group); los números también se ignoran
+COMPANY_GROUP_STOPWORDS = {"workday", "plc", "inc", "ltd", "llc", "sa", "srl", "group"}
+
+# Modo daemon (--daemon): cada sitio se revisa con su propio intervalo, calculado para encontrar
+# en promedio DAEMON_TARGET_NEW_JOBS trabajos nuevos por revisión según su ritmo de publicación
+# (media móvil exponencial con peso DAEMON_RATE_SMOOTHING), entre DAEMON_MIN_INTERVAL_MINUTES y
+# DAEMON_MAX_INTERVAL_HOURS. Un sitio sin historial se revisa cada DAEMON_START_INTERVAL_HOURS
+DAEMON_TARGET_NEW_JOBS = 1
+DAEMON_RATE_SMOOTHING = 0.3
+DAEMON_MIN_INTERVAL_MINUTES = 30
+DAEMON_MAX_INTERVAL_HOURS = 24
+DAEMON_START_INTERVAL_HOURS = 4
+# Los navegadores se mantienen abiertos entre revisiones si la siguiente llega antes de estos minutos
+DAEMON_KEEP_WARM_MINUTES = 60
+
+# Factor aplicado a las esperas del HostScheduler entre peticiones (0 las desactiva, ej. en benchmarks offline)
+DELAY_SCALE = 1.0
+
+# Cortesía por host (ver HostScheduler): cada host recibe HOST_RATE peticiones por segundo (token bucket),
+# con ráfagas de hasta HOST_BURST y como mucho HOST_CONCURRENCY peticiones a la vez.
+# El ritmo se adapta: sube HOST_RATE_STEP tras cada respuesta rápida (hasta HOST_MAX_RATE) y se divide
+# por HOST_BACKOFF_FACTOR tras un error o una respuesta más lenta que SLOW_RESPONSE_SECONDS (hasta HOST_MIN_RATE)
+HOST_RATE = 0.25
+HOST_BURST = 2
+HOST_CONCURRENCY = 1
+HOST_MAX_RATE = 1.0
+HOST_MIN_RATE = 0.02
+HOST_RATE_STEP = 0.05
+HOST_BACKOFF_FACTOR = 2
+SLOW_RESPONSE_SECONDS = 10
+# Valores propios de un host (clave de get_host_key), ej. {"myworkdayjobs.com": {"rate": 0.5, "max_rate": 2}}
+HOST_POLITENESS = {}
+
+# Tiempo máximo (segundos) de cada petición en modo "fetch_mode": "http"
+REQUEST_TIMEOUT = 30
+# Conexiones keep-alive que cada sesión HTTP mantiene abiertas por host
+HTTP_POOL_SIZE = 10
+
+# Caché de páginas de listado (ver SiteExtractor.page_key): si una página no cambió desde la última
+# ejecución (misma huella de sus tarjetas, o 304 con ETag/Last-Modified en modo HTTP) no se vuelve a
+# procesar. False la desactiva; "page_cache": False la desactiva para un sitio
+PAGE_CACHE = True
+
+# Enriquecimiento de los trabajos nuevos con su página de detalle (ver DetailEnricher; opción --details)
+ENRICH_DETAILS = False
+# Descargas de páginas de detalle en paralelo; por host se limitan con un HostScheduler propio, para
+# no quitarle turnos al rastreo de los listados
+DETAIL_WORKERS = 8
+DETAIL_HOST_RATE = 0.5
+DETAIL_HOST_MAX_RATE = 2.0
+DETAIL_HOST_CONCURRENCY = 2
+# Columnas que agrega el enriquecimiento -> columna de la tabla job_details del índice
+DETAIL_COLUMNS = {'Fecha de Publicacion': 'fecha_publicacion', 'Modalidad': 'modalidad', 'Descripcion': 'descripcion'}
+# La descripción se recorta a este largo (una celda de Excel admite hasta 32767 caracteres)
+DETAIL_DESCRIPTION_MAX_CHARS = 4000
+# Palabras del puesto o la ubicación que indican la modalidad cuando la página no la declara
+REMOTE_POLICY_KEYWORDS = (
+    ('Híbrido', ('hybrid', 'hibrido')),
+    ('Remoto', ('remote', 'remoto', 'home based', 'home-based', 'work from home', 'teletrabajo')),
+)
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
@@ -64,6 +234,7 @@ SITE_CONFIGS = {
         "pagination": {
             "type": "click",
             "next_page_selector": "button.pagination-view-more[data-view-more-list='search-results-jobs']",
+            "accumulates": True, # "View more" agrega tarjetas a la lista: solo se extraen las nuevas
             "max_pages": 15
         }
     },
@@ -73,6 +244,8 @@ SITE_CONFIGS = {
         "title_selector": "a[data-ph-at-id='job-link'] span", 
         "link_selector": "a[data-ph-at-id='job-link']", 
         "location_selector": None, 
+        "location_strategy": "attribute", # La ubicación viene en un atributo del enlace
+        "location_attribute": "data-ph-at-job-location-text",
         "pagination": {
             "type": "url", # Cambiado a paginación por URL
             "url_pattern": "https://jobs.thermofisher.com/global/en/search-results?m=3&location=Remote%2C%20Argentina&from={offset_val}&s=1", # **CORREGIDO**: Patrón de URL con offset
@@ -88,8 +261,8 @@ SITE_CONFIGS = {
         "link_selector": "a[data-automation-id='jobTitle']",
         "location_selector": "div[data-automation-id='locations'] dd.css-129m7dg",
         "pagination": {
-            "type": "click",
-            "next_page_selector": "button[data-uxi-element-id='next']",
+            "type": "workday_api", # Endpoint JSON de búsqueda del tenant (ver scrape_workday_api)
+            "page_size": 20,
             "max_pages": 15
         }
     },
@@ -108,6 +281,7 @@ SITE_CONFIGS = {
     },
     "https://careers.cognizant.com/global-en/jobs/?page=1&location=Argentina&radius=20&cname=Argentina&ccode=AR&pagesize=10#results": {
         "company_name": "Cognizant",    #FUNCIONA PERFECTO
+        "fetch_mode": "http", # Las tarjetas vienen en el HTML del servidor
         "job_listing_selector": "div.card.card-job",
         "title_selector": "h2.card-title a.js-view-job",
         "link_selector": "h2.card-title a.js-view-job",
@@ -121,6 +295,7 @@ SITE_CONFIGS = {
     },
     "https://www.syneoshealth.com/careers/search/jobs/in/buenos-aires-remote": {
         "company_name": "Syneos Health",     #FUNCIONA PERFECTO
+        "fetch_mode": "http", # Las tarjetas vienen en el HTML del servidor
         "job_listing_selector": "div.jobs-section__item",
         "title_selector": "div.small-12.large-5.columns h2 a",
         "link_selector": "div.small-12.large-5.columns h2 a",
@@ -134,10 +309,12 @@ SITE_CONFIGS = {
     },
     "https://psi-cro.com/careers-breakout/?_sfm_location_country=Argentina": {
         "company_name": "PSI CRO", 
+        "fetch_mode": "http", # Las tarjetas vienen en el HTML del servidor
         "job_listing_selector": "article.ecs-post-loop", 
         "title_selector": "h3.elementor-heading-title a", 
         "link_selector": "h3.elementor-heading-title a", 
         "location_selector": "section.elementor-inner-section p.elementor-heading-title",
+        "location_strategy": "join_all", # La ubicación está repartida en varios párrafos
         "pagination": {
             "type": "url", 
             "url_pattern": "https://psi-cro.com/careers-breakout/?_sfm_location_country=Argentina&sf_paged={page_num}", 
@@ -152,8 +329,8 @@ SITE_CONFIGS = {
         "link_selector": "a[data-automation-id='jobTitle']",
         "location_selector": "div[data-automation-id='locations'] dd.css-129m7dg",
         "pagination": {
-            "type": "click",
-            "next_page_selector": "button[data-uxi-element-id='next']",
+            "type": "workday_api", # Endpoint JSON de búsqueda del tenant (ver scrape_workday_api)
+            "page_size": 20,
             "max_pages": 15
         }
     },
@@ -162,12 +339,16 @@ SITE_CONFIGS = {
         "job_listing_selector": "div.row.job-listing-job-item",
         "title_selector": "span.job-item-title a", 
         "link_selector": "span.job-item-title a", 
-        "location_selector": "div.col-xs-4.location-column span.job-item-normal"
+        "location_selector": "div.col-xs-4.location-column span.job-item-normal",
+        # Los enlaces de Paylocity se resuelven contra la base del tenant, no contra la URL con filtros
+        "link_base_pattern": r'(https?://recruiting\.paylocity\.com/recruiting/jobs/All/[^/]+/[^/]+)/?'
     },
 }
 
 # --- Helper Functions ---
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
 def clean_text(text):
     """
     Limpia el texto reemplazando múltiples espacios con un solo espacio
@@ -178,13 +359,45 @@ def clean_text(text):
     Returns:
         str: La cadena limpia.
     """
-    if pd.isna(text): # Verifica si es un valor NaN de pandas
+    if _is_missing(text): # Verifica si es None o un valor NaN de pandas
         return ''
     text_str = str(text) # Convierte explícitamente a cadena
     if text_str:
-        return re.sub(r'\s+', ' ', text_str).strip()
+        return _WHITESPACE_RE.sub(' ', text_str).strip()
     return ''
 
+def _is_missing(value):
+    """
+    Equivalente a pd.isna para un valor suelto. Las cadenas (el caso habitual al
+    rastrear) se resuelven sin importar pandas.
+    Args:
+        value: El valor a comprobar.
+    Returns:
+        bool: True si es None, NaN o NA.
+    """
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return False
+    import pandas as pd
+    return bool(pd.isna(value))
+
+def clean_text_series(series):
+    """
+    Versión vectorizada de clean_text para una columna completa de pandas.
+    Devuelve, elemento a elemento, exactamente lo mismo que clean_text.
+    Args:
+        series (pd.Series): La columna a limpiar.
+    Returns:
+        pd.Series: La columna limpia (valores nulos convertidos en cadena vacía).
+    """
+    return (
+        series.where(series.notna(), '')
+        .astype(str)
+        .str.replace(_WHITESPACE_RE, ' ', regex=True)
+        .str.strip()
+    )
+
 def get_full_url(base_url, relative_url):
     """
     Combina una URL base con una URL relativa para crear una URL completa.
@@ -214,375 +427,3509 @@ def generate_job_id(company, position, link):
 
     return f"{clean_company}::{clean_position}::{full_link}"
 
-# --- Main Scraping Function ---
+def job_id_digest(job_id, bits=None):
+    """
+    Digest de ancho fijo de un job_id, usado en la deduplicación en memoria (ver JobIdSet).
+    Args:
+        job_id (str): El ID de la oferta (ver generate_job_id).
+        bits (int, optional): Ancho del digest, 64 o 128 (por defecto JOB_ID_DIGEST_BITS).
+    Returns:
+        bytes: El digest blake2b de bits // 8 bytes.
+    """
+    return hashlib.blake2b(job_id.encode('utf-8'), digest_size=(bits or JOB_ID_DIGEST_BITS) // 8).digest()
 
-def scrape_jobs():
-    all_new_jobs = []
-    # Al inicio, carga los IDs de los trabajos existentes desde el archivo Excel
-    existing_job_ids = set()
-    
-    # Definir las columnas principales que el script siempre espera y gestiona
-    primary_columns = ['Empresa', 'Puesto', 'Link de Aplicación', 'Ubicacion', 'Fecha de Registro']
+def generate_job_ids(df):
+    """
+    Versión vectorizada de generate_job_id para un DataFrame completo, usada al
+    cargar o migrar historiales. Produce los mismos IDs, byte a byte, que aplicar
+    generate_job_id fila por fila.
+    Args:
+        df (pd.DataFrame): DataFrame con las columnas 'Empresa', 'Puesto' y 'Link de Aplicación'
+                           (las que falten se tratan como vacías).
+    Returns:
+        pd.Series: Los IDs, con el mismo índice que df.
+    """
+    import pandas as pd
 
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            # Lee el archivo Excel sin especificar 'job_id' para obtener todas las columnas existentes
-            existing_df = pd.read_excel(OUTPUT_FILE)
-            print(f"Cargado el archivo Excel existente con {len(existing_df)} registros.")
+    def cleaned_column(name):
+        if name in df.columns:
+            return clean_text_series(df[name])
+        return pd.Series('', index=df.index, dtype=object)
 
-            # Asegúrate de que las columnas principales estén presentes
-            for col in primary_columns:
-                if col not in existing_df.columns:
-                    existing_df[col] = '' # Añade la columna si falta, con valores vacíos
+    # urljoin('', link) devuelve el enlace sin cambios, por eso no hace falta aplicarlo aquí
+    return cleaned_column('Empresa') + '::' + cleaned_column('Puesto') + '::' + cleaned_column('Link de Aplicación')
 
-            # Genera job_ids para los datos existentes si aún no están presentes
-            if 'job_id' not in existing_df.columns:
-                # Usa solo las columnas necesarias para generar el job_id
-                existing_df['job_id'] = existing_df.apply(
-                    lambda row: generate_job_id(
-                        row.get('Empresa', ''), 
-                        row.get('Puesto', ''), 
-                        row.get('Link de Aplicación', '')
-                    ), axis=1
-                )
-                print(f"Generada la columna 'job_id' para {len(existing_df[existing_df['job_id'].notna()])} registros existentes sin ella.")
-            
-            existing_job_ids = set(existing_df['job_id'].dropna().tolist())
-            print(f"Cargados {len(existing_job_ids)} IDs de trabajos existentes del archivo Excel.")
-            
-        except Exception as e:
-            print(f"Error al cargar o procesar el archivo Excel existente: {e}. Se comenzará con un historial vacío.")
-            # global_existing_df ya no es necesario aquí, se gestiona en save_to_excel
+def make_job_record(company, title, link, location):
+    """
+    Construye el registro de una oferta con las columnas que el script gestiona.
+    Args:
+        company (str): El nombre de la empresa.
+        title (str): El puesto/título de la oferta.
+        link (str): El enlace directo a la oferta de empleo.
+        location (str): La ubicación de la oferta.
+    Returns:
+        dict: El registro listo para agregarse a la lista de trabajos nuevos.
+    """
+    return {
+        'Empresa': company,
+        'Puesto': title,
+        'Link de Aplicación': link,
+        'Ubicacion': location,
+        'Fecha de Registro': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'job_id': generate_job_id(company, title, link)
+    }
 
-    driver = None
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
-        driver = webdriver.Chrome(service=service, options=options)
-        print("Chrome WebDriver iniciado en modo headless.")
-    except Exception as e:
-        print(f"Error al iniciar Chrome WebDriver: {e}. No se puede continuar con el scraping.")
-        return [], existing_job_ids # Devuelve una lista vacía y los IDs cargados para que no se pierdan
+# --- Card Extraction Helpers ---
+
+# Extrae en el navegador, con una sola llamada, solo los campos configurados de cada tarjeta.
+# Devuelve el texto y los atributos en crudo; la limpieza se hace en SiteExtractor.parse_card como en el modo BeautifulSoup.
+# Con seenAttribute, solo devuelve las tarjetas que aún no lo tienen y se lo pone (ver SEEN_CARD_ATTRIBUTE).
+EXTRACT_CARDS_SCRIPT = """
+const [listingSelector, titleSelector, linkSelector, locationSelector, locationAttribute, seenAttribute] = arguments;
+let cards = Array.from(document.querySelectorAll(listingSelector));
+if (seenAttribute) {
+    cards = cards.filter(card => !card.hasAttribute(seenAttribute));
+    cards.forEach(card => card.setAttribute(seenAttribute, ''));
+}
+return cards.map(card => {
+    const titleTag = titleSelector ? card.querySelector(titleSelector) : null;
+    const linkTag = linkSelector ? card.querySelector(linkSelector) : null;
+    const locationTags = locationSelector ? Array.from(card.querySelectorAll(locationSelector)) : [];
+    return {
+        title: titleTag ? titleTag.textContent : null,
+        href: linkTag ? linkTag.getAttribute('href') : null,
+        location: locationTags.length ? locationTags[0].textContent : null,
+        location_parts: locationTags.map(tag => tag.textContent),
+        location_attr: linkTag && locationAttribute ? linkTag.getAttribute(locationAttribute) : null
+    };
+});
+"""
+
+# HTML de las tarjetas que aún no tienen seenAttribute (marcándolas), para el modo BeautifulSoup
+NEW_CARDS_HTML_SCRIPT = """
+const [listingSelector, seenAttribute] = arguments;
+const cards = Array.from(document.querySelectorAll(listingSelector)).filter(card => !card.hasAttribute(seenAttribute));
+cards.forEach(card => card.setAttribute(seenAttribute, ''));
+return cards.map(card => card.outerHTML);
+"""
+
+class SiteExtractor:
+    """
+    Extractor de tarjetas de un sitio, compilado una sola vez a partir de su entrada
+    de SITE_CONFIGS: los selectores se precompilan con soupsieve (al parsear la primera
+    página con BeautifulSoup, ya que en modo "script" no hacen falta), la estrategia de
+    ubicación se resuelve a un método y la base de los enlaces se calcula de antemano.
+    Así el bucle de tarjetas no compara nombres de empresa ni vuelve a evaluar regex.
+    Estrategias de ubicación ("location_strategy"):
+        "select_one": texto del primer elemento de location_selector (por defecto si hay selector).
+        "join_all": textos de todos los elementos de location_selector, concatenados.
+        "attribute": atributo "location_attribute" del enlace de la oferta.
+    Paginación acumulativa: en "scroll" y en "click" con "accumulates": true (botones
+    "Ver más") cada iteración agrega tarjetas a las anteriores; en esos sitios solo se
+    extraen las tarjetas nuevas (ver extract_cards_from_driver).
+    Perfil del navegador ("browser_profile", opcional): {"allow": [...], "block": [...]}.
+        Cada elemento de "allow" es un tipo de BLOCKED_RESOURCE_TYPES o un patrón de
+        BLOCKED_URL_PATTERNS que el sitio necesita para mostrar los listados (ej. un script
+        de googletagmanager); "block" agrega patrones de URL propios del sitio.
+    Args:
+        base_url (str): La URL base del sitio (clave de SITE_CONFIGS).
+        config (dict): La configuración del sitio.
+    """
+    def __init__(self, base_url, config):
+        self.base_url = base_url
+        self.config = config
+        self.company_name = config["company_name"]
+        self.listing_selector = config["job_listing_selector"]
+        self.title_selector = config["title_selector"]
+        self.link_selector = config["link_selector"]
+        self.location_selector = config.get("location_selector")
+        self.location_attribute = config.get("location_attribute")
+        self.location_strategy = config.get("location_strategy") or ("select_one" if self.location_selector else None)
+        self.iframe_selector = config.get("iframe_selector")
+        self.extraction_mode = config.get("extraction", EXTRACTION_MODE)
+        self.blocked_urls = get_blocked_url_patterns(config.get("browser_profile") or {})
+        for own_url in get_site_urls(base_url, config):
+            blocking = [pattern for pattern in self.blocked_urls if url_matches_pattern(own_url, pattern)]
+            if blocking:
+                raise ValueError(f"El perfil del navegador de {self.company_name} bloquearía sus propias páginas ({own_url}) "
+                                 f"con {blocking}. Agregue el tipo de recurso o el patrón a 'allow' en su 'browser_profile'.")
+        self.wait_timeouts = {} # Tipo de espera -> timeout aprendido (ver JobIndex.load_wait_timeouts)
+        pagination = config.get("pagination") or {}
+        self.pagination_type = pagination.get("type")
+        self.accumulates = self.pagination_type == "scroll" or bool(pagination.get("accumulates"))
+        self.page_cache = {} # Clave de página -> entrada de la ejecución anterior (ver JobIndex.load_page_cache)
+        self.page_cache_updates = {} # Entradas nuevas o cambiadas en esta ejecución
+        # Las huellas incluyen la configuración: si cambian los selectores, las páginas se vuelven a procesar
+        self.config_digest = hashlib.blake2b(json.dumps(config, sort_keys=True, default=str).encode('utf-8'), digest_size=8).hexdigest()
+
+        self._listing_matcher = None # Se compilan en _compile_matchers
 
-    for base_url, config in SITE_CONFIGS.items():
-        print(f"\nScraping: Empresa: {config['company_name']}")
+        location_parsers = {
+            "select_one": self._location_from_first,
+            "join_all": self._location_from_all,
+            "attribute": self._location_from_attribute,
+            None: self._location_not_configured,
+        }
+        if self.location_strategy not in location_parsers:
+            raise ValueError(f"'location_strategy' desconocida para {self.company_name}: {self.location_strategy!r}")
+        if self.location_strategy in ("select_one", "join_all") and not self.location_selector:
+            raise ValueError(f"'location_strategy': '{self.location_strategy}' requiere 'location_selector' en {self.company_name}.")
+        if self.location_strategy == "attribute" and not self.location_attribute:
+            raise ValueError(f"'location_strategy': 'attribute' requiere 'location_attribute' en {self.company_name}.")
+        self._parse_location = location_parsers[self.location_strategy]
 
-        pagination_config = config.get("pagination")
+        # Algunos sitios (ej. Paylocity) forman enlaces absolutos correctos solo desde una parte de la URL base
+        self.link_base = base_url
+        link_base_pattern = config.get("link_base_pattern")
+        if link_base_pattern:
+            link_base_match = re.match(link_base_pattern, base_url)
+            if link_base_match: # Si no coincide, se usa la base original
+                self.link_base = link_base_match.group(1)
 
-        current_iteration = 1
-        max_iterations = 1
-        consecutive_empty_pages = 0
+    def wait_timeout(self, kind, default=WAIT_TIMEOUT_MAX):
+        """
+        Args:
+            kind (str): Tipo de espera ('listing', 'iframe', 'next_button', 'next_page' o 'scroll').
+            default (float): Timeout si todavía no hay historial suficiente; el aprendido nunca lo supera.
+        Returns:
+            float: Segundos máximos de espera para este sitio.
+        """
+        return min(self.wait_timeouts.get(kind, default), default)
 
-        if pagination_config:
-            if pagination_config["type"] == "url":
-                current_iteration = pagination_config.get("start_page", 1)
-                max_iterations = pagination_config.get("max_pages", 1)
-            elif pagination_config["type"] == "click":
-                max_iterations = pagination_config.get("max_pages", 1)
-            elif pagination_config["type"] == "scroll":
-                max_iterations = pagination_config.get("max_scrolls", 1)
+    def page_key(self, url, iteration):
+        """
+        Clave de una página en la caché de páginas: la URL, o la URL base y la iteración
+        en la paginación por clic (la URL no cambia). Las páginas acumulativas (scroll,
+        "Ver más") no se guardan: ya se extraen solo las tarjetas nuevas.
+        Args:
+            url (str): La URL de la página.
+            iteration (int): La iteración de la paginación.
+        Returns:
+            str or None: La clave, o None si la página no usa la caché.
+        """
+        if not PAGE_CACHE or self.config.get("page_cache") is False or self.accumulates:
+            return None
+        if self.pagination_type == "click":
+            return f"{self.base_url}#{iteration}"
+        return url
 
-                print(f"  Navegando a la URL base para paginación por scroll: {base_url}")
-                driver.get(base_url)
-                time.sleep(random.uniform(3, 6))
+    def fingerprint(self, content):
+        """
+        Args:
+            content (str): Los campos de las tarjetas, serializados (HTTP), o la huella de
+                su HTML calculada en el navegador (LISTING_FINGERPRINT_SCRIPT).
+        Returns:
+            str: Huella de la página para la caché, ligada a la configuración del sitio.
+        """
+        return f"{self.config_digest}:{hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()}"
 
+    def cached_job_ids(self, page_key, fingerprint, registry):
+        """
+        Consulta la caché de páginas. Hay acierto si la página tiene la misma huella que en
+        la ejecución anterior y todos sus trabajos siguen en el registro; en ese caso se
+        marcan como vistos, igual que si se hubieran vuelto a leer.
+        Args:
+            page_key (str): Clave de la página (ver page_key).
+            fingerprint (str): Huella actual de la página, o None para aceptar la guardada (respuesta 304).
+            registry (JobIdRegistry): Registro de IDs de la ejecución.
+        Returns:
+            list or None: Los job_id de la página, o None si hay que procesarla.
+        """
+        entry = self.page_cache.get(page_key) if page_key else None
+        if entry is None or (fingerprint is not None and entry['fingerprint'] != fingerprint):
+            return None
+        if not registry.mark_seen_if_known(entry['job_ids']):
+            return None
+        return entry['job_ids']
 
-        while current_iteration <= max_iterations:
-            url_to_scrape = base_url
+    def remember_page(self, page_key, fingerprint, job_ids, validators=None):
+        """Guarda la huella y los job_id de una página procesada, para la próxima ejecución."""
+        self.page_cache_updates[page_key] = {'fingerprint': fingerprint, 'job_ids': job_ids, 'validators': validators or {}}
 
-            if pagination_config and pagination_config["type"] == "url":
-                if "offset_step" in pagination_config:
-                    offset = (current_iteration - 1) * pagination_config["offset_step"]
-                    url_to_scrape = pagination_config["url_pattern"].format(offset_val=offset)
-                    print(f"  Navegando a la página {current_iteration} (offset {offset}) de {config['company_name']}")
-                else:
-                    url_to_scrape = pagination_config["url_pattern"].format(page_num=current_iteration)
-                    print(f"  Navegando a la página {current_iteration} de {config['company_name']}")
-                
-                driver.get(url_to_scrape)
-                time.sleep(random.uniform(2, 4))
+    def script_args(self, only_new=False):
+        """
+        Args:
+            only_new (bool): Si es True, el script solo devuelve (y marca) las tarjetas aún no extraídas.
+        Returns:
+            tuple: Argumentos de EXTRACT_CARDS_SCRIPT para este sitio.
+        """
+        return (self.listing_selector, self.title_selector, self.link_selector, self.location_selector, self.location_attribute,
+                SEEN_CARD_ATTRIBUTE if only_new else None)
 
-            elif pagination_config and pagination_config["type"] == "click" and current_iteration > 1:
-                print(f"  Procesando página {current_iteration} de {config['company_name']} (después de hacer clic en 'Siguiente').")
+    def card_from_soup(self, job_element):
+        """
+        Convierte una tarjeta de BeautifulSoup en el mismo diccionario que devuelve EXTRACT_CARDS_SCRIPT.
+        Args:
+            job_element (bs4.Tag): La tarjeta de empleo.
+        Returns:
+            dict: Campos en crudo de la tarjeta ('title', 'href', 'location', 'location_parts', 'location_attr').
+        """
+        title_tag = self._title_matcher.select_one(job_element)
+        link_tag = self._link_matcher.select_one(job_element)
+        location_tags = self._location_matcher.select(job_element) if self._location_matcher else []
+        return {
+            'title': title_tag.get_text() if title_tag else None,
+            'href': link_tag.get('href') if link_tag else None,
+            'location': location_tags[0].get_text() if location_tags else None,
+            'location_parts': [tag.get_text() for tag in location_tags],
+            'location_attr': link_tag.get(self.location_attribute) if link_tag and self.location_attribute else None
+        }
 
-            elif pagination_config and pagination_config["type"] == "scroll" and current_iteration > 1:
-                print(f"  Realizando scroll #{current_iteration-1} para {config['company_name']}")
+    def cards_from_html(self, html):
+        """
+        Parsea el HTML de una página con BeautifulSoup y devuelve sus tarjetas de empleo.
+        Args:
+            html (str): El HTML de la página.
+        Returns:
+            list: Diccionarios de campos en crudo, uno por tarjeta (ver card_from_soup).
+        """
+        from bs4 import BeautifulSoup
+        if self._listing_matcher is None:
+            self._compile_matchers()
+        soup = BeautifulSoup(html, SOUP_PARSER)
+        return [self.card_from_soup(job_element) for job_element in self._listing_matcher.select(soup)]
 
-                old_scroll_height = driver.execute_script("return document.body.scrollHeight;")
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(pagination_config.get("scroll_delay", 3))
+    def cards_from_fragments(self, fragments):
+        """
+        Parsea solo el HTML de las tarjetas indicadas (ver NEW_CARDS_HTML_SCRIPT), en
+        lugar de la página completa.
+        Args:
+            fragments (list): outerHTML de cada tarjeta.
+        Returns:
+            list: Diccionarios de campos en crudo, uno por tarjeta (ver card_from_soup).
+        """
+        from bs4 import BeautifulSoup
+        if self._listing_matcher is None:
+            self._compile_matchers()
+        if not fragments:
+            return []
+        # Las tarjetas se envuelven en un contenedor propio para recuperarlas como sus hijos directos
+        soup = BeautifulSoup(f"<div id='scrapjobs-cards'>{''.join(fragments)}</div>", SOUP_PARSER)
+        container = soup.find(id='scrapjobs-cards')
+        return [self.card_from_soup(job_element) for job_element in container.find_all(True, recursive=False)]
 
-                new_scroll_height = driver.execute_script("return document.body.scrollHeight;")
-                if new_scroll_height <= old_scroll_height:
-                    print("  No se cargó contenido nuevo después del scroll. Asumiendo fin de resultados o página.")
-                    break
+    def _compile_matchers(self):
+        import soupsieve
+        self._title_matcher = soupsieve.compile(self.title_selector)
+        self._link_matcher = soupsieve.compile(self.link_selector)
+        self._location_matcher = soupsieve.compile(self.location_selector) if self.location_selector else None
+        self._listing_matcher = soupsieve.compile(self.listing_selector)
+
+    def parse_card(self, card):
+        """
+        Obtiene el título, el enlace y la ubicación limpios de una tarjeta de empleo.
+        Args:
+            card (dict): Campos en crudo de la tarjeta (ver card_from_soup).
+        Returns:
+            tuple: (título, enlace, ubicación).
+        """
+        title = clean_text(card['title']) if card['title'] is not None else 'Title Not Found'
+        link = get_full_url(self.link_base, card['href']) if card['href'] is not None else 'Link Not Found'
+        return title, link, self._parse_location(card)
+
+    def _location_from_first(self, card):
+        return clean_text(card['location']) if card['location'] is not None else 'Location Not Found'
+
+    def _location_from_all(self, card):
+        return clean_text("".join(card['location_parts'])) if card['location_parts'] else 'Location Not Found'
+
+    def _location_from_attribute(self, card):
+        return clean_text(card['location_attr']) if card['location_attr'] is not None else 'Location Not Found'
+
+    def _location_not_configured(self, card):
+        return 'Location Not Found'
+
+def get_blocked_url_patterns(browser_profile):
+    """
+    Calcula los patrones de URL que el navegador bloquea en un sitio.
+    Args:
+        browser_profile (dict): El "browser_profile" del sitio (puede estar vacío).
+    Returns:
+        tuple: Patrones para Network.setBlockedURLs ('*' como comodín).
+    """
+    allowed = set(browser_profile.get("allow", []))
+    patterns = []
+    for resource_type in BLOCKED_RESOURCE_TYPES:
+        if resource_type not in allowed:
+            patterns.extend(RESOURCE_TYPE_URL_PATTERNS[resource_type])
+    patterns.extend(pattern for pattern in BLOCKED_URL_PATTERNS if pattern not in allowed)
+    patterns.extend(browser_profile.get("block", []))
+    return tuple(pattern for pattern in dict.fromkeys(patterns) if pattern not in allowed)
+
+def url_matches_pattern(url, pattern):
+    """
+    Args:
+        url (str): La URL.
+        pattern (str): Patrón de Network.setBlockedURLs: '*' es el único comodín ('?' es literal).
+    Returns:
+        bool: True si el navegador bloquearía la URL con ese patrón.
+    """
+    return re.fullmatch('.*'.join(re.escape(part) for part in pattern.split('*')), url) is not None
+
+def get_site_urls(base_url, config):
+    """
+    Args:
+        base_url (str): La URL base del sitio (clave de SITE_CONFIGS).
+        config (dict): La configuración del sitio.
+    Returns:
+        list: Las URLs que el sitio carga como páginas: la base y, si hay, el patrón de paginación.
+    """
+    urls = [base_url]
+    url_pattern = (config.get("pagination") or {}).get("url_pattern")
+    if url_pattern:
+        urls.append(url_pattern.format(page_num=1, offset_val=0))
+    return urls
+
+def compile_site_extractors(site_configs):
+    """
+    Compila un SiteExtractor por cada entrada de SITE_CONFIGS, al inicio de la ejecución,
+    de modo que un error de configuración se detecta antes de abrir ningún navegador.
+    Args:
+        site_configs (dict): Diccionario base_url -> config.
+    Returns:
+        list: Los extractores, en el orden de SITE_CONFIGS.
+    """
+    return [SiteExtractor(base_url, config) for base_url, config in site_configs.items()]
+
+def extract_cards_from_driver(driver, extractor, only_new=False):
+    """
+    Obtiene las tarjetas de empleo de la página cargada en el navegador.
+    En modo "script" (por defecto, ver EXTRACTION_MODE) los campos se extraen con un único
+    execute_script, sin serializar page_source. Si falla, o si el sitio define
+    "extraction": "soup", se parsea page_source con BeautifulSoup.
+    Con only_new=True (paginación acumulativa) cada tarjeta extraída se marca con
+    SEEN_CARD_ATTRIBUTE y las siguientes llamadas solo devuelven las que se agregaron
+    después, de modo que el costo por página no crece con las páginas ya vistas. Si el
+    navegador falla se vuelve a leer la página completa; las tarjetas repetidas se
+    descartan luego en el JobIdRegistry.
+    Args:
+        driver (webdriver.Chrome): El navegador con la página ya cargada.
+        extractor (SiteExtractor): El extractor del sitio.
+        only_new (bool): Si es True, solo devuelve las tarjetas no extraídas antes en esta página.
+    Returns:
+        list: Diccionarios de campos en crudo, uno por tarjeta (ver SiteExtractor.card_from_soup).
+    """
+    if extractor.extraction_mode == "script":
+        try:
+            return driver.execute_script(EXTRACT_CARDS_SCRIPT, *extractor.script_args(only_new))
+        except WebDriverException as e:
+            print(f"  Error al extraer las tarjetas en el navegador para {extractor.company_name}: {e}. Se usará BeautifulSoup.")
+    elif only_new:
+        try:
+            return extractor.cards_from_fragments(driver.execute_script(NEW_CARDS_HTML_SCRIPT, extractor.listing_selector, SEEN_CARD_ATTRIBUTE))
+        except WebDriverException as e:
+            print(f"  Error al leer las tarjetas nuevas en el navegador para {extractor.company_name}: {e}. Se parseará la página completa.")
+    return extractor.cards_from_html(driver.page_source)
 
-            elif not pagination_config or (pagination_config["type"] != "url" and current_iteration == 1):
-                print(f"  Navegando a la página 1 de {config['company_name']} (URL: {base_url})")
-                driver.get(base_url)
-                time.sleep(random.uniform(2, 4))
+# --- Politeness Scheduler ---
 
+class _HostBucket:
+    """Estado del token bucket de un host (ver HostScheduler)."""
+    def __init__(self, host, settings):
+        self.host = host
+        self.rate = settings.get("rate", HOST_RATE)
+        self.max_rate = settings.get("max_rate", HOST_MAX_RATE)
+        self.min_rate = settings.get("min_rate", HOST_MIN_RATE)
+        self.burst = settings.get("burst", HOST_BURST)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.slots = threading.BoundedSemaphore(settings.get("concurrency", HOST_CONCURRENCY))
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.backoffs = 0
+
+    def take_token(self):
+        """
+        Returns:
+            float: 0 si se tomó un token, o los segundos que faltan para el siguiente.
+        """
+        with self.lock:
+            now = time.monotonic()
+            rate = self.rate / DELAY_SCALE
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.requests += 1
+                return 0.0
+            # Un poco de azar para no pedir a intervalos exactos
+            return (1 - self.tokens) / rate * random.uniform(1, 1.2)
+
+class HostScheduler:
+    """
+    Planificador central de cortesía: limita el ritmo (token bucket) y la concurrencia
+    de las peticiones a cada host (clave de get_host_key) y adapta el ritmo a cómo
+    responde el host, sustituyendo las pausas aleatorias fijas entre páginas.
+    La espera por un host solo bloquea al worker que le pide, de modo que los workers
+    de otros hosts siguen avanzando. Lo comparten todos los workers (es thread-safe).
+    Args:
+        host_settings (dict, optional): Valores por host (por defecto HOST_POLITENESS).
+        defaults (dict, optional): Valores para los hosts sin entrada propia (por defecto los HOST_*).
+    """
+    def __init__(self, host_settings=None, defaults=None):
+        self.host_settings = HOST_POLITENESS if host_settings is None else host_settings
+        self.defaults = defaults or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = get_host_key(url)
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = _HostBucket(host, {**self.defaults, **self.host_settings.get(host, {})})
+            return self._buckets[host]
+
+    @contextmanager
+    def request(self, url):
+        """
+        Espera turno para hacer una petición a la URL y mide la respuesta dentro del
+        bloque 'with'. Si el bloque lanza una excepción o tarda más de
+        SLOW_RESPONSE_SECONDS se reduce el ritmo del host; si no, se aumenta.
+        Yields:
+            float: Segundos esperados antes de la petición (para RunMetrics).
+        """
+        bucket = self._bucket(url)
+        waited = 0.0
+        if DELAY_SCALE <= 0:
+            yield waited
+            return
+        started = time.perf_counter()
+        bucket.slots.acquire()
+        try:
+            delay = bucket.take_token()
+            while delay:
+                time.sleep(delay)
+                delay = bucket.take_token()
+            waited = time.perf_counter() - started
+            started = time.perf_counter()
             try:
-                # Lógica específica para ICON plc (si usa iframe)
-                # NOTA: Asegúrate de que "ICON plc" en SITE_CONFIGS es el nombre exacto de la empresa para la que aplica el iframe
-                if config["company_name"] == "ICON plc (Original)":
-                    print(f"  Detectada {config['company_name']}, intentando cambiar a iframe...")
-                    iframe_selector = "#icims_content_iframe"
-                    try:
-                        iframe_element = WebDriverWait(driver, 60).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, iframe_selector))
-                        )
-                        driver.switch_to.frame(iframe_element)
-                        print(f"  Cambiado a contexto de iframe para {config['company_name']}.")
-                    except (TimeoutException, NoSuchElementException) as e:
-                        print(f"  Error al encontrar o cambiar a iframe '{iframe_selector}' para {config['company_name']}: {e}. Saltando sitio.")
-                        driver.switch_to.default_content()
-                        break
-                    except Exception as e:
-                        print(f"  Ocurrió un error inesperado con el iframe para {config['company_name']}: {e}. Saltando sitio.")
-                        driver.switch_to.default_content()
-                        break
+                yield waited
+            except BaseException:
+                self.backoff(url, "error")
+                raise
+            if time.perf_counter() - started > SLOW_RESPONSE_SECONDS:
+                self.backoff(url, "respuesta lenta")
+            else:
+                with bucket.lock:
+                    bucket.rate = min(bucket.max_rate, bucket.rate + HOST_RATE_STEP)
+        finally:
+            bucket.slots.release()
 
-                WebDriverWait(driver, 60).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, config["job_listing_selector"]))
-                )
+    def backoff(self, url, reason):
+        """
+        Reduce el ritmo del host de la URL (también para errores que no lanzan excepción,
+        ej. una descarga HTTP fallida).
+        Args:
+            url (str): URL de la petición.
+            reason (str): Motivo, para el mensaje.
+        """
+        bucket = self._bucket(url)
+        with bucket.lock:
+            bucket.rate = max(bucket.min_rate, bucket.rate / HOST_BACKOFF_FACTOR)
+            bucket.backoffs += 1
+            rate = bucket.rate
+        print(f"  Host {bucket.host}: {reason}. Ritmo reducido a {rate:.2f} peticiones/s.")
 
-                response_html = driver.page_source
-                soup = BeautifulSoup(response_html, 'html.parser')
+    def snapshot(self):
+        """
+        Returns:
+            dict: Por host, peticiones hechas, reducciones de ritmo y ritmo final (para el informe de métricas).
+        """
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {bucket.host: {'requests': bucket.requests, 'backoffs': bucket.backoffs, 'rate': round(bucket.rate, 3)}
+                for bucket in buckets}
 
-                job_listings = soup.select(config["job_listing_selector"])
+# --- HTTP Fetch Helpers ---
 
-                if not job_listings:
-                    print(f"  Advertencia: No se encontraron elementos con el selector '{config['job_listing_selector']}' en {url_to_scrape} (Iteración {current_iteration}).")
-                    consecutive_empty_pages += 1
-                    if consecutive_empty_pages >= 2: # Si dos páginas consecutivas están vacías, salimos
-                        print(f"  Dos páginas consecutivas sin resultados para {config['company_name']}. Deteniendo la paginación.")
-                        break
-                    # Si solo una página está vacía, intentamos la siguiente por si es un error temporal o si hay paginación no lineal
-                    current_iteration += 1 # Incrementar incluso si no hay job_listings para intentar la siguiente página/clic
-                    time.sleep(random.uniform(2, 4)) # Pequeño delay antes de la siguiente iteración
-                    continue # Salta al siguiente bucle while
-
-                found_count_page = 0
-                for job_element in job_listings:
-                    title_tag = job_element.select_one(config["title_selector"])
-                    link_tag = job_element.select_one(config["link_selector"])
-                    
-                    # Manejo de la ubicación (manteniendo la lógica existente para None y casos específicos)
-                    location = 'Location Not Found'
-                    if config["company_name"] == "Thermo Fisher Scientific" and link_tag and 'data-ph-at-job-location-text' in link_tag.attrs:
-                        location = clean_text(link_tag['data-ph-at-job-location-text'])
-                    elif config["company_name"] in ["IQVIA WorkDay", "Fortrea WorkDay", "SerenaGroup", "Medpace", "Cognizant", "Syneos Health"] and config.get("location_selector"):
-                        location_tag = job_element.select_one(config["location_selector"])
-                        location = clean_text(location_tag.get_text()) if location_tag else 'Location Not Found'
-                    elif config["company_name"] == "PSI CRO" and config.get("location_selector"):
-                        location_parts = job_element.select(config["location_selector"])
-                        if location_parts:
-                            location = clean_text("".join([p.get_text() for p in location_parts]))
-                        else:
-                            location = 'Location Not Found'
-                    elif config.get("location_selector"): # Para otros sitios que tienen un selector de ubicación directo
-                        location_tag = job_element.select_one(config["location_selector"])
-                        location = clean_text(location_tag.get_text()) if location_tag else 'Location Not Found'
-                    else: # Caso por defecto si no hay selector de ubicación o es None
-                        location = 'Location Not Found'
-                        
-                    title = clean_text(title_tag.get_text()) if title_tag else 'Title Not Found'
-                    
-                    # Manejo especial para el enlace de SerenaGroup (Paylocity)
-                    if config["company_name"] == "SerenaGroup" and link_tag and 'href' in link_tag.attrs:
-                        # Extraer la parte base de la URL para Paylocity para formar enlaces absolutos correctos
-                        paylocity_base_url_match = re.match(r'(https?://recruiting\.paylocity\.com/recruiting/jobs/All/[^/]+/[^/]+)/?', base_url)
-                        if paylocity_base_url_match:
-                            paylocity_base = paylocity_base_url_match.group(1)
-                            link = get_full_url(paylocity_base, link_tag['href'])
-                        else: # Si no coincide, intentar con la base original
-                            link = get_full_url(base_url, link_tag['href'])
-                    else:
-                        link = get_full_url(base_url, link_tag['href']) if link_tag and 'href' in link_tag.attrs else 'Link Not Found'
-
-                    job_id = generate_job_id(config["company_name"], title, link)
-
-                    if job_id not in existing_job_ids:
-                        all_new_jobs.append({
-                            'Empresa': config["company_name"],
-                            'Puesto': title,
-                            'Link de Aplicación': link,
-                            'Ubicacion': location,
-                            'Fecha de Registro': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            'job_id': job_id
-                        })
-                        found_count_page += 1
-                        existing_job_ids.add(job_id)
-
-                print(f"  Se encontraron {found_count_page} TRABAJOS NUEVOS en la iteración {current_iteration}.")
-
-                # Resetear el contador de páginas vacías si se encontraron trabajos
-                if found_count_page > 0:
-                    consecutive_empty_pages = 0
-
-                if pagination_config and pagination_config["type"] == "click":
-                    next_button = None
-                    try:
-                        next_button = WebDriverWait(driver, 60).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, pagination_config["next_page_selector"]))
-                        )
-                        driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                        driver.execute_script("arguments[0].click();", next_button) # Clic con JavaScript
-                        time.sleep(random.uniform(3, 7))
-                        current_iteration += 1
-                    except (TimeoutException, NoSuchElementException) as e:
-                        print(f"  No se pudo encontrar o hacer clic en el botón 'Siguiente' en la iteración {current_iteration}: {e}. Asumiendo que no hay más páginas.")
-                        break
-                    except Exception as e:
-                        print(f"  Ocurrió un error inesperado al hacer clic en 'Siguiente' en la iteración {current_iteration}: {e}. Deteniendo el scraping para este sitio.")
-                        break
+_http_local = threading.local()
 
-                elif pagination_config and pagination_config["type"] == "url":
-                    current_iteration += 1
+def get_http_session():
+    """
+    Devuelve la requests.Session del worker actual, creándola la primera vez.
+    Cada worker reutiliza su sesión, y con ella sus conexiones keep-alive, en todas las páginas.
+    Dentro del pool la sesión se guarda en el BrowserHandle del worker (ver _pool_worker), de
+    modo que en el modo daemon se conserva entre revisiones igual que el navegador; fuera del
+    pool es la del hilo.
+    Returns:
+        requests.Session: La sesión HTTP del worker.
+    """
+    holder = getattr(_http_local, 'browser', None) or _http_local
+    session = getattr(holder, 'http_session', None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        # requests solo decodifica 'br' si brotli está instalado; se piden codificaciones que siempre soporta
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        holder.http_session = session
+    return session
 
-                elif pagination_config and pagination_config["type"] == "scroll":
-                    current_iteration += 1
+# Resultado de fetch_page_http cuando el servidor responde 304 (la página no cambió)
+_PAGE_NOT_MODIFIED = object()
 
-                else:
-                    break
+def fetch_page_http(url, validators=None):
+    """
+    Descarga una página con HTTP plano. Con los validadores de la descarga anterior la
+    petición es condicional (If-None-Match / If-Modified-Since).
+    Args:
+        url (str): La URL de la página.
+        validators (dict, optional): 'etag' y 'last_modified' de la descarga anterior.
+    Returns:
+        tuple: (HTML crudo, None si la descarga falla o _PAGE_NOT_MODIFIED si el servidor
+               respondió 304; validadores de esta respuesta).
+    """
+    import requests
+    validators = validators or {}
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    try:
+        response = get_http_session().get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+        if response.status_code == 304:
+            return _PAGE_NOT_MODIFIED, validators
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"  Error HTTP al descargar {url}: {e}.")
+        return None, {}
+    new_validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    return response.text, {key: value for key, value in new_validators.items() if value}
 
-            except TimeoutException as e:
-                print(f"  Tiempo de espera agotado para el elemento en {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
-                break
-            except WebDriverException as e:
-                print(f"  Error de WebDriver en {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
-                break
-            except Exception as e:
-                print(f"  Ocurrió un error inesperado al procesar {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
-                break
+def fetch_html_http(url):
+    """
+    Descarga una página con HTTP plano.
+    Args:
+        url (str): La URL de la página.
+    Returns:
+        str or None: El HTML crudo, o None si la descarga falla.
+    """
+    return fetch_page_http(url)[0]
 
-            finally:
-                if config["company_name"] == "ICON plc (Original)": # Asegúrate de usar el nombre exacto
-                    try:
-                        driver.switch_to.default_content()
-                        print(f"  Volviendo al contenido principal para {config['company_name']}.")
-                    except Exception as e:
-                        print(f"  Error al intentar volver al contenido predeterminado: {e}")
+# --- Job Detail Helpers ---
 
-            time.sleep(random.uniform(2, 6))
+def find_job_posting_ld(soup):
+    """
+    Busca los datos estructurados schema.org/JobPosting (JSON-LD) de una página de detalle,
+    que la mayoría de los portales de empleo publican para los buscadores.
+    Args:
+        soup (BeautifulSoup): La página de detalle.
+    Returns:
+        dict or None: El objeto JobPosting, o None si la página no lo tiene.
+    """
+    for script in soup.select('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            candidates = (data['@graph'] or []) if '@graph' in data else [data]
+        else:
+            candidates = data if isinstance(data, list) else []
+        if not isinstance(candidates, list):
+            candidates = [candidates]
+        for candidate in candidates:
+            if isinstance(candidate, dict) and 'JobPosting' in str(candidate.get('@type')):
+                return candidate
+    return None
 
-    if driver:
-        driver.quit()
-        print("Chrome WebDriver cerrado.")
+def get_remote_policy(*texts):
+    """
+    Args:
+        *texts (str): Textos de la oferta en los que buscar (puesto, ubicación).
+    Returns:
+        str: La modalidad según REMOTE_POLICY_KEYWORDS, o '' si ninguno la menciona.
+    """
+    text = ' '.join(normalize_for_matching(text) for text in texts)
+    for policy, keywords in REMOTE_POLICY_KEYWORDS:
+        if any(keyword.replace('-', ' ') in text for keyword in keywords):
+            return policy
+    return ''
 
-    return all_new_jobs, existing_job_ids
+def extract_job_details(html, job, config):
+    """
+    Extrae las DETAIL_COLUMNS de la página de detalle de una oferta: primero del JobPosting
+    en JSON-LD, y luego de los selectores CSS de "detail_fields" en la configuración del
+    sitio, que tienen prioridad. La modalidad se busca en la descripción solo si la
+    página la declara (jobLocationType); si no, en el puesto y la ubicación, porque las
+    descripciones mencionan "remote" por otros motivos (ej. remote monitoring).
+    Args:
+        html (str): El HTML de la página de detalle.
+        job (dict): El trabajo normalizado (ver normalize_jobs).
+        config (dict): La configuración del sitio en SITE_CONFIGS.
+    Returns:
+        dict: Una entrada por columna de DETAIL_COLUMNS ('' si no se encontró).
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, SOUP_PARSER)
+    details = dict.fromkeys(DETAIL_COLUMNS, '')
+    posting = find_job_posting_ld(soup)
+    if posting:
+        details['Fecha de Publicacion'] = clean_text(posting.get('datePosted'))[:10]
+        description = posting.get('description')
+        if description:
+            details['Descripcion'] = clean_text(BeautifulSoup(str(description), SOUP_PARSER).get_text(' '))
+        if 'TELECOMMUTE' in str(posting.get('jobLocationType', '')).upper():
+            details['Modalidad'] = 'Remoto'
+    for column, selector in config.get('detail_fields', {}).items():
+        element = soup.select_one(selector)
+        if element is not None:
+            details[column] = clean_text(element.get_text(' '))
+    if not details['Modalidad']:
+        details['Modalidad'] = get_remote_policy(job['Puesto'], job['Ubicacion'])
+    details['Descripcion'] = details['Descripcion'][:DETAIL_DESCRIPTION_MAX_CHARS]
+    return details
 
-# --- Data Saving Functions ---
+# --- Workday API Helpers ---
 
-def save_to_excel(df_new_jobs_current_run, all_seen_job_ids_from_run):
+def get_workday_api_url(base_url):
     """
-    Guarda las nuevas ofertas de empleo en un archivo Excel, agregándolas a los datos existentes
-    y asegurando que no se añadan duplicados y se mantengan las columnas adicionales y formatos.
+    Deriva el endpoint JSON de búsqueda de Workday a partir de la URL pública del tenant.
+    Ej.: 'https://iqvia.wd1.myworkdayjobs.com/en-US/IQVIA?...' ->
+         'https://iqvia.wd1.myworkdayjobs.com/wday/cxs/iqvia/IQVIA/jobs'
     Args:
-        df_new_jobs_current_run (pd.DataFrame): DataFrame que contiene los nuevos trabajos encontrados en la ejecución actual.
-        all_seen_job_ids_from_run (set): Conjunto de todos los IDs de trabajo vistos (ejecución actual + historial).
+        base_url (str): La URL pública de búsqueda del tenant.
+    Returns:
+        str: La URL del endpoint de búsqueda.
     """
-    
-    # Columnas que el script gestiona y debe escribir para los nuevos registros
-    script_managed_columns = ['Empresa', 'Puesto', 'Link de Aplicación', 'Ubicacion', 'Fecha de Registro', 'job_id']
-    
-    # 1. Cargar el DataFrame existente completo
-    if os.path.exists(OUTPUT_FILE):
+    parsed = urlparse(base_url)
+    tenant = parsed.hostname.split('.')[0]
+    site = [part for part in parsed.path.split('/') if part][-1] # El primer segmento puede ser el idioma (en-US)
+    return f"{parsed.scheme}://{parsed.netloc}/wday/cxs/{tenant}/{site}/jobs"
+
+def get_workday_link_base(base_url):
+    """
+    Obtiene la base a la que Workday concatena el 'externalPath' de cada oferta.
+    Es la misma URL a la que apuntan los enlaces de la interfaz web, para que los
+    job_id generados por la API coincidan con los del scraping por navegador.
+    Args:
+        base_url (str): La URL pública de búsqueda del tenant.
+    Returns:
+        str: La base de los enlaces (ej. 'https://iqvia.wd1.myworkdayjobs.com/en-US/IQVIA').
+    """
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
+
+def parse_workday_posting(posting, link_base):
+    """
+    Obtiene el título, el enlace y la ubicación limpios de una oferta de la API de Workday.
+    Args:
+        posting (dict): Un elemento de 'jobPostings'.
+        link_base (str): Base de los enlaces (ver get_workday_link_base).
+    Returns:
+        tuple: (título, enlace, ubicación).
+    """
+    title = clean_text(posting.get("title")) or 'Title Not Found'
+    external_path = posting.get("externalPath")
+    link = f"{link_base}{external_path}" if external_path else 'Link Not Found'
+    location = clean_text(posting.get("locationsText")) or 'Location Not Found'
+    return title, link, location
+
+def scrape_workday_api(base_url, config, registry, incremental=False, site_metrics=None, checkpoint=None, emit=None, scheduler=None):
+    """
+    Recorre un sitio Workday a través de su endpoint JSON de búsqueda en lugar de
+    hacer clic en 'Siguiente' en el navegador. Los filtros de la URL pública
+    (ej. 'locations=...' o 'locationCountry=...') se envían como appliedFacets.
+    La paginación admite "api_url" y "link_base" para apuntar a un servidor local de pruebas.
+    Args:
+        base_url (str): La URL pública de búsqueda del tenant (clave de SITE_CONFIGS).
+        config (dict): La configuración del sitio.
+        registry (JobIdRegistry): Registro compartido de IDs para la deduplicación.
+        incremental (bool): Si es True, aplica la parada temprana de get_stop_after_known_pages.
+        site_metrics (SiteMetrics, optional): Donde se registran los tiempos de cada página.
+        checkpoint (RunCheckpoint, optional): Punto de control donde se registra cada página;
+            si guarda avance del sitio, la consulta se retoma desde esa página.
+        emit (callable, optional): Recibe la lista de trabajos nuevos de cada página en cuanto se procesa.
+        scheduler (HostScheduler, optional): Planificador que marca el ritmo de las consultas al host.
+    Returns:
+        list: Lista de diccionarios con los trabajos nuevos encontrados (vacía si se pasó emit).
+    """
+    import requests
+    site_new_jobs = []
+    emit = emit or site_new_jobs.extend
+    site_metrics = site_metrics or SiteMetrics(config["company_name"], base_url)
+    scheduler = scheduler or HostScheduler()
+    pagination_config = config["pagination"]
+    stop_after_known_pages = get_stop_after_known_pages(config) if incremental else 0
+    consecutive_known_pages = 0
+    api_url = pagination_config.get("api_url") or get_workday_api_url(base_url)
+    link_base = pagination_config.get("link_base") or get_workday_link_base(base_url)
+    page_size = pagination_config.get("page_size", 20)
+    max_pages = pagination_config.get("max_pages", 1)
+    applied_facets = parse_qs(urlparse(base_url).query)
+    session = get_http_session()
+    total = None
+    start_page = (checkpoint.resume_page(base_url) if checkpoint else None) or 1
+    if start_page > 1:
+        print(f"  Retomando {config['company_name']} desde la página {start_page}.")
+
+    for page_num in range(start_page, max_pages + 1):
+        offset = (page_num - 1) * page_size
+        print(f"  Consultando la API de Workday, página {page_num} (offset {offset}) de {config['company_name']}")
+        payload = {"appliedFacets": applied_facets, "limit": page_size, "offset": offset, "searchText": ""}
+        site_metrics.start_iteration(page_num, api_url)
         try:
-            # Cargar todas las columnas existentes para preservar cualquier columna personalizada
-            existing_df_from_excel = pd.read_excel(OUTPUT_FILE, sheet_name='Ofertas de Empleo')
-            print(f"Cargado el archivo Excel existente con {len(existing_df_from_excel)} registros.")
-
-            # Asegúrate de que 'job_id' exista en el DataFrame existente para la deduplicación
-            if 'job_id' not in existing_df_from_excel.columns:
-                existing_df_from_excel['job_id'] = existing_df_from_excel.apply(
-                    lambda row: generate_job_id(
-                        row.get('Empresa', ''), 
-                        row.get('Puesto', ''), 
-                        row.get('Link de Aplicación', '')
-                    ), axis=1
-                )
-                print("Se generaron 'job_id' para registros existentes sin ellos.")
-            
-            existing_excel_job_ids = set(existing_df_from_excel['job_id'].dropna().tolist())
+            with scheduler.request(api_url) as waited:
+                site_metrics.add('sleep', waited)
+                with site_metrics.timed('navigation'):
+                    response = session.post(api_url, json=payload, headers={'Accept': 'application/json'}, timeout=REQUEST_TIMEOUT)
+                    response.raise_for_status()
+            with site_metrics.timed('parse'):
+                data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"  Error al consultar la API de Workday en {api_url} (Página {page_num}): {e}. Saltando sitio.")
+            return site_new_jobs # Sin marcar el sitio como terminado: --resume lo retoma desde esta página
 
-        except Exception as e:
-            print(f"Error al cargar el archivo Excel existente: {e}. Se tratará como un archivo nuevo.")
-            existing_df_from_excel = pd.DataFrame() # DataFrame vacío si hay error al cargar
-            existing_excel_job_ids = set()
-    else:
-        existing_df_from_excel = pd.DataFrame() # Si no existe, empezar con un DataFrame vacío
-        existing_excel_job_ids = set()
-        print("Creando un nuevo archivo Excel.")
-
-    # 2. Filtrar los nuevos trabajos para añadir solo los que no están ya en el Excel
-    # Asegúrate de que df_new_jobs_current_run tenga la columna 'job_id'
-    if not df_new_jobs_current_run.empty and 'job_id' not in df_new_jobs_current_run.columns:
-        df_new_jobs_current_run['job_id'] = df_new_jobs_current_run.apply(
-            lambda row: generate_job_id(
-                row.get('Empresa', ''), 
-                row.get('Puesto', ''), 
-                row.get('Link de Aplicación', '')
-            ), axis=1
-        )
-    
-    # Filtrar los trabajos que ya están en el Excel (usando job_id)
-    jobs_to_add_to_excel = df_new_jobs_current_run[~df_new_jobs_current_run['job_id'].isin(existing_excel_job_ids)]
+        postings = data.get("jobPostings") or []
+        if total is None:
+            total = data.get("total") or 0 # Workday solo informa el total en la primera página
+        if not postings:
+            print(f"  La API de Workday no devolvió más ofertas para {config['company_name']}.")
+            break
 
-    if not jobs_to_add_to_excel.empty:
-        print(f"Se agregaron {len(jobs_to_add_to_excel)} nuevos trabajos al archivo Excel.")
-        
-        # Asegurarse de que `jobs_to_add_to_excel` tenga todas las columnas del `existing_df_from_excel`
-        # para una concatenación limpia.
-        all_cols_in_excel = existing_df_from_excel.columns.tolist() if not existing_df_from_excel.empty else []
-        for col in jobs_to_add_to_excel.columns:
-            if col not in all_cols_in_excel:
-                all_cols_in_excel.append(col) # Añade las columnas nuevas si existen en jobs_to_add_to_excel
-
-        # Asegurarse de que `jobs_to_add_to_excel` tenga las columnas de `existing_df_from_excel` (con NaN si no tienen valor)
-        for col in all_cols_in_excel:
-            if col not in jobs_to_add_to_excel.columns:
-                jobs_to_add_to_excel[col] = pd.NA # Añade columnas faltantes con valores nulos
-
-        # Concatenar el DataFrame existente con los nuevos trabajos
-        # `jobs_to_add_to_excel` debe tener las mismas columnas que `existing_df_from_excel` para evitar problemas
-        final_df_for_excel = pd.concat([existing_df_from_excel, jobs_to_add_to_excel[all_cols_in_excel]], ignore_index=True)
-    else:
-        final_df_for_excel = existing_df_from_excel
-        print("No hay nuevos trabajos para agregar al archivo Excel (ya están presentes o no se encontraron nuevos).")
+        page_new_jobs = []
+        with site_metrics.timed('extract'):
+            for posting in postings:
+                title, link, location = parse_workday_posting(posting, link_base)
+                job = make_job_record(config["company_name"], title, link, location)
+                if registry.add_if_new(job['job_id']):
+                    page_new_jobs.append(job)
+        found_count_page = len(page_new_jobs)
+        site_metrics.count(len(postings), found_count_page)
+        if checkpoint:
+            checkpoint.record_page(base_url, page_num, page_num + 1, page_new_jobs)
+        emit(page_new_jobs)
 
-    # Guardar el DataFrame en Excel, ahora incluyendo la columna 'job_id'
-    output_df = final_df_for_excel # Ya no se elimina la columna 'job_id' aquí.
+        print(f"  Se encontraron {found_count_page} TRABAJOS NUEVOS en la página {page_num}.")
 
-    writer = pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl')
-    # Usar sheet_name='Ofertas de Empleo' para asegurar que siempre se escribe en la misma hoja
-    output_df.to_excel(writer, index=False, sheet_name='Ofertas de Empleo') 
-    writer.close()
-    print(f"Hoja de cálculo de trabajos actualizada en '{OUTPUT_FILE}'.")
+        consecutive_known_pages = 0 if found_count_page > 0 else consecutive_known_pages + 1
+        if stop_after_known_pages and consecutive_known_pages >= stop_after_known_pages:
+            print(f"  {consecutive_known_pages} página(s) seguidas solo con trabajos conocidos para {config['company_name']}. Deteniendo la paginación (modo incremental).")
+            break
 
+        if total and offset + len(postings) >= total:
+            break
 
-# --- Main Execution Block ---
+    if checkpoint:
+        checkpoint.record_site_done(base_url)
+    return site_new_jobs
 
-if __name__ == "__main__":
-    print("--- Iniciando búsqueda de trabajos ---")
-    
-    new_jobs_list, updated_job_ids_set = scrape_jobs()
+# --- Run Metrics ---
+
+class SiteMetrics:
+    """
+    Tiempos de un sitio, por iteración y por fase (ver PHASES), junto con las
+    tarjetas y los trabajos nuevos de cada iteración. Lo usa un único worker,
+    por lo que no necesita lock.
+    Args:
+        company_name (str): El nombre de la empresa.
+        base_url (str): La URL del sitio (clave de SITE_CONFIGS).
+    """
+    PHASES = ('browser_start', 'navigation', 'wait', 'parse', 'extract', 'sleep')
 
-    df_new_jobs = pd.DataFrame(new_jobs_list)
+    def __init__(self, company_name, base_url):
+        self.company_name = company_name
+        self.base_url = base_url
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self.iterations = []
+        self.wait_samples = [] # (tipo de espera, segundos) de las esperas (ver timed_wait)
+        self.cards = 0
+        self.new_jobs = 0
+        self.cached_pages = 0 # Páginas sin cambios que no se volvieron a procesar (ver SiteExtractor.page_key)
+        self.duration = 0.0
+        self._started = time.perf_counter()
 
-    if not df_new_jobs.empty:
-        print("\n--- Vista previa de NUEVOS Trabajos Encontrados ---")
-        columns_to_show = ['Empresa', 'Puesto', 'Ubicacion', 'Fecha de Registro']
-        print(df_new_jobs[columns_to_show].head())
-        
-    # Llama a save_to_excel con los nuevos trabajos encontrados y el conjunto de todos los IDs vistos
-    # La función save_to_excel ahora es responsable de cargar lo existente, filtrar y concatenar.
-    save_to_excel(df_new_jobs, updated_job_ids_set)
-    
-    print("--- Búsqueda de trabajos finalizada ---")
+    def start_iteration(self, iteration, url):
+        """Abre el registro de una nueva iteración (página, clic o scroll)."""
+        self.iterations.append({
+            'iteration': iteration, 'url': url, 'cards': 0, 'new_jobs': 0, 'page_cache': False,
+            'phases': dict.fromkeys(self.PHASES, 0.0),
+        })
+
+    def page_cached(self):
+        """Registra que la página de la iteración en curso no cambió y no se procesó."""
+        self.cached_pages += 1
+        if self.iterations:
+            self.iterations[-1]['page_cache'] = True
+
+    def add(self, phase, seconds):
+        """Suma segundos a una fase del sitio y de la iteración en curso (si la hay)."""
+        self.totals[phase] += seconds
+        if self.iterations:
+            self.iterations[-1]['phases'][phase] += seconds
+
+    @contextmanager
+    def timed(self, phase):
+        """Mide el bloque 'with' y lo suma a la fase indicada, aunque lance una excepción."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    @contextmanager
+    def timed_wait(self, kind, timeout=None):
+        """
+        Como timed('wait'), y si la espera termina bien guarda su duración como
+        muestra del tipo indicado, para aprender el timeout del sitio.
+        Si se pasa timeout y la espera se agota, se guarda el timeout como muestra:
+        la espera duró al menos eso, y así un sitio que se volvió más lento sube su
+        timeout en lugar de cortar la paginación en cada ejecución.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except TimeoutException:
+            self.add('wait', time.perf_counter() - started)
+            if timeout is not None:
+                self.wait_samples.append((kind, timeout))
+            raise
+        except BaseException:
+            self.add('wait', time.perf_counter() - started)
+            raise
+        seconds = time.perf_counter() - started
+        self.add('wait', seconds)
+        self.wait_samples.append((kind, seconds))
+
+    def count(self, cards, new_jobs):
+        """Registra las tarjetas y los trabajos nuevos de la iteración en curso."""
+        self.cards += cards
+        self.new_jobs += new_jobs
+        if self.iterations:
+            self.iterations[-1]['cards'] += cards
+            self.iterations[-1]['new_jobs'] += new_jobs
+
+    def finish(self):
+        """Cierra la medición del tiempo total del sitio."""
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self):
+        return {
+            'company': self.company_name,
+            'url': self.base_url,
+            'duration_s': round(self.duration, 4),
+            'iterations_count': len(self.iterations),
+            'cards': self.cards,
+            'new_jobs': self.new_jobs,
+            'cached_pages': self.cached_pages,
+            'phases_s': {phase: round(seconds, 4) for phase, seconds in self.totals.items()},
+            'iterations': [
+                dict(record, phases_s={phase: round(seconds, 4) for phase, seconds in record['phases'].items()})
+                for record in self.iterations
+            ],
+        }
+
+class RunMetrics:
+    """
+    Métricas de una ejecución completa: un SiteMetrics por sitio y los tiempos del
+    guardado. Al terminar se escriben como informe JSON (METRICS_REPORT_FILE) y como
+    archivo de texto para el textfile collector de Prometheus (METRICS_PROM_FILE).
+    """
+    SAVE_PHASES = ('index', 'journal', 'compact', 'details')
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.crawl_mode = None
+        self.workers = None
+        self.sites = {} # base_url -> SiteMetrics
+        self.hosts = {} # Estado final del HostScheduler por host (ver HostScheduler.snapshot)
+        self.save = dict.fromkeys(self.SAVE_PHASES, 0.0)
+        self.duration = 0.0
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def site(self, extractor):
+        """
+        Args:
+            extractor (SiteExtractor): El extractor del sitio.
+        Returns:
+            SiteMetrics: Las métricas del sitio, creadas al pedirlas por primera vez.
+        """
+        with self._lock:
+            if extractor.base_url not in self.sites:
+                self.sites[extractor.base_url] = SiteMetrics(extractor.company_name, extractor.base_url)
+            return self.sites[extractor.base_url]
+
+    @contextmanager
+    def timed_save(self, phase):
+        """Mide el bloque 'with' y lo suma a la fase de guardado indicada."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.save[phase] += time.perf_counter() - started
+
+    def finish(self):
+        """Cierra la medición del tiempo total de la ejecución."""
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self):
+        sites = [site_metrics.to_dict() for site_metrics in self.sites.values()]
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration_s': round(self.duration, 4),
+            'crawl_mode': self.crawl_mode,
+            'workers': self.workers,
+            'cards': sum(site['cards'] for site in sites),
+            'new_jobs': sum(site['new_jobs'] for site in sites),
+            'phases_s': {
+                phase: round(sum(site_metrics.totals[phase] for site_metrics in self.sites.values()), 4)
+                for phase in SiteMetrics.PHASES
+            },
+            'save_s': {phase: round(seconds, 4) for phase, seconds in self.save.items()},
+            'hosts': self.hosts,
+            'sites': sites,
+        }
+
+    def write_report(self, path=METRICS_REPORT_FILE):
+        """Escribe el informe JSON de la ejecución."""
+        with open(path, 'w', encoding='utf-8') as report:
+            json.dump(self.to_dict(), report, indent=2, ensure_ascii=False)
+        print(f"Informe de métricas guardado en '{path}'.")
+
+    def write_prometheus(self, path=METRICS_PROM_FILE):
+        """
+        Escribe las métricas en el formato de texto de Prometheus. Se escribe en un
+        archivo temporal y se renombra, para que el collector nunca lea un archivo a medias.
+        """
+        lines = [
+            '# HELP scrapjobs_run_duration_seconds Duración total de la última ejecución.',
+            '# TYPE scrapjobs_run_duration_seconds gauge',
+            f'scrapjobs_run_duration_seconds {self.duration:.4f}',
+            '# HELP scrapjobs_last_run_timestamp_seconds Inicio de la última ejecución (epoch).',
+            '# TYPE scrapjobs_last_run_timestamp_seconds gauge',
+            f'scrapjobs_last_run_timestamp_seconds {self.started_at.timestamp():.0f}',
+            '# HELP scrapjobs_save_seconds Tiempo de guardado de la última ejecución, por fase.',
+            '# TYPE scrapjobs_save_seconds gauge',
+        ]
+        lines += [f'scrapjobs_save_seconds{{phase="{phase}"}} {seconds:.4f}' for phase, seconds in self.save.items()]
+        site_gauges = [
+            ('scrapjobs_site_duration_seconds', 'Duración del rastreo de cada sitio.', lambda site: f'{site.duration:.4f}'),
+            ('scrapjobs_site_iterations', 'Iteraciones (páginas, clics o scrolls) de cada sitio.', lambda site: len(site.iterations)),
+            ('scrapjobs_site_cards', 'Tarjetas leídas en cada sitio.', lambda site: site.cards),
+            ('scrapjobs_site_new_jobs', 'Trabajos nuevos encontrados en cada sitio.', lambda site: site.new_jobs),
+        ]
+        for name, help_text, value in site_gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            lines += [f'{name}{{site="{_prom_label(site.company_name)}"}} {value(site)}' for site in self.sites.values()]
+        lines += [
+            '# HELP scrapjobs_site_phase_seconds Tiempo de cada sitio por fase.',
+            '# TYPE scrapjobs_site_phase_seconds gauge',
+        ]
+        for site in self.sites.values():
+            site_label = _prom_label(site.company_name)
+            lines += [f'scrapjobs_site_phase_seconds{{site="{site_label}",phase="{phase}"}} {seconds:.4f}' for phase, seconds in site.totals.items()]
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as prom_file:
+            prom_file.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+        print(f"Métricas de Prometheus guardadas en '{path}'.")
+
+    def print_summary(self, top=5):
+        """Muestra los sitios más lentos y en qué fase se fue su tiempo."""
+        print("\n--- Sitios más lentos ---")
+        slowest = sorted(self.sites.values(), key=lambda site: site.duration, reverse=True)[:top]
+        for site in slowest:
+            main_phase = max(site.totals, key=site.totals.get)
+            print(f"  {site.company_name}: {site.duration:.1f} s en {len(site.iterations)} iteraciones "
+                  f"({site.cards} tarjetas, {site.new_jobs} nuevas); fase principal: {main_phase} ({site.totals[main_phase]:.1f} s)")
+
+def _prom_label(value):
+    """Escapa un valor de etiqueta para el formato de texto de Prometheus."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# --- Checkpoint ---
+
+class RunCheckpoint:
+    """
+    Punto de control de una ejecución en curso, para poder retomarla con --resume
+    tras un fallo (Chrome caído, proceso terminado, Ctrl-C...).
+    Se guarda como un archivo JSON Lines append-only: una cabecera con el modo de
+    rastreo, una línea por página procesada (página siguiente y trabajos nuevos de
+    esa página) y una línea por sitio terminado. Cada línea se escribe con fsync,
+    de modo que un corte solo puede perder la página en curso.
+    Args:
+        path (str): Ruta del archivo (por defecto CHECKPOINT_FILE).
+    """
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.crawl_mode = None
+        self.sites = {} # base_url -> {'done': bool, 'next_page': int o None, 'jobs': list}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Lee el punto de control de una ejecución anterior. Una última línea cortada
+        (escritura interrumpida) se ignora.
+        Returns:
+            bool: True si había un punto de control que retomar.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    print(f"Advertencia: se ignoró una línea incompleta de '{self.path}'.")
+                    continue
+                if 'crawl_mode' in event:
+                    self.crawl_mode = event['crawl_mode']
+                    continue
+                site = self._site_state(event['site'])
+                if event.get('done'):
+                    site['done'] = True
+                else:
+                    site['next_page'] = event['next_page']
+                    site['jobs'].extend(event['jobs'])
+        return self.crawl_mode is not None
+
+    def start(self, crawl_mode, resume=False):
+        """
+        Abre el archivo para registrar la ejecución. Si no se retoma una ejecución
+        anterior, el archivo se reinicia con una nueva cabecera.
+        Args:
+            crawl_mode (str): "full" o "incremental".
+            resume (bool): Si es True, se sigue agregando al punto de control cargado.
+        """
+        self.crawl_mode = crawl_mode
+        if not resume:
+            self.sites = {}
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._write({'crawl_mode': crawl_mode, 'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+
+    def record_page(self, base_url, page, next_page, jobs):
+        """
+        Registra una página procesada de un sitio.
+        Args:
+            base_url (str): La URL del sitio (clave de SITE_CONFIGS).
+            page (int): La página (o iteración) procesada.
+            next_page (int): La página por la que seguir al retomar.
+            jobs (list): Trabajos nuevos encontrados en esa página.
+        """
+        self._write({'site': base_url, 'page': page, 'next_page': next_page, 'jobs': jobs})
+
+    def record_site_done(self, base_url):
+        """Registra que un sitio se recorrió entero sin errores."""
+        self._write({'site': base_url, 'done': True})
 
+    def is_site_done(self, base_url):
+        return self.sites.get(base_url, {}).get('done', False)
+
+    def resume_page(self, base_url):
+        """
+        Returns:
+            int or None: Página por la que retomar el sitio, o None si no hay avance guardado.
+        """
+        return self.sites.get(base_url, {}).get('next_page')
+
+    def jobs_for(self, base_url):
+        """
+        Returns:
+            list: Trabajos nuevos ya recogidos del sitio en la ejecución interrumpida.
+        """
+        return self.sites.get(base_url, {}).get('jobs', [])
+
+    def clear(self):
+        """Elimina el punto de control una vez guardados los resultados de la ejecución."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _site_state(self, base_url):
+        return self.sites.setdefault(base_url, {'done': False, 'next_page': None, 'jobs': []})
+
+    def _write(self, event):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+# --- Worker Pool Helpers ---
+
+class JobIdSet:
+    """
+    Conjunto compacto de job_id para la deduplicación: guarda solo el digest de ancho
+    fijo de cada ID (ver job_id_digest). El historial vive en un array ordenado de
+    NumPy (bits // 8 bytes por oferta, búsqueda binaria) y los IDs agregados durante la
+    ejecución en un set pequeño. Opcionalmente, un filtro de Bloom descarta sin buscar
+    los IDs que seguro no están en el historial.
+    Args:
+        digests (array-like, optional): Digests del historial (ver JobIndex.load_job_digests).
+        bits (int, optional): Ancho de los digests (por defecto JOB_ID_DIGEST_BITS).
+        bloom_bits_per_id (int, optional): Tamaño del filtro de Bloom (por defecto JOB_ID_BLOOM_BITS_PER_ID; 0 = sin filtro).
+    """
+    def __init__(self, digests=None, bits=None, bloom_bits_per_id=None):
+        import numpy as np
+        self.bits = bits or JOB_ID_DIGEST_BITS
+        self._dtype = np.dtype(f'S{self.bits // 8}')
+        self._history = self._sorted_unique(np.asarray(digests if digests is not None else [], dtype=self._dtype))
+        self._added = set()
+        bloom_bits_per_id = JOB_ID_BLOOM_BITS_PER_ID if bloom_bits_per_id is None else bloom_bits_per_id
+        self._bloom = None
+        if bloom_bits_per_id and len(self._history):
+            self._bloom_size = len(self._history) * bloom_bits_per_id
+            self._bloom = np.zeros((self._bloom_size + 7) // 8, dtype=np.uint8)
+            positions = self._bloom_positions(self._history.tobytes())
+            np.bitwise_or.at(self._bloom, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def _sorted_unique(self, digests):
+        """
+        Ordena los digests y quita los repetidos. Se ordenan como enteros nativos de 64
+        bits (el orden de los bytes en big-endian es el mismo), mucho más rápido que
+        ordenar cadenas de bytes.
+        """
+        import numpy as np
+        if not len(digests):
+            return digests
+        words = np.frombuffer(digests.tobytes(), dtype='>u8').reshape(len(digests), -1).astype(np.uint64)
+        order = np.lexsort(words.T[::-1]) # La primera palabra es la clave principal
+        words = words[order]
+        keep = np.ones(len(words), dtype=bool)
+        keep[1:] = np.any(words[1:] != words[:-1], axis=1)
+        return digests[order][keep]
+
+    def _bloom_positions(self, raw_digests):
+        """
+        Posiciones del filtro de Bloom de uno o varios digests (doble hashing con dos
+        palabras de 32 bits del propio digest, que ya es uniforme).
+        """
+        import numpy as np
+        words = np.frombuffer(raw_digests, dtype='>u4').reshape(-1, self.bits // 32).astype(np.uint64)
+        first, step = words[:, 0:1], words[:, 1:2] | 1
+        return ((first + step * np.arange(JOB_ID_BLOOM_HASHES, dtype=np.uint64)) % np.uint64(self._bloom_size)).ravel()
+
+    def _in_history(self, digest):
+        import numpy as np
+        if self._bloom is not None:
+            positions = self._bloom_positions(digest)
+            if not np.all(self._bloom[positions >> 3] & (1 << (positions & 7)).astype(np.uint8)):
+                return False
+        index = int(np.searchsorted(self._history, np.array(digest, dtype=self._dtype)))
+        return index < len(self._history) and self._history[index:index + 1].tobytes() == digest
+
+    def __contains__(self, job_id):
+        digest = job_id_digest(job_id, self.bits)
+        return digest in self._added or self._in_history(digest)
+
+    def add(self, job_id):
+        self._added.add(job_id_digest(job_id, self.bits))
+
+    def __len__(self):
+        return len(self._history) + len(self._added)
+
+    @property
+    def nbytes(self):
+        """Memoria aproximada del historial y del filtro de Bloom, en bytes."""
+        return self._history.nbytes + (self._bloom.nbytes if self._bloom is not None else 0)
+
+class JobIdRegistry:
+    """
+    Conjunto de IDs de trabajos compartido entre los workers del pool.
+    La comprobación y el registro de cada ID se hacen bajo un mismo lock, de modo
+    que dos navegadores no puedan agregar la misma oferta a la vez.
+    Args:
+        job_ids (iterable or JobIdSet, optional): IDs ya conocidos (historial). Un JobIdSet
+            se usa tal cual; cualquier otro iterable se copia en un set de cadenas.
+    """
+    def __init__(self, job_ids=None):
+        self.ids = job_ids if isinstance(job_ids, JobIdSet) else set(job_ids or [])
+        self.seen = set() # IDs vistos en esta ejecución, nuevos o no
+        self._lock = threading.Lock()
+
+    def add_if_new(self, job_id):
+        """
+        Registra el ID si todavía no existía.
+        Args:
+            job_id (str): El ID de la oferta.
+        Returns:
+            bool: True si el ID es nuevo, False si ya estaba registrado.
+        """
+        with self._lock:
+            self.seen.add(job_id)
+            if job_id in self.ids:
+                return False
+            self.ids.add(job_id)
+            return True
+
+    def mark_seen_if_known(self, job_ids):
+        """
+        Marca los IDs como vistos en esta ejecución si todos ya estaban registrados.
+        Args:
+            job_ids (list): Los IDs de una página (ver SiteExtractor.cached_job_ids).
+        Returns:
+            bool: True si todos eran conocidos, False (sin marcar ninguno) si alguno falta.
+        """
+        with self._lock:
+            if not all(job_id in self.ids for job_id in job_ids):
+                return False
+            self.seen.update(job_ids)
+            return True
+
+def create_driver(driver_path):
+    """
+    Crea una instancia de Chrome WebDriver en modo headless, con el perfil de
+    rendimiento de PAGE_LOAD_STRATEGY (el bloqueo de recursos se aplica por sitio,
+    ver BrowserHandle.get).
+    Args:
+        driver_path (str): Ruta al binario de chromedriver ya resuelto.
+    Returns:
+        webdriver.Chrome: El navegador iniciado.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    service = ChromeService(driver_path)
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--mute-audio')
+    options.add_argument('--autoplay-policy=user-gesture-required')
+    options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    return webdriver.Chrome(service=service, options=options)
+
+def wait_for_element(driver, css_selector, clickable=False, timeout=60):
+    """
+    Espera a que un elemento esté presente en la página (o, con clickable=True, a
+    que se pueda hacer clic en él).
+    Args:
+        driver (webdriver.Chrome): El navegador.
+        css_selector (str): Selector CSS del elemento.
+        clickable (bool): Si es True, espera a que el elemento sea clicable.
+        timeout (int): Segundos máximos de espera.
+    Returns:
+        WebElement: El elemento encontrado.
+    Raises:
+        TimeoutException: Si el elemento no aparece a tiempo.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_SECONDS).until(condition((By.CSS_SELECTOR, css_selector)))
+
+# Huella de las tarjetas del listado: cantidad y un hash de 64 bits (cyrb53 doble) de su HTML,
+# calculado en el navegador para no transferir la página (ver SiteExtractor.page_key)
+LISTING_FINGERPRINT_SCRIPT = """
+const cards = document.querySelectorAll(arguments[0]);
+let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+for (const card of cards) {
+    const html = card.outerHTML;
+    for (let i = 0; i < html.length; i++) {
+        const ch = html.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+}
+h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+return cards.length + ':' + (h2 >>> 0).toString(16) + ':' + (h1 >>> 0).toString(16);
+"""
+
+# Estado del listado: número de tarjetas, identidad de la primera (enlace + inicio del texto) y alto de la página
+LISTING_STATE_SCRIPT = """
+const cards = document.querySelectorAll(arguments[0]);
+let first = null;
+if (cards.length) {
+    const link = cards[0].querySelector('a[href]');
+    first = (link ? link.href : '') + '|' + cards[0].textContent.trim().slice(0, 200);
+}
+return {count: cards.length, first: first, height: document.body ? document.body.scrollHeight : 0};
+"""
+
+# Resuelve cuando el contenedor del listado pasa arguments[1] ms sin mutaciones (o a los arguments[2] ms)
+WAIT_FOR_SETTLE_SCRIPT = """
+const [selector, quietMs, maxMs, done] = arguments;
+const card = document.querySelector(selector);
+const target = (card && card.parentElement) || document.body;
+let finished = false;
+let quietTimer = null;
+const observer = new MutationObserver(() => { clearTimeout(quietTimer); quietTimer = setTimeout(finish, quietMs); });
+const capTimer = setTimeout(finish, maxMs);
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(capTimer);
+    done(true);
+}
+observer.observe(target, {childList: true, subtree: true, characterData: true, attributes: true});
+quietTimer = setTimeout(finish, quietMs);
+"""
+
+def get_listing_state(driver, listing_selector):
+    """
+    Args:
+        driver (webdriver.Chrome): El navegador.
+        listing_selector (str): Selector CSS de las tarjetas.
+    Returns:
+        dict: {'count', 'first', 'height'} (ver LISTING_STATE_SCRIPT).
+    """
+    return driver.execute_script(LISTING_STATE_SCRIPT, listing_selector)
+
+def wait_for_listing_change(driver, listing_selector, previous_state, timeout, grow=False):
+    """
+    Espera a que el listado cambie respecto de previous_state: otra cantidad de
+    tarjetas u otra primera tarjeta (tras un clic en 'Siguiente') o, con grow=True,
+    más tarjetas o una página más alta (tras un scroll).
+    Args:
+        driver (webdriver.Chrome): El navegador.
+        listing_selector (str): Selector CSS de las tarjetas.
+        previous_state (dict): Estado anterior (ver get_listing_state).
+        timeout (float): Segundos máximos de espera.
+        grow (bool): Si es True, solo cuenta como cambio que el listado crezca.
+    Returns:
+        dict: El nuevo estado del listado.
+    Raises:
+        TimeoutException: Si el listado no cambia a tiempo.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    def changed_state(driver):
+        state = get_listing_state(driver, listing_selector)
+        if grow:
+            changed = state['count'] > previous_state['count'] or state['height'] > previous_state['height']
+        else:
+            changed = state['count'] > 0 and (state['count'] != previous_state['count'] or state['first'] != previous_state['first'])
+        return state if changed else False
+
+    # Mientras la página se recarga tras el clic, el script puede fallar: se reintenta en el siguiente sondeo
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_SECONDS,
+                         ignored_exceptions=(JavascriptException,)).until(changed_state)
+
+def wait_for_listing_settled(driver, listing_selector):
+    """
+    Espera, con un MutationObserver, a que el contenedor del listado deje de cambiar
+    (SETTLE_QUIET_MS sin mutaciones, como mucho SETTLE_MAX_MS), para no leer un
+    listado a medio renderizar.
+    Args:
+        driver (webdriver.Chrome): El navegador.
+        listing_selector (str): Selector CSS de las tarjetas.
+    """
+    try:
+        driver.execute_async_script(WAIT_FOR_SETTLE_SCRIPT, listing_selector, SETTLE_QUIET_MS, SETTLE_MAX_MS)
+    except TimeoutException:
+        pass # El script nunca tarda más de SETTLE_MAX_MS salvo que la página esté bloqueada: se sigue igualmente
+
+def wait_for_page_element(driver, extractor, site_metrics, kind, css_selector, retry=True):
+    """
+    Espera un elemento que la página tiene que mostrar (el listado o su iframe) con el
+    timeout aprendido del sitio. Con retry=True (primera página del sitio), si ese
+    timeout se agota y es menor que WAIT_TIMEOUT_MAX, se reintenta una vez con
+    WAIT_TIMEOUT_MAX antes de dar el sitio por fallido: una página lenta no debe cortar
+    el sitio. La duración total se guarda como muestra, para que el timeout aprendido
+    crezca. En las páginas siguientes no se reintenta: que el listado no aparezca es el
+    fin de resultados habitual, y esperar WAIT_TIMEOUT_MAX en cada sitio anularía los
+    timeouts aprendidos.
+    Args:
+        driver (webdriver.Chrome): El navegador.
+        extractor (SiteExtractor): El extractor del sitio (timeouts aprendidos).
+        site_metrics (SiteMetrics): Donde se registran el tiempo y la muestra de la espera.
+        kind (str): Tipo de espera ('listing' o 'iframe').
+        css_selector (str): Selector CSS del elemento.
+        retry (bool): Si es True, reintenta una vez con WAIT_TIMEOUT_MAX.
+    Returns:
+        WebElement: El elemento encontrado.
+    Raises:
+        TimeoutException: Si el elemento no aparece a tiempo.
+    """
+    timeout = extractor.wait_timeout(kind)
+    started = time.perf_counter()
+    try:
+        with site_metrics.timed_wait(kind):
+            return wait_for_element(driver, css_selector, timeout=timeout)
+    except TimeoutException:
+        if not retry or timeout >= WAIT_TIMEOUT_MAX:
+            raise
+    print(f"  '{css_selector}' tardó más que el timeout aprendido ({timeout:.0f} s). Reintentando con {WAIT_TIMEOUT_MAX} s.")
+    with site_metrics.timed('wait'):
+        element = wait_for_element(driver, css_selector, timeout=WAIT_TIMEOUT_MAX)
+    site_metrics.wait_samples.append((kind, time.perf_counter() - started))
+    return element
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def _read_driver_cache():
+    """
+    Returns:
+        dict or None: La caché de CHROMEDRIVER_CACHE_FILE si sigue vigente (dentro del TTL
+                      y con el binario todavía en disco), o None.
+    """
+    try:
+        with open(CHROMEDRIVER_CACHE_FILE, encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    age_hours = (time.time() - cache.get('resolved_at', 0)) / 3600
+    if age_hours >= CHROMEDRIVER_CACHE_TTL_HOURS or not os.path.exists(cache.get('path', '')):
+        return None
+    return cache
+
+def _write_driver_cache(cache):
+    try:
+        with open(CHROMEDRIVER_CACHE_FILE, 'w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file, indent=2)
+    except OSError as e:
+        print(f"Advertencia: no se pudo guardar la caché de chromedriver en '{CHROMEDRIVER_CACHE_FILE}': {e}")
+
+def get_driver_path():
+    """
+    Resuelve la ruta de chromedriver una sola vez por ejecución, para que los
+    workers no descarguen el driver en paralelo. Por orden: CHROMEDRIVER_PATH
+    (ruta fija), la caché de CHROMEDRIVER_CACHE_FILE si está vigente y, si no,
+    webdriver_manager (que consulta versiones por red), guardando el resultado en la caché.
+    Returns:
+        str: Ruta al binario de chromedriver.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            if CHROMEDRIVER_PATH:
+                _driver_path = CHROMEDRIVER_PATH
+            else:
+                cache = _read_driver_cache()
+                if cache:
+                    _driver_path = cache['path']
+                else:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    _driver_path = ChromeDriverManager().install()
+                    _write_driver_cache({'path': _driver_path, 'resolved_at': time.time(), 'browser_version': None})
+        return _driver_path
+
+def record_browser_version(browser_version):
+    """
+    Anota en la caché de chromedriver la versión de Chrome con la que funcionó, como referencia.
+    Args:
+        browser_version (str): Versión informada por el navegador (capabilities['browserVersion']).
+    """
+    with _driver_path_lock:
+        cache = _read_driver_cache()
+        if cache and cache['path'] == _driver_path and cache.get('browser_version') != browser_version:
+            cache['browser_version'] = browser_version
+            _write_driver_cache(cache)
+
+def invalidate_driver_path():
+    """
+    Descarta la ruta de chromedriver resuelta y su caché (ej. tras una actualización
+    de Chrome que la dejó incompatible), para que get_driver_path la vuelva a resolver.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        _driver_path = None
+        if os.path.exists(CHROMEDRIVER_CACHE_FILE):
+            os.remove(CHROMEDRIVER_CACHE_FILE)
+
+class BrowserHandle:
+    """
+    Navegador Chrome de un worker, iniciado de forma perezosa la primera vez que
+    un sitio lo necesita. Los sitios en modo HTTP nunca lo inician. También guarda
+    la sesión HTTP del worker (ver get_http_session).
+    Args:
+        worker_num (int): Número del worker (solo para los mensajes).
+    """
+    def __init__(self, worker_num):
+        self.worker_num = worker_num
+        self.driver = None
+        self.blocked_urls = None # Patrones aplicados con Network.setBlockedURLs (None = sin aplicar)
+        self.http_session = None # requests.Session del worker, creada al primer uso
+
+    def get(self, extractor=None):
+        """
+        Devuelve el navegador del worker, creándolo si todavía no existe.
+        Args:
+            extractor (SiteExtractor, optional): Sitio que va a usar el navegador; se le
+                aplica su lista de URLs bloqueadas (ver get_blocked_url_patterns).
+        Returns:
+            webdriver.Chrome: El navegador iniciado.
+        """
+        if self.driver is None:
+            driver_path = get_driver_path()
+            try:
+                self.driver = create_driver(driver_path)
+            except SessionNotCreatedException as e:
+                if CHROMEDRIVER_PATH:
+                    raise
+                # chromedriver (de la caché) no es compatible con el Chrome instalado: se resuelve de nuevo
+                print(f"[Worker {self.worker_num}] chromedriver incompatible ({e.msg}). Resolviendo el driver de nuevo.")
+                if get_driver_path() == driver_path: # Otro worker puede haberlo resuelto ya
+                    invalidate_driver_path()
+                self.driver = create_driver(get_driver_path())
+            record_browser_version(self.driver.capabilities.get('browserVersion'))
+            print(f"[Worker {self.worker_num}] Chrome WebDriver iniciado en modo headless.")
+        if extractor is not None:
+            self._block_urls(extractor.blocked_urls)
+        return self.driver
+
+    def _block_urls(self, patterns):
+        """Aplica los patrones de URL bloqueados con DevTools, si cambiaron respecto del sitio anterior."""
+        if patterns == self.blocked_urls:
+            return
+        try:
+            if self.blocked_urls is None:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+            self.blocked_urls = patterns
+        except WebDriverException as e:
+            print(f"[Worker {self.worker_num}] No se pudo aplicar el bloqueo de recursos: {e.msg}")
+            self.blocked_urls = patterns # No se reintenta en cada sitio
+
+    def quit(self):
+        """Cierra el navegador si llegó a iniciarse, y la sesión HTTP del worker."""
+        if self.http_session is not None:
+            self.http_session.close()
+            self.http_session = None
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                self.blocked_urls = None
+            print(f"[Worker {self.worker_num}] Chrome WebDriver cerrado.")
+
+def get_host_key(url):
+    """
+    Obtiene la clave de host usada para serializar sitios que comparten servidor.
+    Se toma el dominio registrado (las dos últimas etiquetas), de modo que los
+    tenants 'iqvia.wd1.myworkdayjobs.com' y 'fortrea.wd1.myworkdayjobs.com'
+    comparten la clave 'myworkdayjobs.com'.
+    Args:
+        url (str): La URL del sitio.
+    Returns:
+        str: La clave de host.
+    """
+    hostname = urlparse(url).hostname or ''
+    return '.'.join(hostname.split('.')[-2:])
+
+def group_sites_by_host(extractors):
+    """
+    Agrupa los sitios por clave de host, conservando el orden original.
+    Cada grupo se procesa entero en un mismo navegador, uno detrás de otro.
+    Args:
+        extractors (list): Los SiteExtractor de los sitios a rastrear.
+    Returns:
+        list: Lista de grupos; cada grupo es una lista de SiteExtractor.
+    """
+    groups = {}
+    for extractor in extractors:
+        groups.setdefault(get_host_key(extractor.base_url), []).append(extractor)
+    return list(groups.values())
+
+def _pool_worker(worker_num, group_queue, registry, emit, processed_sites, incremental, metrics, checkpoint, scheduler, browser=None):
+    """
+    Bucle de un worker del pool: toma grupos de sitios de la cola hasta vaciarla.
+    El navegador del worker solo se inicia si algún sitio lo necesita. Un error
+    inesperado en un sitio se registra con su traceback y el worker sigue con el
+    resto del grupo; el sitio no se marca como procesado ni como terminado.
+    Args:
+        worker_num (int): Número del worker (solo para los mensajes).
+        group_queue (queue.Queue): Cola de grupos de sitios pendientes.
+        registry (JobIdRegistry): Registro compartido de IDs.
+        emit (callable): Recibe los trabajos nuevos de cada página (ver scrape_site).
+        processed_sites (set): base_url de los sitios ya procesados (salida).
+        incremental (bool): Si es True, los sitios se rastrean en modo incremental.
+        metrics (RunMetrics): Métricas de la ejecución.
+        checkpoint (RunCheckpoint): Punto de control de la ejecución.
+        scheduler (HostScheduler): Planificador de cortesía compartido por todos los workers.
+        browser (BrowserHandle, optional): Navegador que se reutiliza entre ejecuciones (modo daemon);
+            no se cierra al terminar. Por defecto el worker crea el suyo y lo cierra.
+    """
+    owns_browser = browser is None
+    browser = browser or BrowserHandle(worker_num)
+    _http_local.browser = browser # get_http_session usa la sesión del worker, no la del hilo del pool
+    try:
+        while True:
+            try:
+                sites = group_queue.get_nowait()
+            except queue.Empty:
+                break
+            for extractor in sites:
+                site_metrics = metrics.site(extractor)
+                try:
+                    scrape_site(browser, extractor, registry, incremental, site_metrics, checkpoint, emit, scheduler)
+                    processed_sites.add(extractor.base_url)
+                except Exception as e:
+                    print(f"[Worker {worker_num}] Error inesperado al procesar {extractor.company_name}: {e!r}. Se sigue con el siguiente sitio.")
+                    traceback.print_exc()
+                    if isinstance(e, WebDriverException):
+                        # El navegador puede haber quedado inutilizable: el siguiente sitio inicia uno nuevo
+                        try:
+                            browser.quit()
+                        except Exception:
+                            pass
+                finally:
+                    site_metrics.finish()
+    finally:
+        _http_local.browser = None
+        if owns_browser:
+            browser.quit()
+
+# --- Main Scraping Function ---
+
+# Marca que cada worker deja en la cola de trabajos al terminar (ver iter_new_jobs)
+_WORKER_DONE = object()
+
+def scrape_site(browser, extractor, registry, incremental=False, site_metrics=None, checkpoint=None, emit=None, scheduler=None):
+    """
+    Recorre todas las páginas de un sitio configurado y devuelve las ofertas nuevas.
+    Con "fetch_mode": "http" las páginas se descargan con requests y solo se recurre
+    al navegador si el selector de listados no encuentra nada en el HTML crudo.
+    En modo incremental la paginación se detiene tras varias páginas seguidas con
+    tarjetas pero sin ningún trabajo nuevo (ver get_stop_after_known_pages).
+    Args:
+        browser (BrowserHandle): Navegador propio del worker que procesa el sitio.
+        extractor (SiteExtractor): El extractor compilado del sitio.
+        registry (JobIdRegistry): Registro compartido de IDs para la deduplicación.
+        incremental (bool): Si es True, aplica la parada temprana por páginas conocidas.
+        site_metrics (SiteMetrics, optional): Donde se registran los tiempos de cada iteración y fase.
+        checkpoint (RunCheckpoint, optional): Punto de control donde se registra cada página y el
+            final del sitio. Si guarda avance del sitio, la paginación por URL se retoma desde esa
+            página; en clic y scroll se vuelve a empezar, sin parada temprana hasta pasarla.
+        emit (callable, optional): Recibe la lista de trabajos nuevos de cada página en cuanto se
+            procesa (ver iter_new_jobs). Por defecto se acumulan y se devuelven al final.
+        scheduler (HostScheduler, optional): Planificador que marca el ritmo de cada petición
+            (carga de página, clic o scroll) al host del sitio.
+    Returns:
+        list: Lista de diccionarios con los trabajos nuevos encontrados (vacía si se pasó emit).
+    """
+    base_url, config = extractor.base_url, extractor.config
+    site_new_jobs = []
+    emit = emit or site_new_jobs.extend
+    site_metrics = site_metrics or SiteMetrics(extractor.company_name, base_url)
+    scheduler = scheduler or HostScheduler()
+    print(f"\nScraping: Empresa: {config['company_name']}")
+
+    pagination_config = config.get("pagination")
+
+    if pagination_config and pagination_config["type"] == "workday_api":
+        return scrape_workday_api(base_url, config, registry, incremental, site_metrics, checkpoint, emit, scheduler)
+
+    fetch_mode = config.get("fetch_mode", "browser")
+    if fetch_mode == "http" and pagination_config and pagination_config["type"] != "url":
+        print(f"  Advertencia: 'fetch_mode': 'http' solo admite paginación por URL. Se usará el navegador para {config['company_name']}.")
+        fetch_mode = "browser"
+
+    # Una vez que HTTP devolvió tarjetas, una página vacía es fin de resultados y no motivo de fallback
+    http_verified = False
+    driver = None
+    if fetch_mode == "browser":
+        try:
+            with site_metrics.timed('browser_start'):
+                driver = browser.get(extractor)
+        except Exception as e:
+            print(f"  Error al iniciar Chrome WebDriver para {config['company_name']}: {e}. Saltando sitio.")
+            return site_new_jobs
+
+    current_iteration = 1
+    max_iterations = 1
+    consecutive_empty_pages = 0
+    consecutive_known_pages = 0
+    site_failed = False
+    stop_after_known_pages = get_stop_after_known_pages(config) if incremental else 0
+    # Al retomar, las páginas anteriores a resume_page ya se procesaron (y sus trabajos ya están en el registro)
+    resume_page = (checkpoint.resume_page(base_url) if checkpoint else None) or 0
+
+    if pagination_config:
+        if pagination_config["type"] == "url":
+            current_iteration = max(pagination_config.get("start_page", 1), resume_page)
+            if resume_page:
+                print(f"  Retomando {config['company_name']} desde la página {current_iteration}.")
+            max_iterations = pagination_config.get("max_pages", 1)
+        elif pagination_config["type"] == "click":
+            max_iterations = pagination_config.get("max_pages", 1)
+        elif pagination_config["type"] == "scroll":
+            max_iterations = pagination_config.get("max_scrolls", 1)
+
+            print(f"  Navegando a la URL base para paginación por scroll: {base_url}")
+            with scheduler.request(base_url) as waited:
+                site_metrics.add('sleep', waited)
+                with site_metrics.timed('navigation'):
+                    driver.get(base_url)
+
+    # Un timeout en la primera página es un fallo del sitio; en las siguientes, el fin de resultados
+    first_iteration = current_iteration
+
+    while current_iteration <= max_iterations:
+        url_to_scrape = base_url
+        navigate = False
+        job_listings = None # Se completa aquí si la página se obtuvo por HTTP plano
+        cached_job_ids = None # job_id de la página si no cambió desde la ejecución anterior
+        fingerprint = validators = None
+        site_metrics.start_iteration(current_iteration, base_url)
+
+        if pagination_config and pagination_config["type"] == "url":
+            if "offset_step" in pagination_config:
+                offset = (current_iteration - 1) * pagination_config["offset_step"]
+                url_to_scrape = pagination_config["url_pattern"].format(offset_val=offset)
+                print(f"  Navegando a la página {current_iteration} (offset {offset}) de {config['company_name']}")
+            else:
+                url_to_scrape = pagination_config["url_pattern"].format(page_num=current_iteration)
+                print(f"  Navegando a la página {current_iteration} de {config['company_name']}")
+            site_metrics.iterations[-1]['url'] = url_to_scrape
+            navigate = True
+
+        elif pagination_config and pagination_config["type"] == "click" and current_iteration > 1:
+            print(f"  Procesando página {current_iteration} de {config['company_name']} (después de hacer clic en 'Siguiente').")
+
+        elif pagination_config and pagination_config["type"] == "scroll" and current_iteration > 1:
+            print(f"  Realizando scroll #{current_iteration-1} para {config['company_name']}")
+
+            # Se espera a que lleguen tarjetas nuevas (o crezca la página), como mucho "scroll_delay" segundos
+            scroll_timeout = extractor.wait_timeout('scroll', pagination_config.get("scroll_delay", 3))
+            try:
+                with scheduler.request(base_url) as waited:
+                    site_metrics.add('sleep', waited)
+                    with site_metrics.timed('navigation'):
+                        listing_state = get_listing_state(driver, config["job_listing_selector"])
+                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                with site_metrics.timed_wait('scroll', scroll_timeout):
+                    wait_for_listing_change(driver, config["job_listing_selector"], listing_state, scroll_timeout, grow=True)
+            except TimeoutException:
+                print("  No se cargó contenido nuevo después del scroll. Asumiendo fin de resultados o página.")
+                break
+
+        elif not pagination_config or (pagination_config["type"] != "url" and current_iteration == 1):
+            print(f"  Navegando a la página 1 de {config['company_name']} (URL: {base_url})")
+            navigate = True
+
+        page_key = extractor.page_key(url_to_scrape, current_iteration)
+
+        try:
+            if navigate and fetch_mode == "http":
+                cached_page = extractor.page_cache.get(page_key) if page_key else None
+                with scheduler.request(url_to_scrape) as waited:
+                    site_metrics.add('sleep', waited)
+                    with site_metrics.timed('navigation'):
+                        html, validators = fetch_page_http(url_to_scrape, cached_page and cached_page['validators'])
+                if html is _PAGE_NOT_MODIFIED:
+                    cached_job_ids = extractor.cached_job_ids(page_key, None, registry)
+                    if cached_job_ids is None:
+                        # 304, pero la página tiene trabajos que ya no están en el registro: se descarga completa
+                        with scheduler.request(url_to_scrape) as waited:
+                            site_metrics.add('sleep', waited)
+                            with site_metrics.timed('navigation'):
+                                html, validators = fetch_page_http(url_to_scrape)
+                if html is None:
+                    scheduler.backoff(url_to_scrape, "error HTTP")
+                if cached_job_ids is None:
+                    with site_metrics.timed('parse'):
+                        job_listings = extractor.cards_from_html(html) if html else []
+                        # La huella es la de los campos de las tarjetas, no la del HTML completo: los tokens,
+                        # nonces o fechas de render del resto de la página no invalidan la caché
+                        if page_key and job_listings:
+                            fingerprint = extractor.fingerprint(json.dumps(job_listings, sort_keys=True, default=str))
+                    if fingerprint:
+                        cached_job_ids = extractor.cached_job_ids(page_key, fingerprint, registry)
+                if job_listings or cached_job_ids is not None:
+                    http_verified = True
+                elif not http_verified:
+                    # El sitio no devolvió las tarjetas en el HTML crudo: el resto del sitio va por navegador
+                    print(f"  Sin resultados vía HTTP en {url_to_scrape}. Recurriendo al navegador para {config['company_name']}.")
+                    fetch_mode = "browser"
+                    job_listings = None
+
+            if navigate and fetch_mode == "browser":
+                if driver is None:
+                    with site_metrics.timed('browser_start'):
+                        driver = browser.get(extractor)
+                with scheduler.request(url_to_scrape) as waited:
+                    site_metrics.add('sleep', waited)
+                    with site_metrics.timed('navigation'):
+                        driver.get(url_to_scrape)
+
+            if job_listings is None and cached_job_ids is None:
+                # Sitios que muestran los listados dentro de un iframe (ej. iCIMS: "iframe_selector": "#icims_content_iframe")
+                if extractor.iframe_selector:
+                    iframe_selector = extractor.iframe_selector
+                    print(f"  Intentando cambiar al iframe '{iframe_selector}' de {config['company_name']}...")
+                    try:
+                        iframe_element = wait_for_page_element(driver, extractor, site_metrics, 'iframe', iframe_selector,
+                                                               retry=current_iteration == first_iteration)
+                        driver.switch_to.frame(iframe_element)
+                        print(f"  Cambiado a contexto de iframe para {config['company_name']}.")
+                    except TimeoutException:
+                        raise # Como el del listado: se decide al final de la iteración
+                    except NoSuchElementException as e:
+                        print(f"  Error al encontrar o cambiar a iframe '{iframe_selector}' para {config['company_name']}: {e}. Saltando sitio.")
+                        driver.switch_to.default_content()
+                        site_failed = True
+                        break
+                    except Exception as e:
+                        print(f"  Ocurrió un error inesperado con el iframe para {config['company_name']}: {e}. Saltando sitio.")
+                        driver.switch_to.default_content()
+                        site_failed = True
+                        break
+
+                wait_for_page_element(driver, extractor, site_metrics, 'listing', config["job_listing_selector"],
+                                      retry=current_iteration == first_iteration)
+                with site_metrics.timed('wait'):
+                    wait_for_listing_settled(driver, config["job_listing_selector"])
+
+                if page_key:
+                    with site_metrics.timed('parse'):
+                        fingerprint = extractor.fingerprint(driver.execute_script(LISTING_FINGERPRINT_SCRIPT, config["job_listing_selector"]))
+                    cached_job_ids = extractor.cached_job_ids(page_key, fingerprint, registry)
+                if cached_job_ids is None:
+                    with site_metrics.timed('parse'):
+                        job_listings = extract_cards_from_driver(driver, extractor, only_new=extractor.accumulates)
+
+            if cached_job_ids is None and not job_listings:
+                if extractor.accumulates and current_iteration > 1:
+                    print(f"  Advertencia: No se agregaron tarjetas nuevas en {url_to_scrape} (Iteración {current_iteration}).")
+                else:
+                    print(f"  Advertencia: No se encontraron elementos con el selector '{config['job_listing_selector']}' en {url_to_scrape} (Iteración {current_iteration}).")
+                consecutive_empty_pages += 1
+                if consecutive_empty_pages >= 2: # Si dos páginas consecutivas están vacías, salimos
+                    print(f"  Dos páginas consecutivas sin resultados para {config['company_name']}. Deteniendo la paginación.")
+                    break
+                # Si solo una página está vacía, intentamos la siguiente por si es un error temporal o si hay paginación no lineal
+                current_iteration += 1 # Incrementar incluso si no hay job_listings para intentar la siguiente página/clic
+                continue # Salta al siguiente bucle while
+
+            page_new_jobs = []
+            if cached_job_ids is not None:
+                # La página no cambió: sus trabajos ya son conocidos y no hace falta volver a leer las tarjetas
+                card_count = len(cached_job_ids)
+                site_metrics.page_cached()
+                print(f"  Página sin cambios desde la ejecución anterior ({card_count} trabajos conocidos).")
+            else:
+                page_job_ids = []
+                with site_metrics.timed('extract'):
+                    for card in job_listings:
+                        title, link, location = extractor.parse_card(card)
+
+                        job = make_job_record(config["company_name"], title, link, location)
+                        page_job_ids.append(job['job_id'])
+
+                        if registry.add_if_new(job['job_id']):
+                            page_new_jobs.append(job)
+                card_count = len(job_listings)
+                if fingerprint:
+                    extractor.remember_page(page_key, fingerprint, page_job_ids, validators)
+            found_count_page = len(page_new_jobs)
+            site_metrics.count(card_count, found_count_page)
+            if checkpoint:
+                checkpoint.record_page(base_url, current_iteration, current_iteration + 1, page_new_jobs)
+            emit(page_new_jobs)
+
+            print(f"  Se encontraron {found_count_page} TRABAJOS NUEVOS en la iteración {current_iteration}.")
+
+            # Resetear el contador de páginas vacías si se encontraron trabajos
+            if found_count_page > 0 or current_iteration < resume_page:
+                consecutive_empty_pages = 0
+                consecutive_known_pages = 0
+            else:
+                consecutive_known_pages += 1 # La página tenía tarjetas, pero todas ya conocidas
+
+            if stop_after_known_pages and consecutive_known_pages >= stop_after_known_pages:
+                print(f"  {consecutive_known_pages} página(s) seguidas solo con trabajos conocidos para {config['company_name']}. Deteniendo la paginación (modo incremental).")
+                break
+
+            if pagination_config and pagination_config["type"] == "click":
+                next_button = None
+                try:
+                    next_button_timeout = extractor.wait_timeout('next_button')
+                    with site_metrics.timed_wait('next_button', next_button_timeout):
+                        next_button = wait_for_element(driver, pagination_config["next_page_selector"], clickable=True,
+                                                       timeout=next_button_timeout)
+                    with scheduler.request(base_url) as waited:
+                        site_metrics.add('sleep', waited)
+                        with site_metrics.timed('navigation'):
+                            listing_state = get_listing_state(driver, config["job_listing_selector"])
+                            driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
+                            driver.execute_script("arguments[0].click();", next_button) # Clic con JavaScript
+                    # En lugar de una pausa fija, se espera a que cambie el listado (cantidad o primera tarjeta)
+                    next_page_timeout = extractor.wait_timeout('next_page')
+                    try:
+                        with site_metrics.timed_wait('next_page', next_page_timeout):
+                            wait_for_listing_change(driver, config["job_listing_selector"], listing_state,
+                                                    next_page_timeout)
+                    except TimeoutException:
+                        print(f"  El listado no cambió después de hacer clic en 'Siguiente' en la iteración {current_iteration}. Asumiendo que no hay más páginas.")
+                        break
+                    current_iteration += 1
+                except (TimeoutException, NoSuchElementException) as e:
+                    print(f"  No se pudo encontrar o hacer clic en el botón 'Siguiente' en la iteración {current_iteration}: {e}. Asumiendo que no hay más páginas.")
+                    break
+                except Exception as e:
+                    print(f"  Ocurrió un error inesperado al hacer clic en 'Siguiente' en la iteración {current_iteration}: {e}. Deteniendo el scraping para este sitio.")
+                    break
+
+            elif pagination_config and pagination_config["type"] == "url":
+                current_iteration += 1
+
+            elif pagination_config and pagination_config["type"] == "scroll":
+                current_iteration += 1
+
+            else:
+                break
+
+        except TimeoutException as e:
+            if current_iteration == first_iteration:
+                # Ni con WAIT_TIMEOUT_MAX apareció el listado: el sitio no se marca como terminado
+                print(f"  Tiempo de espera agotado para el elemento en {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
+                site_failed = True
+            else:
+                print(f"  No apareció el listado en {url_to_scrape} (Iteración {current_iteration}). Asumiendo que no hay más páginas.")
+            break
+        except WebDriverException as e:
+            print(f"  Error de WebDriver en {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
+            site_failed = True
+            break
+        except Exception as e:
+            print(f"  Ocurrió un error inesperado al procesar {url_to_scrape} (Iteración {current_iteration}): {e}. Saltando sitio.")
+            site_failed = True
+            break
+
+        finally:
+            if extractor.iframe_selector and driver is not None:
+                try:
+                    driver.switch_to.default_content()
+                    print(f"  Volviendo al contenido principal para {config['company_name']}.")
+                except Exception as e:
+                    print(f"  Error al intentar volver al contenido predeterminado: {e}")
+
+    # Un sitio que falló no se marca como terminado: --resume lo retoma desde la última página registrada
+    if checkpoint and not site_failed:
+        checkpoint.record_site_done(base_url)
+    return site_new_jobs
+
+def iter_new_jobs(job_index, max_workers=MAX_WORKERS, full_crawl=False, metrics=None, checkpoint=None, resume=False,
+                  site_configs=None, browsers=None, scheduler=None):
+    """
+    Rastrea todos los sitios de SITE_CONFIGS con un pool de navegadores Chrome y
+    devuelve los trabajos nuevos a medida que se encuentran, página a página.
+    Los sitios se agrupan por host (ver get_host_key) y cada grupo se procesa en
+    un único worker, de modo que dos sitios del mismo servidor nunca se rastrean
+    a la vez. La deduplicación contra el historial se hace en un JobIdRegistry
+    compartido, cargado desde el índice SQLite. Al agotar el generador se actualiza
+    la fecha 'last_seen' de todas las ofertas vistas en la ejecución.
+    Salvo que toque un rastreo completo (forzado, o porque pasaron FULL_CRAWL_EVERY_DAYS
+    desde el último), los sitios se rastrean en modo incremental.
+    El avance se registra página a página en un RunCheckpoint; con resume=True se
+    retoma la ejecución interrumpida: los sitios terminados se saltan, los trabajos
+    ya recogidos se recuperan y la paginación sigue donde se quedó.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        max_workers (int): Número máximo de navegadores simultáneos (1 = secuencial).
+        full_crawl (bool): Si es True, recorre todas las páginas sin parada temprana.
+        metrics (RunMetrics, optional): Donde se registran los tiempos de cada sitio.
+        checkpoint (RunCheckpoint, optional): Punto de control de la ejecución (por defecto CHECKPOINT_FILE).
+        resume (bool): Si es True, retoma el punto de control de una ejecución interrumpida.
+        site_configs (dict, optional): Sitios a rastrear (por defecto todo SITE_CONFIGS). El
+            rastreo completo solo se registra como hecho si se rastrearon todos los sitios.
+        browsers (list, optional): BrowserHandle que se reutilizan, uno por worker (modo daemon).
+        scheduler (HostScheduler, optional): Planificador de cortesía (por defecto uno nuevo).
+    Yields:
+        dict: Cada trabajo nuevo (ver make_job_record), en el orden en que los workers lo encuentran.
+    Returns:
+        set or JobIdSet: Al agotarse (StopIteration.value), todos los IDs registrados.
+    """
+    metrics = metrics or RunMetrics()
+    checkpoint = checkpoint or RunCheckpoint()
+    scheduler = scheduler or HostScheduler()
+    site_configs = site_configs or SITE_CONFIGS
+    # Al inicio, carga los IDs de los trabajos existentes desde el índice SQLite
+    if job_index.is_empty() and os.path.exists(OUTPUT_FILE):
+        migrate_excel_to_index(job_index)
+    if JOB_ID_DIGEST_BITS:
+        existing_job_ids = JobIdSet(job_index.load_job_digests())
+        print(f"Cargados {len(existing_job_ids)} IDs de trabajos existentes del índice '{job_index.path}' "
+              f"({existing_job_ids.nbytes / 1024 ** 2:.1f} MB en digests de {JOB_ID_DIGEST_BITS} bits).")
+    else:
+        existing_job_ids = job_index.load_job_ids()
+        print(f"Cargados {len(existing_job_ids)} IDs de trabajos existentes del índice '{job_index.path}'.")
+
+    registry = JobIdRegistry(existing_job_ids)
+
+    if resume and not checkpoint.load():
+        print(f"No hay un punto de control en '{checkpoint.path}'. Se inicia una ejecución nueva.")
+        resume = False
+    if resume:
+        # Se mantiene el modo de la ejecución interrumpida
+        full_crawl = checkpoint.crawl_mode == "full"
+    else:
+        full_crawl = full_crawl or job_index.is_full_crawl_due()
+    crawl_started_at = datetime.now()
+    print("Modo de rastreo: completo." if full_crawl else "Modo de rastreo: incremental.")
+    checkpoint.start("full" if full_crawl else "incremental", resume=resume)
+
+    # Trabajos recogidos antes de la interrupción; si ya están en el índice (la ejecución
+    # llegó a guardarlos), no se recuperan
+    recovered_jobs = []
+    for base_url in site_configs:
+        recovered_jobs.extend(job for job in checkpoint.jobs_for(base_url) if registry.add_if_new(job['job_id']))
+    if resume:
+        done_sites = sum(checkpoint.is_site_done(base_url) for base_url in site_configs)
+        print(f"Retomando la ejecución interrumpida: {done_sites} sitio(s) terminados, {len(recovered_jobs)} trabajos nuevos recuperados.")
+    yield from recovered_jobs
+
+    pending_extractors = [extractor for extractor in compile_site_extractors(site_configs) if not checkpoint.is_site_done(extractor.base_url)]
+    # Timeouts de espera aprendidos en ejecuciones anteriores (se leen aquí: la conexión SQLite es de este hilo)
+    wait_timeouts = job_index.load_wait_timeouts()
+    page_cache = job_index.load_page_cache() if PAGE_CACHE else {}
+    for extractor in pending_extractors:
+        extractor.wait_timeouts = {kind: timeout for (site, kind), timeout in wait_timeouts.items() if site == extractor.base_url}
+        extractor.page_cache = page_cache.get(extractor.base_url, {})
+    site_groups = group_sites_by_host(pending_extractors)
+    group_queue = queue.Queue()
+    for sites in site_groups:
+        group_queue.put(sites)
+
+    num_workers = max(1, min(max_workers if browsers is None else len(browsers), len(site_groups)))
+    metrics.crawl_mode = "full" if full_crawl else "incremental"
+    metrics.workers = num_workers
+    print(f"Iniciando pool de {num_workers} navegador(es) para {len(pending_extractors)} sitios en {len(site_groups)} grupos de host.")
+
+    # Los workers dejan cada página en job_queue; este hilo la reparte al consumidor del generador
+    job_queue = queue.Queue()
+    processed_sites = set()
+
+    def emit(jobs):
+        for job in jobs:
+            job_queue.put(job)
+
+    def run_worker(worker_num):
+        try:
+            _pool_worker(worker_num, group_queue, registry, emit, processed_sites, not full_crawl, metrics, checkpoint, scheduler,
+                         browsers[worker_num - 1] if browsers else None)
+        finally:
+            job_queue.put(_WORKER_DONE)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(run_worker, worker_num) for worker_num in range(1, num_workers + 1)]
+        finished_workers = 0
+        try:
+            while finished_workers < num_workers:
+                job = job_queue.get()
+                if job is _WORKER_DONE:
+                    finished_workers += 1
+                    continue
+                yield job
+        except BaseException:
+            # El consumidor dejó de leer, falló o se pulsó Ctrl-C: se vacía la cola de grupos para que los
+            # workers terminen con el sitio en curso en lugar de rastrear todos los que faltan
+            print("Ejecución detenida. Los workers terminan el sitio en curso.")
+            while True:
+                try:
+                    group_queue.get_nowait()
+                except queue.Empty:
+                    break
+            raise
+
+    # Errores del propio worker, fuera de un sitio (ej. al cerrar el navegador): se muestran en lugar de perderse
+    for worker_num, future in enumerate(futures, 1):
+        error = future.exception()
+        if error is not None:
+            print(f"Advertencia: el worker {worker_num} terminó con un error: {error!r}")
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+    for extractor in pending_extractors:
+        if extractor.base_url not in processed_sites:
+            print(f"Advertencia: el sitio {extractor.company_name} no terminó de procesarse (ver los errores anteriores).")
+
+    metrics.hosts = scheduler.snapshot()
+    job_index.touch(registry.seen)
+    job_index.add_wait_samples(
+        (site_metrics.base_url, kind, seconds)
+        for site_metrics in metrics.sites.values()
+        for kind, seconds in site_metrics.wait_samples
+    )
+    job_index.save_page_cache(
+        (extractor.base_url, page_key, entry)
+        for extractor in pending_extractors
+        for page_key, entry in extractor.page_cache_updates.items()
+    )
+    if full_crawl and set(site_configs) >= set(SITE_CONFIGS):
+        job_index.set_meta('last_full_crawl', crawl_started_at.strftime('%Y-%m-%d %H:%M:%S'))
+
+    return registry.ids
+
+def scrape_jobs(job_index, max_workers=MAX_WORKERS, full_crawl=False, metrics=None, checkpoint=None, resume=False):
+    """
+    Versión no incremental de iter_new_jobs: rastrea todos los sitios y devuelve
+    la lista completa de trabajos nuevos al final. Acepta los mismos argumentos.
+    Returns:
+        tuple: (lista de trabajos nuevos, conjunto de todos los IDs vistos).
+    """
+    stream = iter_new_jobs(job_index, max_workers, full_crawl, metrics, checkpoint, resume)
+    all_new_jobs = []
+    while True:
+        try:
+            all_new_jobs.append(next(stream))
+        except StopIteration as finished:
+            return all_new_jobs, finished.value
+
+# --- Job Index (SQLite) ---
+
+class JobIndex:
+    """
+    Índice persistente de ofertas en SQLite con clave job_id y fechas de primera
+    y última aparición. Es la fuente de verdad para la deduplicación; OUTPUT_FILE
+    es una exportación generada a partir de él.
+    Args:
+        path (str): Ruta del archivo SQLite.
+    """
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                empresa TEXT,
+                puesto TEXT,
+                link TEXT,
+                ubicacion TEXT,
+                fecha_registro TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                id_digest BLOB,
+                duplicate_of TEXT
+            )
+        """)
+        self._migrate_id_digests()
+        # Casi duplicados descartados con NEAR_DUP_ACTION = "merge": siguen en el historial, fuera del Excel
+        if 'duplicate_of' not in [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN duplicate_of TEXT")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS wait_samples (
+                site TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                recorded_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS wait_samples_site_kind ON wait_samples (site, kind)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS near_dup_postings (
+                job_id TEXT PRIMARY KEY,
+                company_group TEXT NOT NULL,
+                title_norm TEXT NOT NULL,
+                location_norm TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS near_dup_buckets (
+                company_group TEXT NOT NULL,
+                band_key INTEGER NOT NULL,
+                job_id TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS near_dup_buckets_key ON near_dup_buckets (company_group, band_key)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS near_duplicates (
+                job_id TEXT PRIMARY KEY,
+                duplicate_of TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                action TEXT NOT NULL,
+                detected_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache (
+                page_key TEXT PRIMARY KEY,
+                base_url TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                job_ids TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS job_details (
+                job_id TEXT PRIMARY KEY,
+                {', '.join(f'{column} TEXT' for column in DETAIL_COLUMNS.values())},
+                fetched_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS site_schedule (
+                site TEXT PRIMARY KEY,
+                new_jobs_per_hour REAL,
+                interval_s REAL NOT NULL,
+                last_run_at TEXT NOT NULL,
+                next_run_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def _migrate_id_digests(self):
+        """
+        Completa la columna id_digest (ver job_id_digest) en índices creados antes de
+        que existiera, o cuyos digests tienen otro ancho que JOB_ID_DIGEST_BITS.
+        Se hace una sola vez, por lotes, a partir de los job_id guardados.
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+        if 'id_digest' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN id_digest BLOB")
+        if not JOB_ID_DIGEST_BITS:
+            return
+        width = JOB_ID_DIGEST_BITS // 8
+        pending = self.conn.execute(
+            "SELECT rowid, job_id FROM jobs WHERE id_digest IS NULL OR length(id_digest) != ?", (width,)
+        ).fetchall()
+        if not pending:
+            return
+        print(f"Calculando digests de {JOB_ID_DIGEST_BITS} bits para {len(pending)} trabajos del índice '{self.path}'...")
+        with self.conn:
+            for start in range(0, len(pending), 10000):
+                self.conn.executemany(
+                    "UPDATE jobs SET id_digest = ? WHERE rowid = ?",
+                    ((job_id_digest(job_id), rowid) for rowid, job_id in pending[start:start + 10000])
+                )
+
+    def is_empty(self):
+        """
+        Returns:
+            bool: True si el índice no tiene ninguna oferta.
+        """
+        return self.conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is None
+
+    def load_job_ids(self):
+        """
+        Lee todos los job_id del índice (un único recorrido de la clave primaria).
+        Returns:
+            set: Conjunto de IDs conocidos.
+        """
+        return {row[0] for row in self.conn.execute("SELECT job_id FROM jobs")}
+
+    def load_job_digests(self):
+        """
+        Lee los digests de todos los job_id (ver job_id_digest), sin cargar las cadenas.
+        Returns:
+            numpy.ndarray: Un digest de JOB_ID_DIGEST_BITS // 8 bytes por oferta.
+        """
+        import numpy as np
+        raw = b''.join(row[0] for row in self.conn.execute("SELECT id_digest FROM jobs"))
+        return np.frombuffer(raw, dtype=f'S{JOB_ID_DIGEST_BITS // 8}')
+
+    def add_jobs(self, jobs):
+        """
+        Inserta ofertas en el índice, ignorando las que ya existen.
+        Args:
+            jobs (iterable): Registros con las columnas del Excel ('Empresa', 'Puesto', ..., 'job_id') y,
+                para los casi duplicados descartados, 'duplicate_of' (ver NearDuplicateIndex).
+        Returns:
+            int: Número de ofertas insertadas.
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for job in jobs:
+            fecha_registro = _sql_value(job.get('Fecha de Registro')) or now
+            job_id = str(job['job_id'])
+            rows.append((
+                job_id,
+                _sql_value(job.get('Empresa')),
+                _sql_value(job.get('Puesto')),
+                _sql_value(job.get('Link de Aplicación')),
+                _sql_value(job.get('Ubicacion')),
+                fecha_registro,
+                fecha_registro,
+                fecha_registro,
+                job_id_digest(job_id) if JOB_ID_DIGEST_BITS else None,
+                _sql_value(job.get('duplicate_of'))
+            ))
+        changes_before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO jobs (job_id, empresa, puesto, link, ubicacion, fecha_registro, first_seen, last_seen, id_digest, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        return self.conn.total_changes - changes_before
+
+    def touch(self, job_ids):
+        """
+        Actualiza la fecha 'last_seen' de las ofertas vistas en la ejecución actual.
+        Args:
+            job_ids (iterable): IDs vistos en la ejecución.
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.conn:
+            self.conn.executemany("UPDATE jobs SET last_seen = ? WHERE job_id = ?", ((now, job_id) for job_id in job_ids))
+
+    def get_meta(self, key):
+        """
+        Args:
+            key (str): Clave del metadato.
+        Returns:
+            str or None: El valor guardado, o None si no existe.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """
+        Guarda un metadato de la ejecución (ej. la fecha del último rastreo completo).
+        Args:
+            key (str): Clave del metadato.
+            value (str): Valor a guardar.
+        """
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def add_wait_samples(self, samples):
+        """
+        Guarda la duración de las esperas exitosas de la ejecución y conserva solo
+        las últimas WAIT_HISTORY_SAMPLES por sitio y tipo de espera.
+        Args:
+            samples (iterable): Tuplas (base_url del sitio, tipo de espera, segundos).
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = [(site, kind, seconds, now) for site, kind, seconds in samples]
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT INTO wait_samples VALUES (?, ?, ?, ?)", rows)
+            for site, kind in {(row[0], row[1]) for row in rows}:
+                self.conn.execute(
+                    """
+                    DELETE FROM wait_samples WHERE site = ? AND kind = ? AND rowid NOT IN (
+                        SELECT rowid FROM wait_samples WHERE site = ? AND kind = ? ORDER BY rowid DESC LIMIT ?
+                    )
+                    """,
+                    (site, kind, site, kind, WAIT_HISTORY_SAMPLES)
+                )
+
+    def load_wait_timeouts(self):
+        """
+        Calcula el timeout de cada espera a partir del historial: el percentil 95 de
+        las esperas (las agotadas cuentan con su timeout) por WAIT_TIMEOUT_MARGIN (más
+        un margen fijo de 2 s), acotado entre WAIT_TIMEOUT_MIN y WAIT_TIMEOUT_MAX. Las esperas con menos de
+        WAIT_MIN_SAMPLES muestras no aparecen (se usa el timeout por defecto).
+        Returns:
+            dict: {(base_url del sitio, tipo de espera): segundos}.
+        """
+        samples = {}
+        for site, kind, seconds in self.conn.execute("SELECT site, kind, seconds FROM wait_samples"):
+            samples.setdefault((site, kind), []).append(seconds)
+        timeouts = {}
+        for key, values in samples.items():
+            if len(values) < WAIT_MIN_SAMPLES:
+                continue
+            values.sort()
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            timeouts[key] = min(WAIT_TIMEOUT_MAX, max(WAIT_TIMEOUT_MIN, p95 * WAIT_TIMEOUT_MARGIN + 2))
+        return timeouts
+
+    def add_near_dup_postings(self, postings):
+        """
+        Agrega ofertas al índice de similitud (ver NearDuplicateIndex).
+        Args:
+            postings (iterable): Tuplas (job_id, grupo de empresa, título normalizado,
+                ubicación normalizada, claves de banda LSH).
+        """
+        postings = list(postings)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO near_dup_postings VALUES (?, ?, ?, ?)",
+                (posting[:4] for posting in postings)
+            )
+            self.conn.executemany(
+                "INSERT INTO near_dup_buckets VALUES (?, ?, ?)",
+                ((company_group, band_key, job_id) for job_id, company_group, _, _, band_keys in postings for band_key in band_keys)
+            )
+
+    def find_near_dup_candidates(self, company_group, band_keys):
+        """
+        Args:
+            company_group (str): Grupo de empresa (ver get_company_group).
+            band_keys (list): Claves de banda LSH de la oferta.
+        Returns:
+            list: (job_id, título normalizado, ubicación normalizada) de las ofertas del
+                  grupo que comparten alguna banda.
+        """
+        placeholders = ', '.join('?' * len(band_keys))
+        return self.conn.execute(
+            f"""
+            SELECT p.job_id, p.title_norm, p.location_norm FROM near_dup_postings p
+            WHERE p.job_id IN (
+                SELECT job_id FROM near_dup_buckets WHERE company_group = ? AND band_key IN ({placeholders})
+            )
+            """,
+            (company_group, *band_keys)
+        ).fetchall()
+
+    def jobs_missing_near_dup_index(self):
+        """
+        Returns:
+            list: (job_id, empresa, puesto, ubicacion) de las ofertas que todavía no están
+                  en el índice de similitud (historial anterior a la detección, o guardado sin ella).
+        """
+        return self.conn.execute(
+            """
+            SELECT j.job_id, j.empresa, j.puesto, j.ubicacion FROM jobs j
+            LEFT JOIN near_dup_postings p ON p.job_id = j.job_id
+            WHERE p.job_id IS NULL AND j.duplicate_of IS NULL
+            """
+        ).fetchall()
+
+    def record_near_duplicate(self, job_id, duplicate_of, similarity, action):
+        """
+        Registra una oferta detectada como casi duplicado de otra.
+        Args:
+            job_id (str): La oferta nueva.
+            duplicate_of (str): La oferta del historial a la que se parece.
+            similarity (float): Similitud de los títulos (Jaccard de trigramas).
+            action (str): "flag" o "merge" (ver NEAR_DUP_ACTION).
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO near_duplicates VALUES (?, ?, ?, ?, ?)",
+                (job_id, duplicate_of, similarity, action, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+
+    def load_page_cache(self):
+        """
+        Returns:
+            dict: URL base del sitio -> {clave de página -> {'fingerprint', 'job_ids', 'validators'}}
+                  (ver SiteExtractor.page_key).
+        """
+        page_cache = {}
+        rows = self.conn.execute("SELECT base_url, page_key, fingerprint, etag, last_modified, job_ids FROM page_cache")
+        for base_url, page_key, fingerprint, etag, last_modified, job_ids in rows:
+            validators = {key: value for key, value in (('etag', etag), ('last_modified', last_modified)) if value}
+            page_cache.setdefault(base_url, {})[page_key] = {
+                'fingerprint': fingerprint, 'job_ids': json.loads(job_ids), 'validators': validators,
+            }
+        return page_cache
+
+    def save_page_cache(self, entries):
+        """
+        Guarda las páginas procesadas en la ejecución, reemplazando su entrada anterior.
+        Args:
+            entries (iterable): Tuplas (URL base del sitio, clave de página, entrada).
+        """
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((page_key, base_url, entry['fingerprint'], entry['validators'].get('etag'), entry['validators'].get('last_modified'),
+                  json.dumps(entry['job_ids']), updated_at)
+                 for base_url, page_key, entry in entries)
+            )
+
+    def get_job_details(self, job_id):
+        """
+        Args:
+            job_id (str): El job_id de la oferta.
+        Returns:
+            dict or None: Los detalles guardados (columnas de DETAIL_COLUMNS), o None si la
+                          página de detalle todavía no se descargó.
+        """
+        row = self.conn.execute(
+            f"SELECT {', '.join(DETAIL_COLUMNS.values())} FROM job_details WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return dict(zip(DETAIL_COLUMNS, row)) if row else None
+
+    def add_job_details(self, details_by_job):
+        """
+        Guarda los detalles descargados, para no volver a pedir la misma página de detalle.
+        Args:
+            details_by_job (dict): job_id -> detalles (ver extract_job_details).
+        """
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        placeholders = ', '.join('?' * (len(DETAIL_COLUMNS) + 2))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO job_details VALUES ({placeholders})",
+                ((job_id, *(details.get(column, '') for column in DETAIL_COLUMNS), fetched_at)
+                 for job_id, details in details_by_job.items())
+            )
+
+    def merge_job_details(self, df):
+        """
+        Agrega las DETAIL_COLUMNS guardadas a un DataFrame de ofertas. Si nunca se
+        descargaron detalles (ver ENRICH_DETAILS), el DataFrame se devuelve igual.
+        Args:
+            df (pd.DataFrame): Ofertas con columna 'job_id'.
+        Returns:
+            pd.DataFrame: Las mismas ofertas, con las columnas de detalle.
+        """
+        import pandas as pd
+        if self.conn.execute("SELECT 1 FROM job_details LIMIT 1").fetchone() is None:
+            return df
+        columns = ', '.join(f'{sql_column} AS "{column}"' for column, sql_column in DETAIL_COLUMNS.items())
+        details_df = pd.read_sql_query(f"SELECT job_id, {columns} FROM job_details", self.conn)
+        return df.drop(columns=[column for column in DETAIL_COLUMNS if column in df.columns]).merge(details_df, on='job_id', how='left')
+
+    def load_site_schedule(self):
+        """
+        Returns:
+            dict: {base_url: {'new_jobs_per_hour', 'interval_s', 'last_run_at', 'next_run_at'}}
+                  con las fechas como datetime (ver update_site_refresh).
+        """
+        schedule = {}
+        for site, rate, interval_s, last_run_at, next_run_at in self.conn.execute("SELECT * FROM site_schedule"):
+            schedule[site] = {
+                'new_jobs_per_hour': rate,
+                'interval_s': interval_s,
+                'last_run_at': datetime.strptime(last_run_at, '%Y-%m-%d %H:%M:%S'),
+                'next_run_at': datetime.strptime(next_run_at, '%Y-%m-%d %H:%M:%S'),
+            }
+        return schedule
+
+    def set_site_schedule(self, site, new_jobs_per_hour, interval_s, last_run_at, next_run_at):
+        """
+        Guarda el ritmo de publicación estimado de un sitio y su próxima revisión.
+        Args:
+            site (str): La URL del sitio (clave de SITE_CONFIGS).
+            new_jobs_per_hour (float or None): Trabajos nuevos por hora estimados (None = sin estimar).
+            interval_s (float): Segundos entre revisiones.
+            last_run_at (datetime): Fin de la última revisión.
+            next_run_at (datetime): Fecha de la próxima revisión.
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO site_schedule VALUES (?, ?, ?, ?, ?)",
+                (site, new_jobs_per_hour, interval_s,
+                 last_run_at.strftime('%Y-%m-%d %H:%M:%S'), next_run_at.strftime('%Y-%m-%d %H:%M:%S'))
+            )
+
+    def is_full_crawl_due(self):
+        """
+        Returns:
+            bool: True si nunca se hizo un rastreo completo o si pasaron
+                  FULL_CRAWL_EVERY_DAYS días desde el último.
+        """
+        last_full_crawl = self.get_meta('last_full_crawl')
+        if last_full_crawl is None:
+            return True
+        elapsed = datetime.now() - datetime.strptime(last_full_crawl, '%Y-%m-%d %H:%M:%S')
+        return elapsed.total_seconds() >= FULL_CRAWL_EVERY_DAYS * 86400
+
+    def to_dataframe(self):
+        """
+        Exporta el índice con las columnas que el script gestiona en el Excel (y las de
+        detalle, si se descargaron), sin los casi duplicados descartados.
+        Returns:
+            pd.DataFrame: Todas las ofertas, en orden de inserción.
+        """
+        import pandas as pd
+        return self.merge_job_details(pd.read_sql_query(
+            """
+            SELECT empresa AS "Empresa", puesto AS "Puesto", link AS "Link de Aplicación",
+                   ubicacion AS "Ubicacion", fecha_registro AS "Fecha de Registro", job_id
+            FROM jobs WHERE duplicate_of IS NULL ORDER BY rowid
+            """,
+            self.conn
+        ))
+
+    def close(self):
+        """Cierra la conexión con el archivo SQLite."""
+        self.conn.close()
+
+def _sql_value(value):
+    """
+    Convierte un valor de pandas en un valor apto para SQLite (NaN -> None).
+    Args:
+        value: El valor de la celda.
+    Returns:
+        str or None: El valor como cadena, o None si está vacío.
+    """
+    if _is_missing(value):
+        return None
+    return str(value)
+
+def get_stop_after_known_pages(config):
+    """
+    Número de páginas seguidas sin trabajos nuevos (pero con tarjetas) tras las que se
+    detiene la paginación en modo incremental. Se toma de "stop_after_known_pages" en
+    la paginación del sitio o, si no está, de STOP_AFTER_KNOWN_PAGES (0 = sin parada).
+    Args:
+        config (dict): La configuración del sitio.
+    Returns:
+        int: El umbral de páginas conocidas.
+    """
+    pagination_config = config.get("pagination") or {}
+    return pagination_config.get("stop_after_known_pages", STOP_AFTER_KNOWN_PAGES)
+
+def migrate_excel_to_index(job_index):
+    """
+    Importa al índice SQLite el historial de un ScrapJobs.xlsx existente.
+    Solo se ejecuta cuando el índice está vacío (primera ejecución con índice),
+    de modo que el Excel se lee completo una única vez.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas (vacío).
+    """
+    import pandas as pd
+    # Definir las columnas principales que el script siempre espera y gestiona
+    primary_columns = ['Empresa', 'Puesto', 'Link de Aplicación', 'Ubicacion', 'Fecha de Registro']
+
+    if os.path.exists(OUTPUT_FILE):
+        try:
+            # Lee el archivo Excel sin especificar 'job_id' para obtener todas las columnas existentes
+            existing_df = pd.read_excel(OUTPUT_FILE)
+            print(f"Cargado el archivo Excel existente con {len(existing_df)} registros.")
+
+            # Asegúrate de que las columnas principales estén presentes
+            for col in primary_columns:
+                if col not in existing_df.columns:
+                    existing_df[col] = '' # Añade la columna si falta, con valores vacíos
+
+            # Genera job_ids para los datos existentes si aún no están presentes
+            if 'job_id' not in existing_df.columns:
+                # Usa solo las columnas necesarias para generar el job_id
+                existing_df['job_id'] = generate_job_ids(existing_df)
+                print(f"Generada la columna 'job_id' para {len(existing_df[existing_df['job_id'].notna()])} registros existentes sin ella.")
+            
+            imported = job_index.add_jobs(existing_df.dropna(subset=['job_id']).to_dict('records'))
+            print(f"Migrados {imported} trabajos del archivo Excel al índice '{job_index.path}'.")
+            
+        except Exception as e:
+            print(f"Error al cargar o procesar el archivo Excel existente: {e}. Se comenzará con un historial vacío.")
+
+# --- Data Saving Functions ---
+
+# Columnas que el script gestiona y debe escribir para los nuevos registros
+SCRIPT_MANAGED_COLUMNS = ['Empresa', 'Puesto', 'Link de Aplicación', 'Ubicacion', 'Fecha de Registro', 'job_id']
+
+def count_journal_rows():
+    """
+    Returns:
+        int: Número de trabajos pendientes de pasar al Excel.
+    """
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+    with open(JOURNAL_FILE, 'rb') as journal:
+        return max(0, sum(1 for _ in journal) - 1) # Se descuenta la cabecera
+
+def should_compact_excel():
+    """
+    Decide si toca volcar el diario de pendientes al Excel: cuando el Excel no existe,
+    cuando el diario supera EXCEL_COMPACT_THRESHOLD filas o cuando el Excel tiene
+    más de EXCEL_COMPACT_MAX_AGE_HOURS horas sin actualizarse.
+    Returns:
+        bool: True si hay que compactar.
+    """
+    if not os.path.exists(OUTPUT_FILE):
+        return True
+    pending = count_journal_rows()
+    if pending == 0:
+        return False
+    if pending >= EXCEL_COMPACT_THRESHOLD:
+        return True
+    age_hours = (time.time() - os.path.getmtime(OUTPUT_FILE)) / 3600
+    return age_hours >= EXCEL_COMPACT_MAX_AGE_HOURS
+
+def compact_excel(job_index):
+    """
+    Vuelca el diario de pendientes al Excel, agregándolos a los datos existentes
+    y asegurando que no se añadan duplicados y se mantengan las columnas adicionales
+    y formatos. Si el Excel no existe, se regenera completo a partir del índice.
+    Al terminar, el diario se elimina.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas (fuente de verdad).
+    """
+    import pandas as pd
+    if not os.path.exists(OUTPUT_FILE):
+        # Sin Excel previo, la exportación se genera completa desde el índice
+        print("Creando un nuevo archivo Excel a partir del índice.")
+        output_df = job_index.to_dataframe()
+        writer = pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl')
+        output_df.to_excel(writer, index=False, sheet_name='Ofertas de Empleo')
+        writer.close()
+        if os.path.exists(JOURNAL_FILE):
+            os.remove(JOURNAL_FILE)
+        print(f"Hoja de cálculo de trabajos generada en '{OUTPUT_FILE}' con {len(output_df)} registros.")
+        return
+
+    pending_df = pd.read_csv(JOURNAL_FILE, dtype=str, encoding='utf-8') if os.path.exists(JOURNAL_FILE) else pd.DataFrame(columns=SCRIPT_MANAGED_COLUMNS)
+    # El diario solo tiene SCRIPT_MANAGED_COLUMNS; los detalles de cada oferta salen del índice
+    pending_df = job_index.merge_job_details(pending_df)
+
+    # 1. Cargar el DataFrame existente completo
+    try:
+        # Cargar todas las columnas existentes para preservar cualquier columna personalizada
+        existing_df_from_excel = pd.read_excel(OUTPUT_FILE, sheet_name='Ofertas de Empleo')
+        print(f"Cargado el archivo Excel existente con {len(existing_df_from_excel)} registros.")
+
+        # Asegúrate de que 'job_id' exista en el DataFrame existente para la deduplicación
+        if 'job_id' not in existing_df_from_excel.columns:
+            existing_df_from_excel['job_id'] = generate_job_ids(existing_df_from_excel)
+            print("Se generaron 'job_id' para registros existentes sin ellos.")
+        
+        existing_excel_job_ids = set(existing_df_from_excel['job_id'].dropna().tolist())
+
+    except Exception as e:
+        # No se sobrescribe un Excel que no se pudo leer: se perderían las columnas personalizadas
+        print(f"Error al cargar el archivo Excel existente: {e}. Los trabajos siguen pendientes en '{JOURNAL_FILE}'.")
+        return
+
+    # 2. Filtrar los pendientes para añadir solo los que no están ya en el Excel (usando job_id)
+    jobs_to_add_to_excel = pending_df[~pending_df['job_id'].isin(existing_excel_job_ids)].copy()
+
+    if jobs_to_add_to_excel.empty:
+        print("No hay trabajos pendientes para agregar al archivo Excel (ya están presentes o no se encontraron nuevos).")
+        if os.path.exists(JOURNAL_FILE):
+            os.remove(JOURNAL_FILE)
+        return
+
+    print(f"Se agregaron {len(jobs_to_add_to_excel)} trabajos pendientes al archivo Excel.")
+
+    # Asegurarse de que `jobs_to_add_to_excel` tenga todas las columnas del `existing_df_from_excel`
+    # para una concatenación limpia.
+    all_cols_in_excel = existing_df_from_excel.columns.tolist()
+    for col in jobs_to_add_to_excel.columns:
+        if col not in all_cols_in_excel:
+            all_cols_in_excel.append(col) # Añade las columnas nuevas si existen en jobs_to_add_to_excel
+
+    # Asegurarse de que `jobs_to_add_to_excel` tenga las columnas de `existing_df_from_excel` (con NaN si no tienen valor)
+    for col in all_cols_in_excel:
+        if col not in jobs_to_add_to_excel.columns:
+            jobs_to_add_to_excel[col] = pd.NA # Añade columnas faltantes con valores nulos
+
+    # Concatenar el DataFrame existente con los pendientes
+    output_df = pd.concat([existing_df_from_excel, jobs_to_add_to_excel[all_cols_in_excel]], ignore_index=True)
+
+    writer = pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl')
+    # Usar sheet_name='Ofertas de Empleo' para asegurar que siempre se escribe en la misma hoja
+    output_df.to_excel(writer, index=False, sheet_name='Ofertas de Empleo') 
+    writer.close()
+    os.remove(JOURNAL_FILE)
+    print(f"Hoja de cálculo de trabajos actualizada en '{OUTPUT_FILE}'.")
+
+# --- Job Pipeline ---
+
+def dedup_jobs(jobs):
+    """
+    Etapa del pipeline: descarta los trabajos cuyo job_id ya pasó por el pipeline.
+    El historial se filtra antes, en JobIdRegistry; esta etapa solo evita que un
+    mismo trabajo llegue dos veces a los sinks dentro de una ejecución.
+    Args:
+        jobs (iterable): Trabajos (diccionarios de make_job_record).
+    Yields:
+        dict: Cada trabajo, una sola vez.
+    """
+    seen_ids = set()
+    for job in jobs:
+        if job['job_id'] in seen_ids:
+            continue
+        seen_ids.add(job['job_id'])
+        yield job
+
+def normalize_jobs(jobs):
+    """
+    Etapa del pipeline: deja cada trabajo con exactamente SCRIPT_MANAGED_COLUMNS,
+    en ese orden y con los textos limpios (ver clean_text).
+    Args:
+        jobs (iterable): Trabajos (diccionarios de make_job_record).
+    Yields:
+        dict: Cada trabajo normalizado.
+    """
+    for job in jobs:
+        yield {column: clean_text(job.get(column)) for column in SCRIPT_MANAGED_COLUMNS}
+
+def normalize_for_matching(text):
+    """
+    Normaliza un texto para compararlo con otros: minúsculas, sin acentos y sin
+    puntuación, con los espacios colapsados.
+    Args:
+        text (str): El texto (título, ubicación o empresa).
+    Returns:
+        str: El texto normalizado.
+    """
+    text = unicodedata.normalize('NFKD', clean_text(text).lower())
+    text = ''.join(char if char.isalnum() else ' ' for char in text if not unicodedata.combining(char))
+    return ' '.join(text.split())
+
+def get_company_group(company):
+    """
+    Grupo de empresa dentro del que se buscan casi duplicados: el "company_group" de su
+    entrada en SITE_CONFIGS, o el nombre normalizado sin COMPANY_GROUP_STOPWORDS ni números
+    (ej. 'IQVIA WorkDay' -> 'iqvia', 'ICON plc 2' -> 'icon').
+    Args:
+        company (str): El nombre de la empresa ('Empresa').
+    Returns:
+        str: El grupo.
+    """
+    for config in SITE_CONFIGS.values():
+        if config["company_name"] == company and config.get("company_group"):
+            return config["company_group"]
+    words = [word for word in normalize_for_matching(company).split()
+             if word not in COMPANY_GROUP_STOPWORDS and not word.isdigit()]
+    return ' '.join(words) or normalize_for_matching(company)
+
+def title_shingles(title_norm):
+    """
+    Args:
+        title_norm (str): Título normalizado (ver normalize_for_matching).
+    Returns:
+        set: Trigramas de caracteres del título (el título entero si es más corto).
+    """
+    padded = f" {title_norm} "
+    return {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+
+# Números romanos de nivel ('Clinical Research Associate II')
+_ROMAN_NUMERALS = {'i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x'}
+
+def title_number_tokens(title_norm):
+    """
+    Args:
+        title_norm (str): Título normalizado (ver normalize_for_matching).
+    Returns:
+        list: Números y números romanos del título, ordenados. Dos títulos con números
+              distintos ('Associate I' / 'Associate II', 'Lead 1' / 'Lead 10') son ofertas
+              distintas aunque sus trigramas casi coincidan.
+    """
+    return sorted(token for token in title_norm.split() if token.isdigit() or token in _ROMAN_NUMERALS)
+
+def jaccard(first, second):
+    """Similitud de Jaccard de dos conjuntos (1.0 si ambos están vacíos)."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+class NearDuplicateIndex:
+    """
+    Etapa del pipeline que detecta casi duplicados entre fuentes con un índice de
+    similitud incremental guardado en el índice SQLite: la firma MinHash de los
+    trigramas del título se parte en NEAR_DUP_BANDS bandas (LSH), y cada oferta nueva
+    solo se compara con las del mismo grupo de empresa que comparten alguna banda, no
+    con todo el historial. Los candidatos se confirman con la similitud exacta del
+    título (NEAR_DUP_THRESHOLD) y de la ubicación (NEAR_DUP_LOCATION_THRESHOLD), de modo
+    que la misma vacante en otra ciudad no cuenta como duplicado; los números del título
+    (niveles como 'I' / 'II') tienen que coincidir exactamente.
+    Con action="flag" el duplicado se registra (tabla near_duplicates) y se guarda igual;
+    con "merge" se registra, no llega a los sinks y se guarda en el índice con
+    duplicate_of, para que siga contando como conocida (fuera del Excel). El historial que aún no está en el
+    índice de similitud se agrega al crear la etapa.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        action (str): "flag" o "merge" (por defecto NEAR_DUP_ACTION).
+    """
+    # Permutaciones de MinHash: h(x) = (a * x + b) mod p, con semilla fija para que las firmas sean estables
+    _PRIME = (1 << 61) - 1
+    # Ofertas nuevas que se acumulan en memoria antes de escribirlas juntas en el índice
+    _FLUSH_EVERY = 500
+
+    def __init__(self, job_index, action=None):
+        import numpy as np
+        self.job_index = job_index
+        self.action = action or NEAR_DUP_ACTION
+        rng = np.random.default_rng(20240601)
+        permutations = NEAR_DUP_BANDS * NEAR_DUP_ROWS
+        self._a = rng.integers(1, 1 << 31, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=permutations, dtype=np.uint64)
+        self.flagged = 0
+        self.merged = 0
+        self._pending = []
+        self._pending_buckets = {}
+        self._backfill()
+
+    def _backfill(self):
+        missing = self.job_index.jobs_missing_near_dup_index()
+        if not missing:
+            return
+        print(f"Agregando {len(missing)} trabajos del historial al índice de casi duplicados...")
+        for start in range(0, len(missing), 10000):
+            self.job_index.add_near_dup_postings(
+                self._posting(job_id, company, title, location) for job_id, company, title, location in missing[start:start + 10000]
+            )
+
+    def _band_keys(self, shingles):
+        """Claves de banda LSH (enteros de 64 bits con signo, aptos para SQLite) de un conjunto de trigramas."""
+        import numpy as np
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        signature = ((np.outer(hashes, self._a) + self._b) % np.uint64(self._PRIME)).min(axis=0)
+        bands = signature.reshape(NEAR_DUP_BANDS, NEAR_DUP_ROWS)
+        return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8, person=bytes([index])).digest(), 'big', signed=True)
+                for index, band in enumerate(bands)]
+
+    def _posting(self, job_id, company, title, location):
+        title_norm = normalize_for_matching(title)
+        return (job_id, get_company_group(company), title_norm, normalize_for_matching(location),
+                self._band_keys(title_shingles(title_norm)))
+
+    def _candidates(self, company_group, band_keys):
+        """Candidatos del índice y de las ofertas todavía no escritas que comparten alguna banda."""
+        candidates = {candidate[0]: candidate for candidate in self.job_index.find_near_dup_candidates(company_group, band_keys)}
+        for band_key in band_keys:
+            for posting in self._pending_buckets.get((company_group, band_key), ()):
+                candidates[posting[0]] = posting[:1] + posting[2:4]
+        return candidates.values()
+
+    def _add(self, posting):
+        self._pending.append(posting)
+        for band_key in posting[4]:
+            self._pending_buckets.setdefault((posting[1], band_key), []).append(posting)
+        if len(self._pending) >= self._FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Escribe en el índice las ofertas acumuladas en memoria."""
+        if self._pending:
+            self.job_index.add_near_dup_postings(self._pending)
+            self._pending = []
+            self._pending_buckets = {}
+
+    def find_duplicate(self, posting):
+        """
+        Args:
+            posting (tuple): Oferta preparada por _posting.
+        Returns:
+            tuple or None: (job_id de la oferta más parecida, similitud del título), o None.
+        """
+        job_id, company_group, title_norm, location_norm, band_keys = posting
+        shingles = title_shingles(title_norm)
+        numbers = title_number_tokens(title_norm)
+        location_words = set(location_norm.split())
+        best = None
+        for candidate_id, candidate_title, candidate_location in self._candidates(company_group, band_keys):
+            if candidate_id == job_id or title_number_tokens(candidate_title) != numbers:
+                continue
+            similarity = jaccard(shingles, title_shingles(candidate_title))
+            if similarity < NEAR_DUP_THRESHOLD or jaccard(location_words, set(candidate_location.split())) < NEAR_DUP_LOCATION_THRESHOLD:
+                continue
+            if best is None or similarity > best[1]:
+                best = (candidate_id, similarity)
+        return best
+
+    def __call__(self, jobs):
+        """
+        Etapa del pipeline (ver run_pipeline).
+        Args:
+            jobs (iterable): Trabajos normalizados (ver normalize_jobs).
+        Yields:
+            dict: Cada trabajo, salvo los casi duplicados con action="merge".
+        """
+        try:
+            for job in jobs:
+                posting = self._posting(job['job_id'], job['Empresa'], job['Puesto'], job['Ubicacion'])
+                duplicate = self.find_duplicate(posting)
+                if duplicate is not None:
+                    duplicate_of, similarity = duplicate
+                    self.job_index.record_near_duplicate(job['job_id'], duplicate_of, similarity, self.action)
+                    if self.action == "merge":
+                        # Se guarda en el historial (sin pasar a los sinks) para que las próximas
+                        # ejecuciones la den por conocida
+                        self.job_index.add_jobs([{**job, 'duplicate_of': duplicate_of}])
+                        self.merged += 1
+                        print(f"  Casi duplicado descartado: '{job['Puesto']}' ({job['Empresa']}) ya está como {duplicate_of} (similitud {similarity:.2f}).")
+                        continue
+                    self.flagged += 1
+                    print(f"  Posible casi duplicado: '{job['Puesto']}' ({job['Empresa']}) se parece a {duplicate_of} (similitud {similarity:.2f}).")
+                self._add(posting)
+                yield job
+        finally:
+            self.flush()
+
+class DetailEnricher:
+    """
+    Etapa del pipeline que agrega a cada trabajo nuevo las DETAIL_COLUMNS de su página
+    de detalle ('Link de Aplicación'). Las páginas se descargan por HTTP en un pool de
+    DETAIL_WORKERS hilos, con su propio HostScheduler (DETAIL_HOST_RATE, DETAIL_HOST_MAX_RATE
+    y DETAIL_HOST_CONCURRENCY por host), mientras el rastreo de los listados sigue: la
+    etapa nunca espera una descarga mientras llegan trabajos, y los va entregando en
+    orden a medida que terminan. Solo al agotarse el flujo espera las que faltan
+    (fase 'details' de RunMetrics).
+    Los detalles se guardan en el índice (tabla job_details) por job_id, así que cada
+    página de detalle se descarga una sola vez; una descarga fallida no se guarda y el
+    trabajo pasa con las columnas vacías. Los sitios con "details": False en su
+    configuración no se enriquecen.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas (caché de detalles).
+        metrics (RunMetrics, optional): Donde se registra la espera final.
+        site_configs (dict, optional): Configuración de los sitios (por defecto SITE_CONFIGS).
+    """
+    def __init__(self, job_index, metrics=None, site_configs=None):
+        self.job_index = job_index
+        self.metrics = metrics or RunMetrics()
+        self.configs = {config["company_name"]: config for config in (site_configs or SITE_CONFIGS).values()}
+        self.scheduler = HostScheduler(defaults={"rate": DETAIL_HOST_RATE, "max_rate": DETAIL_HOST_MAX_RATE,
+                                                 "concurrency": DETAIL_HOST_CONCURRENCY})
+        self.fetched = 0
+        self.cached = 0
+        self.failed = 0
+        self._to_cache = {}
+
+    def _fetch(self, job, config):
+        """
+        Descarga y extrae los detalles de un trabajo (en un hilo del pool). Devuelve None si
+        la descarga o la extracción fallan: una página de detalle rara no detiene el rastreo.
+        """
+        url = job['Link de Aplicación']
+        with self.scheduler.request(url):
+            html = fetch_html_http(url)
+        if html is None:
+            self.scheduler.backoff(url, "error HTTP")
+            return None
+        try:
+            return extract_job_details(html, job, config)
+        except Exception as e:
+            print(f"  Error al extraer los detalles de {url}: {e}.")
+            return None
+
+    def _submit(self, pool, job):
+        """Returns: un Future con los detalles del trabajo, o los detalles mismos si no hay que descargarlos."""
+        config = self.configs.get(job['Empresa'])
+        if config is None or config.get("details") is False or not job['Link de Aplicación'].startswith('http'):
+            return dict.fromkeys(DETAIL_COLUMNS, '')
+        cached = self.job_index.get_job_details(job['job_id'])
+        if cached is not None:
+            self.cached += 1
+            return cached
+        return pool.submit(self._fetch, job, config)
+
+    def _finish(self, job, details):
+        if isinstance(details, Future):
+            details = details.result()
+            if details is None:
+                self.failed += 1
+                details = dict.fromkeys(DETAIL_COLUMNS, '')
+            else:
+                self.fetched += 1
+                self._to_cache[job['job_id']] = details
+                if len(self._to_cache) >= SINK_BATCH_SIZE:
+                    self.flush()
+        return {**job, **details}
+
+    def flush(self):
+        """Guarda en el índice los detalles descargados que aún no se guardaron."""
+        if self._to_cache:
+            self.job_index.add_job_details(self._to_cache)
+            self._to_cache = {}
+
+    def __call__(self, jobs):
+        """
+        Etapa del pipeline (ver run_pipeline).
+        Args:
+            jobs (iterable): Trabajos normalizados (ver normalize_jobs).
+        Yields:
+            dict: Cada trabajo con las DETAIL_COLUMNS, en el orden de llegada.
+        """
+        pending = deque()
+        pool = ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix='detalle')
+        try:
+            for job in jobs:
+                pending.append((job, self._submit(pool, job)))
+                # Sin bloquear: solo salen los trabajos del frente cuyo detalle ya está listo
+                while pending and not (isinstance(pending[0][1], Future) and not pending[0][1].done()):
+                    yield self._finish(*pending.popleft())
+            if pending:
+                print(f"Esperando {len(pending)} páginas de detalle...")
+            while pending:
+                job, details = pending.popleft()
+                with self.metrics.timed_save('details'):
+                    finished = self._finish(job, details)
+                yield finished
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.flush()
+            if self.fetched or self.failed:
+                print(f"Detalles: {self.fetched} páginas descargadas, {self.cached} ya guardadas, {self.failed} con error.")
+
+def build_stages(job_index, metrics=None):
+    """
+    Etapas del pipeline: deduplicación exacta, normalización y, si están activos,
+    detección de casi duplicados (NEAR_DUP_ACTION, ver NearDuplicateIndex) y
+    enriquecimiento con la página de detalle (ENRICH_DETAILS, ver DetailEnricher).
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        metrics (RunMetrics, optional): Donde se registran los tiempos de las etapas.
+    Returns:
+        tuple: Las etapas, listas para run_pipeline.
+    """
+    stages = (dedup_jobs, normalize_jobs)
+    if NEAR_DUP_ACTION:
+        stages += (NearDuplicateIndex(job_index),)
+    if ENRICH_DETAILS:
+        stages += (DetailEnricher(job_index, metrics),)
+    return stages
+
+class IndexSink:
+    """
+    Sink: registra los trabajos en el índice SQLite, en lotes de batch_size.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        metrics (RunMetrics, optional): Donde se registra el tiempo de escritura (fase 'index').
+        batch_size (int): Trabajos por inserción.
+    """
+    def __init__(self, job_index, metrics=None, batch_size=SINK_BATCH_SIZE):
+        self.job_index = job_index
+        self.metrics = metrics or RunMetrics()
+        self.batch_size = batch_size
+        self.inserted = 0
+        self._batch = []
+
+    def write(self, job):
+        self._batch.append(job)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self.inserted:
+            print(f"Se registraron {self.inserted} nuevos trabajos en el índice '{self.job_index.path}'.")
+
+    def _flush(self):
+        if self._batch:
+            with self.metrics.timed_save('index'):
+                self.inserted += self.job_index.add_jobs(self._batch)
+            self._batch = []
+
+class CsvSink:
+    """
+    Sink: agrega los trabajos al final de un CSV, en lotes de batch_size, sin leer
+    ni reescribir lo ya guardado. Por defecto es el diario de pendientes, del que
+    se alimenta el Excel al compactar.
+    Args:
+        path (str): Ruta del CSV (por defecto JOURNAL_FILE).
+        metrics (RunMetrics, optional): Donde se registra el tiempo de escritura (fase 'journal').
+        batch_size (int): Trabajos por escritura.
+    """
+    def __init__(self, path=JOURNAL_FILE, metrics=None, batch_size=SINK_BATCH_SIZE):
+        self.path = path
+        self.metrics = metrics or RunMetrics()
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch = []
+
+    def write(self, job):
+        self._batch.append(job)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self.written:
+            print(f"Se agregaron {self.written} nuevos trabajos al diario '{self.path}'.")
+
+    def _flush(self):
+        if not self._batch:
+            return
+        with self.metrics.timed_save('journal'):
+            write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=SCRIPT_MANAGED_COLUMNS, extrasaction='ignore')
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(self._batch)
+        self.written += len(self._batch)
+        self._batch = []
+
+class ExcelSink:
+    """
+    Sink: mantiene OUTPUT_FILE. Los trabajos llegan al Excel a través del diario
+    de pendientes (CsvSink), así que al cerrar solo se compacta si toca (ver
+    should_compact_excel); reescribir el libro por cada trabajo sería prohibitivo.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas (para regenerar el Excel si no existe).
+        metrics (RunMetrics, optional): Donde se registra el tiempo de compactación (fase 'compact').
+        force_compact (bool): Si es True, vuelca el diario al Excel aunque no toque.
+    """
+    def __init__(self, job_index, metrics=None, force_compact=False):
+        self.job_index = job_index
+        self.metrics = metrics or RunMetrics()
+        self.force_compact = force_compact
+
+    def write(self, job):
+        pass
+
+    def close(self):
+        if self.force_compact or should_compact_excel():
+            with self.metrics.timed_save('compact'):
+                compact_excel(self.job_index)
+        else:
+            print(f"{count_journal_rows()} trabajos pendientes en '{JOURNAL_FILE}'; '{OUTPUT_FILE}' se actualizará en la próxima compactación.")
+
+class JsonlSink:
+    """
+    Sink: escribe cada trabajo como una línea JSON en cuanto llega, para que otros
+    procesos (ej. alertas) vean las ofertas nuevas sin esperar al final de la ejecución.
+    Args:
+        stream (file, optional): Destino de las líneas (por defecto stdout).
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, job):
+        self.stream.write(json.dumps(job, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+def build_sinks(job_index, names=DEFAULT_SINKS, metrics=None, force_compact=False, jsonl_stream=None):
+    """
+    Crea los sinks pedidos, en el orden de SINK_NAMES: el índice se escribe antes
+    que el diario, y el diario antes de compactar el Excel.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        names (iterable): Nombres de los sinks (ver SINK_NAMES).
+        metrics (RunMetrics, optional): Donde se registran los tiempos de guardado.
+        force_compact (bool): Si es True, el sink 'xlsx' compacta aunque no toque.
+        jsonl_stream (file, optional): Destino del sink 'jsonl' (por defecto stdout).
+    Returns:
+        list: Los sinks, listos para run_pipeline.
+    """
+    factories = {
+        'sqlite': lambda: IndexSink(job_index, metrics),
+        'csv': lambda: CsvSink(JOURNAL_FILE, metrics),
+        'xlsx': lambda: ExcelSink(job_index, metrics, force_compact),
+        'jsonl': lambda: JsonlSink(jsonl_stream),
+    }
+    return [factories[name]() for name in SINK_NAMES if name in names]
+
+def run_pipeline(jobs, sinks, stages=(dedup_jobs, normalize_jobs)):
+    """
+    Hace pasar los trabajos, uno a uno, por las etapas y luego por cada sink.
+    Con un generador como entrada (ver iter_new_jobs) nada se acumula en memoria:
+    cada trabajo se escribe en cuanto se encuentra. Los sinks se cierran siempre,
+    aunque el flujo se corte, para no perder los lotes pendientes.
+    Args:
+        jobs (iterable): Trabajos (diccionarios de make_job_record).
+        sinks (list): Objetos con write(job) y close() (ver build_sinks).
+        stages (tuple): Funciones generadoras que transforman el flujo, en orden.
+    Returns:
+        int: Número de trabajos que llegaron a los sinks.
+    """
+    for stage in stages:
+        jobs = stage(jobs)
+    count = 0
+    try:
+        for job in jobs:
+            for sink in sinks:
+                sink.write(job)
+            count += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+    return count
+
+def save_to_excel(df_new_jobs_current_run, job_index, force_compact=False, metrics=None):
+    """
+    Guarda las nuevas ofertas de empleo en el índice SQLite y las agrega al diario
+    CSV de pendientes, con los sinks por defecto (ver run_pipeline). El tiempo y la
+    memoria de este paso dependen solo del número de trabajos nuevos; el Excel
+    completo solo se reescribe cuando toca compactar (ver should_compact_excel).
+    Args:
+        df_new_jobs_current_run (pd.DataFrame): DataFrame que contiene los nuevos trabajos encontrados en la ejecución actual.
+        job_index (JobIndex): Índice persistente de ofertas (fuente de verdad).
+        force_compact (bool): Si es True, vuelca el diario al Excel aunque no toque.
+        metrics (RunMetrics, optional): Donde se registran los tiempos de cada fase del guardado.
+    """
+    if df_new_jobs_current_run.empty:
+        print("No hay nuevos trabajos para guardar.")
+    sinks = build_sinks(job_index, DEFAULT_SINKS, metrics, force_compact)
+    run_pipeline(df_new_jobs_current_run.to_dict('records'), sinks, build_stages(job_index, metrics))
+
+# --- Daemon Mode ---
+
+def run_crawl(job_index, args, jsonl_stream, site_configs=None, browsers=None, scheduler=None, resume=False, full_crawl=False):
+    """
+    Una ejecución completa: rastrea los sitios, guarda los trabajos nuevos en los
+    sinks de args.sinks a medida que aparecen y escribe las métricas.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        args (argparse.Namespace): Las opciones de la ejecución (ver parse_args).
+        jsonl_stream (file): Destino del sink 'jsonl'.
+        site_configs (dict, optional): Sitios a rastrear (por defecto todo SITE_CONFIGS).
+        browsers (list, optional): Navegadores que se reutilizan entre ejecuciones (modo daemon).
+        scheduler (HostScheduler, optional): Planificador de cortesía que se conserva entre ejecuciones.
+        resume (bool): Si es True, retoma el punto de control de una ejecución interrumpida.
+        full_crawl (bool): Si es True, fuerza un rastreo completo.
+    Returns:
+        RunMetrics: Las métricas de la ejecución.
+    """
+    run_metrics = RunMetrics()
+    checkpoint = RunCheckpoint()
+    new_jobs = iter_new_jobs(job_index, full_crawl=full_crawl, metrics=run_metrics, checkpoint=checkpoint, resume=resume,
+                             site_configs=site_configs, browsers=browsers, scheduler=scheduler)
+
+    # Cada trabajo nuevo se escribe en los sinks en cuanto se encuentra, sin esperar al final del rastreo
+    sinks = build_sinks(job_index, args.sinks, run_metrics, jsonl_stream=jsonl_stream)
+    saved_count = run_pipeline(new_jobs, sinks, build_stages(job_index, run_metrics))
+    print(f"\nSe guardaron {saved_count} trabajos nuevos." if saved_count else "\nNo se encontraron trabajos nuevos.")
+    # Los resultados ya están guardados: la ejecución no necesita retomarse
+    checkpoint.clear()
+
+    run_metrics.finish()
+    run_metrics.print_summary()
+    run_metrics.write_report(args.metrics_report)
+    run_metrics.write_prometheus(args.prom_file)
+    return run_metrics
+
+def update_site_refresh(job_index, schedule, base_url, new_jobs, finished_at):
+    """
+    Recalcula el intervalo de revisión de un sitio tras rastrearlo. El ritmo de
+    publicación (trabajos nuevos por hora desde la revisión anterior) se suaviza con
+    una media móvil exponencial, y el intervalo es el tiempo en que se espera encontrar
+    DAEMON_TARGET_NEW_JOBS trabajos nuevos: los sitios que publican a menudo se revisan
+    más seguido y los inactivos se espacian hasta DAEMON_MAX_INTERVAL_HOURS.
+    La primera revisión no estima el ritmo (todo lo publicado hasta entonces sería "nuevo").
+    Args:
+        job_index (JobIndex): Índice donde se guarda la planificación.
+        schedule (dict): Planificación actual (ver JobIndex.load_site_schedule).
+        base_url (str): La URL del sitio.
+        new_jobs (int): Trabajos nuevos encontrados en esta revisión.
+        finished_at (datetime): Fin de la revisión.
+    Returns:
+        float: Segundos hasta la próxima revisión.
+    """
+    min_interval = DAEMON_MIN_INTERVAL_MINUTES * 60
+    max_interval = DAEMON_MAX_INTERVAL_HOURS * 3600
+    previous = schedule.get(base_url)
+    rate = None
+    interval_s = DAEMON_START_INTERVAL_HOURS * 3600
+    if previous is not None:
+        elapsed_hours = max((finished_at - previous['last_run_at']).total_seconds(), 60) / 3600
+        observed = new_jobs / elapsed_hours
+        rate = observed if previous['new_jobs_per_hour'] is None else (
+            DAEMON_RATE_SMOOTHING * observed + (1 - DAEMON_RATE_SMOOTHING) * previous['new_jobs_per_hour'])
+        interval_s = DAEMON_TARGET_NEW_JOBS / rate * 3600 if rate > 0 else max_interval
+    interval_s = min(max_interval, max(min_interval, interval_s))
+    job_index.set_site_schedule(base_url, rate, interval_s, finished_at, finished_at + timedelta(seconds=interval_s))
+    return interval_s
+
+def get_due_sites(schedule, now):
+    """
+    Args:
+        schedule (dict): Planificación actual (ver JobIndex.load_site_schedule).
+        now (datetime): Fecha de referencia.
+    Returns:
+        tuple: (dict base_url -> config de los sitios que toca revisar, datetime de la
+               próxima revisión de los demás o None).
+    """
+    due = {base_url: config for base_url, config in SITE_CONFIGS.items()
+           if base_url not in schedule or schedule[base_url]['next_run_at'] <= now}
+    upcoming = [schedule[base_url]['next_run_at'] for base_url in SITE_CONFIGS if base_url not in due]
+    return due, min(upcoming) if upcoming else None
+
+def run_daemon(job_index, args, jsonl_stream):
+    """
+    Modo daemon: un proceso de larga duración que revisa cada sitio según su propio
+    intervalo (ver update_site_refresh) en lugar de rastrearlos todos a la vez.
+    Los navegadores del pool y el HostScheduler se conservan entre revisiones; los
+    navegadores se cierran si la siguiente revisión queda a más de DAEMON_KEEP_WARM_MINUTES.
+    Cuando toca un rastreo completo (FULL_CRAWL_EVERY_DAYS) se revisan todos los sitios.
+    Se detiene con Ctrl-C.
+    Args:
+        job_index (JobIndex): Índice persistente de ofertas.
+        args (argparse.Namespace): Las opciones de la ejecución (ver parse_args).
+        jsonl_stream (file): Destino del sink 'jsonl'.
+    """
+    browsers = [BrowserHandle(worker_num) for worker_num in range(1, MAX_WORKERS + 1)]
+    scheduler = HostScheduler()
+    first_run = True
+    try:
+        while True:
+            schedule = job_index.load_site_schedule()
+            # La primera vuelta respeta --resume y --full-crawl; después, un rastreo completo incluye todos los sitios
+            if (first_run and (args.resume or args.full_crawl)) or job_index.is_full_crawl_due():
+                due_sites = dict(SITE_CONFIGS)
+            else:
+                due_sites, _ = get_due_sites(schedule, datetime.now())
+            if due_sites:
+                print(f"\n--- Revisión de {len(due_sites)} sitio(s): {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
+                try:
+                    run_metrics = run_crawl(job_index, args, jsonl_stream, due_sites, browsers, scheduler,
+                                            resume=first_run and args.resume, full_crawl=first_run and args.full_crawl)
+                except Exception as e:
+                    # Sin actualizar la planificación: se reintenta tras el intervalo mínimo
+                    print(f"Error en la revisión: {e}. Se reintenta en {DAEMON_MIN_INTERVAL_MINUTES} minutos.")
+                    for browser in browsers:
+                        browser.quit()
+                    time.sleep(DAEMON_MIN_INTERVAL_MINUTES * 60)
+                    continue
+                finished_at = datetime.now()
+                for base_url in due_sites:
+                    site_metrics = run_metrics.sites.get(base_url)
+                    interval_s = update_site_refresh(job_index, schedule, base_url, site_metrics.new_jobs if site_metrics else 0, finished_at)
+                    print(f"  {SITE_CONFIGS[base_url]['company_name']}: próxima revisión en {interval_s / 3600:.1f} h.")
+            first_run = False
+
+            _, next_run_at = get_due_sites(job_index.load_site_schedule(), datetime.now())
+            sleep_seconds = max((next_run_at - datetime.now()).total_seconds(), 1) if next_run_at else DAEMON_MIN_INTERVAL_MINUTES * 60
+            if sleep_seconds > DAEMON_KEEP_WARM_MINUTES * 60:
+                for browser in browsers:
+                    browser.quit()
+            print(f"Próxima revisión: {(datetime.now() + timedelta(seconds=sleep_seconds)).strftime('%Y-%m-%d %H:%M:%S')}.")
+            time.sleep(sleep_seconds)
+    except KeyboardInterrupt:
+        print("\nModo daemon detenido.")
+    finally:
+        for browser in browsers:
+            browser.quit()
+
+def parse_args():
+    """
+    Lee las opciones de línea de comandos.
+    Returns:
+        argparse.Namespace: Las opciones de la ejecución.
+    """
+    parser = argparse.ArgumentParser(description="Busca ofertas de empleo en los sitios de SITE_CONFIGS.")
+    parser.add_argument('--full-crawl', action='store_true',
+                        help="Recorre todas las páginas de cada sitio, sin la parada temprana del modo incremental.")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Se queda en ejecución y revisa cada sitio con un intervalo adaptado a su ritmo de publicación.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Retoma una ejecución interrumpida desde su punto de control: salta los sitios terminados y sigue la paginación donde se quedó.")
+    parser.add_argument('--sinks', default=','.join(DEFAULT_SINKS),
+                        help=f"Destinos de los trabajos nuevos, separados por comas, entre: {', '.join(SINK_NAMES)}. "
+                             "Con 'jsonl' cada trabajo se escribe en stdout en cuanto se encuentra y los mensajes pasan a stderr.")
+    parser.add_argument('--details', action='store_true', default=ENRICH_DETAILS,
+                        help="Descarga la página de detalle de cada trabajo nuevo y agrega fecha de publicación, modalidad y descripción.")
+    parser.add_argument('--chromedriver', default=CHROMEDRIVER_PATH,
+                        help="Ruta fija de chromedriver; evita resolverlo con webdriver_manager.")
+    parser.add_argument('--metrics-report', default=METRICS_REPORT_FILE,
+                        help="Ruta del informe JSON con los tiempos por sitio, iteración y fase.")
+    parser.add_argument('--prom-file', default=METRICS_PROM_FILE,
+                        help="Ruta del archivo de métricas de Prometheus (ej. el directorio del textfile collector).")
+    args = parser.parse_args()
+    args.sinks = [name.strip() for name in args.sinks.split(',') if name.strip()]
+    unknown = [name for name in args.sinks if name not in SINK_NAMES]
+    if unknown:
+        parser.error(f"Sinks desconocidos: {', '.join(unknown)}. Opciones: {', '.join(SINK_NAMES)}.")
+    if 'sqlite' not in args.sinks:
+        # Sin el índice no avanza el historial: cada ejecución volvería a dar todo por nuevo, y el Excel
+        # se regeneraría desde un índice sin los trabajos del diario
+        parser.error("El sink 'sqlite' es obligatorio: el índice es la fuente de verdad de la deduplicación.")
+    if 'xlsx' in args.sinks and 'csv' not in args.sinks:
+        parser.error("El sink 'xlsx' se alimenta del diario de pendientes: requiere también 'csv'.")
+    return args
+
+# --- Main Execution Block ---
+
+if __name__ == "__main__":
+    args = parse_args()
+    CHROMEDRIVER_PATH = args.chromedriver
+    ENRICH_DETAILS = args.details
+    jsonl_stream = sys.stdout
+    if 'jsonl' in args.sinks:
+        # stdout queda reservado para el flujo JSONL; los mensajes de progreso van a stderr
+        sys.stdout = sys.stderr
+    print("--- Iniciando búsqueda de trabajos ---")
+    
+    job_index = JobIndex()
+    if args.daemon:
+        run_daemon(job_index, args, jsonl_stream)
+    else:
+        run_crawl(job_index, args, jsonl_stream, resume=args.resume, full_crawl=args.full_crawl)
+    job_index.close()
+    
+    print("--- Búsqueda de trabajos finalizada ---")
@@ -0,0 +1,547 @@
+"""
+Benchmark offline de ScrapJobs.
+
+Mide, sin tocar los sitios reales:
+    - parse: páginas y tarjetas por segundo al parsear las páginas guardadas en
+      benchmarks/fixtures (una por cada empresa de SITE_CONFIGS).
+    - accumulate: una paginación "Ver más" de Parexel con --accumulate-pages páginas,
+      releyendo la página completa en cada iteración frente a parsear solo las tarjetas
+      nuevas (extracción por diferencia, ver extract_cards_from_driver).
+    - dedup: generación de job_id en bloque, deduplicación con JobIdRegistry (cadenas
+      y digests, ver JobIdSet), memoria de cada conjunto e inserción/lectura del
+      índice SQLite sobre un historial sintético.
+    - end_to_end: scrape_jobs() + save_to_excel() completos contra un servidor HTTP
+      local que reproduce las páginas guardadas (una pasada completa y otra incremental).
+    - peak_rss_mb: memoria residente máxima del proceso.
+
+Los resultados se comparan con benchmarks/baseline.json si existe.
+
+Uso:
+    python benchmarks/bench_scrapjobs.py
+    python benchmarks/bench_scrapjobs.py --save-baseline
+    python benchmarks/bench_scrapjobs.py --fail-on-regression --tolerance 0.25
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pandas as pd
+import ScrapJobs
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Páginas con resultados que el servidor de reproducción sirve por sitio; las siguientes vienen vacías
+REPLAY_PAGES = 5
+
+# Página guardada de cada empresa de SITE_CONFIGS
+SITE_FIXTURES = {
+    "IQVIA": "iqvia.html",
+    "ICON plc 2": "icon.html",
+    "Parexel": "parexel.html",
+    "Thermo Fisher Scientific": "thermofisher.html",
+    "IQVIA WorkDay": "workday.json",
+    "Medpace": "medpace.html",
+    "Cognizant": "cognizant.html",
+    "Syneos Health": "syneos.html",
+    "PSI CRO": "psi.html",
+    "Fortrea WorkDay": "workday.json",
+    "SerenaGroup": "paylocity.html",
+}
+
+EMPTY_PAGE = "<!DOCTYPE html><html><head><title>Sin resultados</title></head><body><p>No results</p></body></html>"
+
+# --- Fixtures ---
+
+def site_slug(company_name):
+    """
+    Args:
+        company_name (str): El nombre de la empresa.
+    Returns:
+        str: Identificador del sitio en las rutas del servidor de reproducción.
+    """
+    return re.sub(r'[^a-z0-9]+', '-', company_name.lower()).strip('-')
+
+def render_fixture(fixture_name, page_num, page_size=None):
+    """
+    Carga una página guardada y la adapta al número de página pedido: el marcador
+    __PAGE__ se reemplaza para que cada página produzca ofertas distintas.
+    Args:
+        fixture_name (str): Nombre del archivo en benchmarks/fixtures.
+        page_num (int): Número de página (desde 1).
+        page_size (int, optional): Para fixtures JSON de Workday, ofertas por página.
+    Returns:
+        str: El cuerpo de la respuesta.
+    """
+    with open(os.path.join(FIXTURES_DIR, fixture_name), encoding='utf-8') as fixture:
+        body = fixture.read().replace('__PAGE__', f"{page_num:03d}")
+    if not fixture_name.endswith('.json'):
+        return body
+    data = json.loads(body.replace('"__TOTAL__"', '0'))
+    postings = data["jobPostings"][:page_size] if page_size else data["jobPostings"]
+    data["total"] = len(postings) * REPLAY_PAGES
+    data["jobPostings"] = postings
+    return json.dumps(data)
+
+def check_fixtures():
+    """
+    Verifica que cada empresa de SITE_CONFIGS tenga su página guardada.
+    """
+    missing = [config["company_name"] for config in ScrapJobs.SITE_CONFIGS.values() if config["company_name"] not in SITE_FIXTURES]
+    if missing:
+        sys.exit(f"Faltan fixtures para: {', '.join(missing)}. Agrégalos a SITE_FIXTURES en {__file__}.")
+
+# --- Replay Server ---
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Sirve las páginas guardadas:
+        GET  /<slug>/?page=N      -> listado HTML (vacío a partir de REPLAY_PAGES + 1), con ETag
+                                     y 304 si la petición trae el mismo If-None-Match
+        POST /<slug>/wday/jobs    -> búsqueda JSON de Workday (según offset/limit)
+    """
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        slug = parsed.path.strip('/').split('/')[0]
+        page_num = int(parse_qs(parsed.query).get('page', ['1'])[0])
+        fixture_name = self.server.fixtures.get(slug)
+        if fixture_name is None:
+            self.send_error(404)
+            return
+        body = render_fixture(fixture_name, page_num) if page_num <= REPLAY_PAGES else EMPTY_PAGE
+        self._send(body, 'text/html; charset=utf-8', etag=True)
+
+    def do_POST(self):
+        slug = urlparse(self.path).path.strip('/').split('/')[0]
+        fixture_name = self.server.fixtures.get(slug)
+        if fixture_name is None:
+            self.send_error(404)
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        limit = payload.get('limit', 20)
+        page_num = payload.get('offset', 0) // limit + 1
+        if page_num <= REPLAY_PAGES:
+            body = render_fixture(fixture_name, page_num, page_size=limit)
+        else:
+            body = json.dumps({"total": 0, "jobPostings": []})
+        self._send(body, 'application/json')
+
+    def _send(self, body, content_type, etag=False):
+        encoded = body.encode('utf-8')
+        with self.server.lock:
+            self.server.requests += 1
+        etag_value = f'"{hashlib.blake2b(encoded, digest_size=8).hexdigest()}"' if etag else None
+        if etag_value and self.headers.get('If-None-Match') == etag_value:
+            self.send_response(304)
+            self.send_header('ETag', etag_value)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(encoded)))
+        if etag_value:
+            self.send_header('ETag', etag_value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass # Sin log por petición
+
+def start_replay_server():
+    """
+    Inicia el servidor de reproducción en un puerto libre de 127.0.0.1.
+    Returns:
+        ThreadingHTTPServer: El servidor, ya atendiendo en un hilo aparte.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReplayHandler)
+    server.fixtures = {site_slug(company): fixture for company, fixture in SITE_FIXTURES.items()}
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def build_replay_site_configs(server_url):
+    """
+    Copia SITE_CONFIGS apuntando cada sitio al servidor de reproducción. Como no hay
+    navegador, todos los sitios HTML se recorren en modo HTTP con paginación por URL;
+    los sitios Workday siguen usando la API (servida localmente).
+    Args:
+        server_url (str): URL base del servidor (ej. 'http://127.0.0.1:8123').
+    Returns:
+        dict: Configuración equivalente a SITE_CONFIGS.
+    """
+    replay_configs = {}
+    for config in ScrapJobs.SITE_CONFIGS.values():
+        slug = site_slug(config["company_name"])
+        site_url = f"{server_url}/{slug}/"
+        replay_config = {key: value for key, value in config.items() if key != "link_base_pattern"}
+        pagination_config = config.get("pagination")
+        if pagination_config and pagination_config["type"] == "workday_api":
+            replay_config["pagination"] = dict(pagination_config, api_url=f"{server_url}/{slug}/wday/jobs", link_base=f"{server_url}/{slug}")
+        else:
+            replay_config["fetch_mode"] = "http"
+            if pagination_config:
+                replay_config["pagination"] = {
+                    "type": "url",
+                    "url_pattern": site_url + "?page={page_num}",
+                    "start_page": 1,
+                    "max_pages": pagination_config.get("max_pages", pagination_config.get("max_scrolls", 1)),
+                }
+        replay_configs[site_url] = replay_config
+    return replay_configs
+
+# --- Benchmarks ---
+
+def bench_parse(repeat):
+    """
+    Parsea repetidamente la página guardada de cada sitio con su SiteExtractor.
+    Args:
+        repeat (int): Veces que se parsea cada página.
+    Returns:
+        dict: Métricas por empresa.
+    """
+    results = {}
+    for extractor in ScrapJobs.compile_site_extractors(ScrapJobs.SITE_CONFIGS):
+        fixture_name = SITE_FIXTURES[extractor.company_name]
+        body = render_fixture(fixture_name, 1)
+        parse_seconds = 0.0
+        extract_seconds = 0.0
+        cards_per_page = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if fixture_name.endswith('.json'):
+                cards = json.loads(body)["jobPostings"]
+            else:
+                cards = extractor.cards_from_html(body)
+            parsed = time.perf_counter()
+            for card in cards:
+                if fixture_name.endswith('.json'):
+                    title, link, location = ScrapJobs.parse_workday_posting(card, extractor.base_url)
+                else:
+                    title, link, location = extractor.parse_card(card)
+                ScrapJobs.generate_job_id(extractor.company_name, title, link)
+            extracted = time.perf_counter()
+            parse_seconds += parsed - started
+            extract_seconds += extracted - parsed
+            cards_per_page = len(cards)
+        total_seconds = parse_seconds + extract_seconds
+        results[extractor.company_name] = {
+            "cards_per_page": cards_per_page,
+            "pages_per_s": repeat / total_seconds,
+            "cards_per_s": cards_per_page * repeat / total_seconds,
+            "parse_ms": parse_seconds / repeat * 1000,
+            "extract_ms": extract_seconds / repeat * 1000,
+        }
+    return results
+
+def bench_accumulate(pages):
+    """
+    Simula la paginación acumulativa de Parexel: en la iteración k la página tiene las
+    tarjetas de las k primeras páginas. Compara parsear la página completa en cada
+    iteración con parsear solo el HTML de las tarjetas agregadas.
+    Args:
+        pages (int): Iteraciones de "Ver más".
+    Returns:
+        dict: Tiempos totales y de la última iteración en cada modo, en milisegundos.
+    """
+    from bs4 import BeautifulSoup
+    extractor = next(extractor for extractor in ScrapJobs.compile_site_extractors(ScrapJobs.SITE_CONFIGS)
+                     if extractor.company_name == "Parexel")
+    page_cards = []
+    for page_num in range(1, pages + 1):
+        soup = BeautifulSoup(render_fixture(SITE_FIXTURES["Parexel"], page_num), ScrapJobs.SOUP_PARSER)
+        page_cards.append([str(card) for card in soup.select(extractor.listing_selector)])
+    template = render_fixture(SITE_FIXTURES["Parexel"], 1)
+    head, tail = template[:template.index('<li>')], template[template.index('</ul>'):]
+
+    def extract(cards):
+        for card in cards:
+            title, link, location = extractor.parse_card(card)
+            ScrapJobs.generate_job_id(extractor.company_name, title, link)
+
+    full_seconds = []
+    delta_seconds = []
+    for page_num in range(1, pages + 1):
+        accumulated_html = head + "\n".join(card for cards in page_cards[:page_num] for card in cards) + tail
+        started = time.perf_counter()
+        extract(extractor.cards_from_html(accumulated_html))
+        full_seconds.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        extract(extractor.cards_from_fragments(page_cards[page_num - 1]))
+        delta_seconds.append(time.perf_counter() - started)
+
+    return {
+        "pages": pages,
+        "full_total_ms": sum(full_seconds) * 1000,
+        "full_last_page_ms": full_seconds[-1] * 1000,
+        "delta_total_ms": sum(delta_seconds) * 1000,
+        "delta_last_page_ms": delta_seconds[-1] * 1000,
+    }
+
+def bench_dedup(history_size):
+    """
+    Mide la deduplicación sobre un historial sintético de history_size ofertas.
+    Args:
+        history_size (int): Número de ofertas del historial.
+    Returns:
+        dict: Tiempos de cada fase, en milisegundos.
+    """
+    companies = [config["company_name"] for config in ScrapJobs.SITE_CONFIGS.values()]
+    history_df = pd.DataFrame({
+        'Empresa': [companies[i % len(companies)] for i in range(history_size)],
+        'Puesto': [f"Clinical  Research Associate {i % 50} " for i in range(history_size)],
+        'Link de Aplicación': [f"https://careers.example.com/jobs/{i}?lang=en-US&source=search" for i in range(history_size)],
+        'Ubicacion': 'Buenos Aires, Argentina',
+        'Fecha de Registro': '2025-01-01 00:00:00',
+    })
+
+    started = time.perf_counter()
+    history_df['job_id'] = ScrapJobs.generate_job_ids(history_df)
+    rekey_seconds = time.perf_counter() - started
+
+    job_ids = history_df['job_id'].tolist()
+    started = time.perf_counter()
+    registry = ScrapJobs.JobIdRegistry(job_ids[:history_size // 2])
+    for job_id in job_ids:
+        registry.add_if_new(job_id)
+    registry_seconds = time.perf_counter() - started
+    string_set_bytes = sys.getsizeof(registry.ids) + sum(sys.getsizeof(job_id) for job_id in registry.ids)
+
+    history_digests = [ScrapJobs.job_id_digest(job_id) for job_id in job_ids[:history_size // 2]]
+    started = time.perf_counter()
+    registry = ScrapJobs.JobIdRegistry(ScrapJobs.JobIdSet(history_digests))
+    for job_id in job_ids:
+        registry.add_if_new(job_id)
+    registry_digest_seconds = time.perf_counter() - started
+    digest_set = ScrapJobs.JobIdSet(history_digests + [ScrapJobs.job_id_digest(job_id) for job_id in job_ids[history_size // 2:]])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        job_index = ScrapJobs.JobIndex(os.path.join(workdir, 'bench.db'))
+        records = history_df.to_dict('records')
+        started = time.perf_counter()
+        job_index.add_jobs(records)
+        insert_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        job_index.load_job_ids()
+        load_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        ScrapJobs.JobIdSet(job_index.load_job_digests())
+        load_digests_seconds = time.perf_counter() - started
+        job_index.close()
+
+    return {
+        "history_size": history_size,
+        "rekey_ms": rekey_seconds * 1000,
+        "registry_ms": registry_seconds * 1000,
+        "registry_digest_ms": registry_digest_seconds * 1000,
+        "ids_string_set_mb": string_set_bytes / 1024 ** 2,
+        "ids_digest_set_mb": digest_set.nbytes / 1024 ** 2,
+        "index_insert_ms": insert_seconds * 1000,
+        "index_load_ms": load_seconds * 1000,
+        "index_load_digests_ms": load_digests_seconds * 1000,
+    }
+
+def run_pipeline(server, full_crawl, workers, verbose):
+    """
+    Ejecuta scrape_jobs() y save_to_excel() contra el servidor de reproducción
+    en el directorio de trabajo actual.
+    Returns:
+        dict: Tiempos de cada fase, páginas servidas y trabajos nuevos.
+    """
+    requests_before = server.requests
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        started = time.perf_counter()
+        job_index = ScrapJobs.JobIndex()
+        run_metrics = ScrapJobs.RunMetrics()
+        opened = time.perf_counter()
+        new_jobs, _ = ScrapJobs.scrape_jobs(job_index, max_workers=workers, full_crawl=full_crawl, metrics=run_metrics)
+        scraped = time.perf_counter()
+        ScrapJobs.save_to_excel(pd.DataFrame(new_jobs), job_index, force_compact=True, metrics=run_metrics)
+        saved = time.perf_counter()
+        job_index.close()
+    pages = server.requests - requests_before
+    scrape_seconds = scraped - opened
+    return {
+        "pages": pages,
+        "cached_pages": sum(site["cached_pages"] for site in run_metrics.to_dict()["sites"]),
+        "new_jobs": len(new_jobs),
+        "pages_per_s": pages / scrape_seconds if scrape_seconds else 0.0,
+        "index_open_ms": (opened - started) * 1000,
+        "scrape_s": scrape_seconds,
+        "save_ms": (saved - scraped) * 1000,
+        "total_s": saved - started,
+        "phases": {f"{phase}_s": seconds for phase, seconds in run_metrics.to_dict()["phases_s"].items()},
+    }
+
+def bench_end_to_end(workers, verbose):
+    """
+    Ejecuta el pipeline completo dos veces contra el servidor de reproducción:
+    una pasada completa sobre un historial vacío y una incremental sobre el resultado.
+    Las pausas deliberadas se desactivan (DELAY_SCALE = 0).
+    Args:
+        workers (int): Workers del pool de scrape_jobs().
+        verbose (bool): Si es True, muestra la salida de ScrapJobs.
+    Returns:
+        dict: Métricas de cada pasada.
+    """
+    server = start_replay_server()
+    server_url = f"http://127.0.0.1:{server.server_address[1]}"
+    original_state = (ScrapJobs.SITE_CONFIGS, ScrapJobs.DELAY_SCALE, os.getcwd())
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            ScrapJobs.SITE_CONFIGS = build_replay_site_configs(server_url)
+            ScrapJobs.DELAY_SCALE = 0
+            cold = run_pipeline(server, full_crawl=True, workers=workers, verbose=verbose)
+            warm = run_pipeline(server, full_crawl=False, workers=workers, verbose=verbose)
+            os.chdir(original_state[2])
+    finally:
+        ScrapJobs.SITE_CONFIGS, ScrapJobs.DELAY_SCALE, cwd = original_state
+        os.chdir(cwd)
+        server.shutdown()
+    return {"cold": cold, "warm": warm}
+
+def peak_rss_mb():
+    """
+    Returns:
+        float or None: Memoria residente máxima del proceso en MB (None si no se puede medir).
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024 # macOS lo informa en bytes
+
+# --- Baseline ---
+
+def flatten_metrics(report, prefix=''):
+    """
+    Aplana el informe en métricas 'seccion.subseccion.nombre' -> valor numérico.
+    """
+    metrics = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+def is_higher_better(metric):
+    return metric.endswith('_per_s')
+
+def is_timing(metric):
+    return metric.endswith(('_ms', '_s', '_mb')) or is_higher_better(metric)
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    Compara el informe con la línea base e imprime las diferencias.
+    Args:
+        report (dict): Informe actual.
+        baseline (dict): Informe guardado.
+        tolerance (float): Empeoramiento relativo tolerado (0.2 = 20 %).
+    Returns:
+        list: Métricas que empeoraron más allá de la tolerancia.
+    """
+    current = flatten_metrics(report)
+    previous = flatten_metrics(baseline)
+    regressions = []
+    print(f"\n{'Métrica':<55} {'Base':>12} {'Actual':>12} {'Cambio':>9}")
+    for metric, value in current.items():
+        if not is_timing(metric) or not previous.get(metric):
+            continue
+        change = (value - previous[metric]) / previous[metric]
+        worse = -change if is_higher_better(metric) else change
+        flag = '  REGRESIÓN' if worse > tolerance else ''
+        if flag:
+            regressions.append(metric)
+        print(f"{metric:<55} {previous[metric]:>12.2f} {value:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+def print_report(report):
+    print("\n--- Parseo de páginas guardadas ---")
+    for company, metrics in report["parse"].items():
+        print(f"  {company:<26} {metrics['pages_per_s']:>9.1f} páginas/s {metrics['cards_per_s']:>10.1f} tarjetas/s "
+              f"(parse {metrics['parse_ms']:.2f} ms, extracción {metrics['extract_ms']:.2f} ms)")
+    accumulate = report["accumulate"]
+    print(f"\n--- Paginación acumulativa (Parexel, {accumulate['pages']} páginas) ---")
+    print(f"  página completa {accumulate['full_total_ms']:.1f} ms (última {accumulate['full_last_page_ms']:.2f} ms) | "
+          f"solo tarjetas nuevas {accumulate['delta_total_ms']:.1f} ms (última {accumulate['delta_last_page_ms']:.2f} ms)")
+    dedup = report["dedup"]
+    print(f"\n--- Deduplicación ({dedup['history_size']} ofertas) ---")
+    print(f"  job_id en bloque {dedup['rekey_ms']:.1f} ms | registro {dedup['registry_ms']:.1f} ms "
+          f"(digests {dedup['registry_digest_ms']:.1f} ms) | índice: inserción {dedup['index_insert_ms']:.1f} ms, "
+          f"carga {dedup['index_load_ms']:.1f} ms (digests {dedup['index_load_digests_ms']:.1f} ms)")
+    print(f"  memoria de los IDs: cadenas {dedup['ids_string_set_mb']:.1f} MB | digests {dedup['ids_digest_set_mb']:.1f} MB")
+    print("\n--- Pipeline completo contra el servidor local ---")
+    for run_name, metrics in report["end_to_end"].items():
+        print(f"  {run_name:<5} {metrics['pages']:>4} páginas ({metrics['cached_pages']:>3} sin cambios), {metrics['new_jobs']:>4} nuevos | "
+              f"{metrics['pages_per_s']:.1f} páginas/s | "
+              f"scrape {metrics['scrape_s']:.2f} s, guardado {metrics['save_ms']:.1f} ms, total {metrics['total_s']:.2f} s")
+    if report["peak_rss_mb"] is not None:
+        print(f"\nMemoria residente máxima: {report['peak_rss_mb']:.1f} MB")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark offline de ScrapJobs con páginas guardadas.")
+    parser.add_argument('--repeat', type=int, default=50, help="Veces que se parsea cada página guardada.")
+    parser.add_argument('--accumulate-pages', type=int, default=50, help="Iteraciones de la paginación acumulativa simulada.")
+    parser.add_argument('--history-size', type=int, default=100000, help="Ofertas del historial sintético de deduplicación.")
+    parser.add_argument('--workers', type=int, default=ScrapJobs.MAX_WORKERS, help="Workers del pool en el pipeline completo.")
+    parser.add_argument('--output', help="Guarda el informe JSON en esta ruta.")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Línea base con la que comparar.")
+    parser.add_argument('--save-baseline', action='store_true', help="Guarda este informe como nueva línea base.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Empeoramiento relativo tolerado antes de marcar regresión.")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Termina con código 1 si hay regresiones.")
+    parser.add_argument('--verbose', action='store_true', help="Muestra la salida de ScrapJobs durante el pipeline.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    check_fixtures()
+    report = {
+        "parse": bench_parse(args.repeat),
+        "accumulate": bench_accumulate(args.accumulate_pages),
+        "dedup": bench_dedup(args.history_size),
+        "end_to_end": bench_end_to_end(args.workers, args.verbose),
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            regressions = compare_with_baseline(report, json.load(baseline), args.tolerance)
+        print(f"\n{len(regressions)} regresión(es) respecto de '{args.baseline}'.")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline:
+            json.dump(report, baseline, indent=2, ensure_ascii=False)
+        print(f"\nLínea base guardada en '{args.baseline}'.")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+RunCheckpoint y --resume: lectura de un punto de control parcial, recuperación de los
+trabajos ya recogidos (deduplicados otra vez contra el índice) y reanudación de cada sitio.
+El navegador se reemplaza por un sitio falso que sirve tarjetas por página.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ScrapJobs
+
+URL_SITE = "https://jobs.acme.example/search"
+CLICK_SITE = "https://careers.acme.example/search"
+DONE_SITE = "https://jobs.other.example/list"
+
+def site_config(company_name, pagination):
+    return {
+        "company_name": company_name,
+        "job_listing_selector": "li.job",
+        "title_selector": "a",
+        "link_selector": "a",
+        "location_selector": ".location",
+        "page_cache": False,
+        "pagination": pagination,
+    }
+
+def job(company_name, number, base_url=URL_SITE):
+    """El registro que produce el scraper para la oferta número number de una tarjeta de FakeSite."""
+    link = ScrapJobs.get_full_url(base_url, f"/job/{number}")
+    return ScrapJobs.make_job_record(company_name, f"Clinical Research Associate {number}", link, "Buenos Aires")
+
+def write_checkpoint(path, crawl_mode, events, truncated_line=None):
+    with open(path, 'w', encoding='utf-8') as checkpoint_file:
+        checkpoint_file.write(json.dumps({'crawl_mode': crawl_mode, 'started_at': '2026-10-18 08:00:00'}) + '\n')
+        for event in events:
+            checkpoint_file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        if truncated_line:
+            checkpoint_file.write(truncated_line)
+
+class FakeDriver:
+    """webdriver.Chrome falso: la página actual sale de ?page=N al navegar, o avanza con cada clic."""
+    def __init__(self, site):
+        self.site = site
+        self.switch_to = type('SwitchTo', (), {'default_content': staticmethod(lambda: None)})
+
+    def get(self, url):
+        self.site.page = int(parse_qs(urlparse(url).query).get('page', ['1'])[0])
+
+    def execute_script(self, *args):
+        return None
+
+class FakeSite:
+    """Hace de BrowserHandle: sirve las tarjetas de cada página y anota las páginas leídas."""
+    def __init__(self, pages, fail_on_page=None):
+        self.pages = pages # número de página -> números de las ofertas
+        self.fail_on_page = fail_on_page
+        self.page = None
+        self.visited = []
+        self.driver = FakeDriver(self)
+
+    def get(self, extractor=None):
+        return self.driver
+
+    def cards(self):
+        if self.page == self.fail_on_page:
+            raise WebDriverException("chrome not reachable")
+        self.visited.append(self.page)
+        return [{'title': f"Clinical Research Associate {number}", 'href': f"/job/{number}", 'location': "Buenos Aires"}
+                for number in self.pages.get(self.page, [])]
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    """Fábrica de FakeSite, con las esperas y la extracción del navegador reemplazadas."""
+    sites = []
+
+    def wait_for_element(driver, css_selector, clickable=False, timeout=60):
+        if clickable and driver.site.page >= max(driver.site.pages): # Sin botón 'Siguiente' en la última página
+            raise TimeoutException("no next button")
+        return object()
+
+    def wait_for_listing_change(driver, listing_selector, previous_state, timeout, grow=False):
+        driver.site.page += 1
+        return {}
+
+    monkeypatch.setattr(ScrapJobs, 'DELAY_SCALE', 0)
+    monkeypatch.setattr(ScrapJobs, 'wait_for_element', wait_for_element)
+    monkeypatch.setattr(ScrapJobs, 'wait_for_listing_change', wait_for_listing_change)
+    monkeypatch.setattr(ScrapJobs, 'wait_for_listing_settled', lambda driver, listing_selector: None)
+    monkeypatch.setattr(ScrapJobs, 'get_listing_state', lambda driver, listing_selector: {})
+    monkeypatch.setattr(ScrapJobs, 'extract_cards_from_driver', lambda driver, extractor, only_new=False: driver.site.cards())
+
+    def make(pages, fail_on_page=None):
+        sites.append(FakeSite(pages, fail_on_page))
+        return sites[-1]
+    return make
+
+def test_load_partial_checkpoint(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    write_checkpoint(path, 'incremental', [
+        {'site': URL_SITE, 'page': 1, 'next_page': 2, 'jobs': [job("Acme", 1), job("Acme", 2)]},
+        {'site': URL_SITE, 'page': 2, 'next_page': 3, 'jobs': [job("Acme", 3)]},
+        {'site': DONE_SITE, 'page': 1, 'next_page': 2, 'jobs': []},
+        {'site': DONE_SITE, 'done': True},
+    ], truncated_line='{"site": "' + CLICK_SITE + '", "page": 1, "next_')
+
+    checkpoint = ScrapJobs.RunCheckpoint(str(path))
+    assert checkpoint.load()
+    assert checkpoint.crawl_mode == 'incremental'
+    assert checkpoint.resume_page(URL_SITE) == 3
+    assert [recovered['job_id'] for recovered in checkpoint.jobs_for(URL_SITE)] == [job("Acme", number)['job_id'] for number in (1, 2, 3)]
+    assert not checkpoint.is_site_done(URL_SITE)
+    assert checkpoint.is_site_done(DONE_SITE)
+    # La última línea, cortada a medio escribir, se ignora
+    assert checkpoint.resume_page(CLICK_SITE) is None
+    assert checkpoint.jobs_for(CLICK_SITE) == []
+
+def test_load_without_checkpoint(tmp_path):
+    assert not ScrapJobs.RunCheckpoint(str(tmp_path / 'missing.jsonl')).load()
+
+def test_resume_recovers_jobs_and_skips_done_sites(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    site_configs = {
+        URL_SITE: site_config("Acme", {"type": "url", "url_pattern": URL_SITE + "?page={page_num}", "max_pages": 5}),
+        DONE_SITE: site_config("Other", None),
+    }
+    job_index = ScrapJobs.JobIndex(str(tmp_path / 'index.db'))
+    # La ejecución interrumpida llegó a guardar el trabajo 1 en el índice
+    job_index.add_jobs([job("Acme", 1)])
+    path = tmp_path / 'checkpoint.jsonl'
+    write_checkpoint(path, 'incremental', [
+        {'site': URL_SITE, 'page': 1, 'next_page': 2, 'jobs': [job("Acme", 1), job("Acme", 2)]},
+        {'site': DONE_SITE, 'page': 1, 'next_page': 2, 'jobs': [job("Other", 7)]},
+        {'site': DONE_SITE, 'done': True},
+    ])
+    scraped = []
+
+    def scrape_site(browser, extractor, registry, incremental, site_metrics, checkpoint, emit, scheduler):
+        scraped.append((extractor.base_url, checkpoint.resume_page(extractor.base_url), incremental))
+        checkpoint.record_site_done(extractor.base_url)
+
+    monkeypatch.setattr(ScrapJobs, 'scrape_site', scrape_site)
+    checkpoint = ScrapJobs.RunCheckpoint(str(path))
+    jobs = list(ScrapJobs.iter_new_jobs(job_index, max_workers=1, checkpoint=checkpoint, resume=True, site_configs=site_configs))
+
+    assert [recovered['job_id'] for recovered in jobs] == [job("Acme", 2)['job_id'], job("Other", 7)['job_id']]
+    # Solo se retoma el sitio sin terminar, desde su página guardada y en el modo de la ejecución interrumpida
+    assert scraped == [(URL_SITE, 2, True)]
+    checkpoint.clear()
+    job_index.close()
+
+def test_url_site_resumes_from_saved_page(tmp_path, fake_site):
+    site = fake_site({1: [1, 2], 2: [3, 4], 3: [5, 6], 4: [7]})
+    config = site_config("Acme", {"type": "url", "url_pattern": URL_SITE + "?page={page_num}", "max_pages": 4})
+    path = tmp_path / 'checkpoint.jsonl'
+    write_checkpoint(path, 'full', [{'site': URL_SITE, 'page': 2, 'next_page': 3, 'jobs': []}])
+    checkpoint = ScrapJobs.RunCheckpoint(str(path))
+    checkpoint.load()
+    checkpoint.start('full', resume=True)
+
+    jobs = ScrapJobs.scrape_site(site, ScrapJobs.SiteExtractor(URL_SITE, config), ScrapJobs.JobIdRegistry(), checkpoint=checkpoint)
+    checkpoint.clear()
+
+    assert site.visited == [3, 4]
+    assert [new_job['Puesto'] for new_job in jobs] == [f"Clinical Research Associate {number}" for number in (5, 6, 7)]
+
+def test_click_site_skips_early_stop_until_resume_page(tmp_path, fake_site):
+    pages = {1: [1], 2: [2], 3: [3], 4: [4], 5: [5, 6], 6: [7]}
+    config = site_config("Acme", {"type": "click", "next_page_selector": "button.next", "max_pages": 6})
+    known_ids = [job("Acme", number, CLICK_SITE)['job_id'] for number in (1, 2, 3, 4)]
+
+    # Sin punto de control, dos páginas seguidas solo con trabajos conocidos detienen la paginación
+    site = fake_site(pages)
+    assert ScrapJobs.scrape_site(site, ScrapJobs.SiteExtractor(CLICK_SITE, config), ScrapJobs.JobIdRegistry(known_ids), incremental=True) == []
+    assert site.visited == [1, 2]
+
+    # Al retomar en la página 5, el clic vuelve a pasar por las páginas 1-4 sin parada temprana
+    path = tmp_path / 'checkpoint.jsonl'
+    write_checkpoint(path, 'incremental', [{'site': CLICK_SITE, 'page': 4, 'next_page': 5, 'jobs': []}])
+    checkpoint = ScrapJobs.RunCheckpoint(str(path))
+    checkpoint.load()
+    checkpoint.start('incremental', resume=True)
+    site = fake_site(pages)
+    jobs = ScrapJobs.scrape_site(site, ScrapJobs.SiteExtractor(CLICK_SITE, config), ScrapJobs.JobIdRegistry(known_ids),
+                                 incremental=True, checkpoint=checkpoint)
+    checkpoint.clear()
+
+    assert site.visited == [1, 2, 3, 4, 5, 6]
+    assert [new_job['Puesto'] for new_job in jobs] == [f"Clinical Research Associate {number}" for number in (5, 6, 7)]
+
+def test_failed_site_is_not_marked_done(tmp_path, fake_site):
+    site = fake_site({1: [1, 2], 2: [3], 3: [4]}, fail_on_page=2)
+    config = site_config("Acme", {"type": "url", "url_pattern": URL_SITE + "?page={page_num}", "max_pages": 3})
+    path = tmp_path / 'checkpoint.jsonl'
+    checkpoint = ScrapJobs.RunCheckpoint(str(path))
+    checkpoint.start('full')
+
+    ScrapJobs.scrape_site(site, ScrapJobs.SiteExtractor(URL_SITE, config), ScrapJobs.JobIdRegistry(), checkpoint=checkpoint)
+
+    # Cada línea se escribe con fsync: otra instancia la lee como la leería --resume tras un corte
+    reloaded = ScrapJobs.RunCheckpoint(str(path))
+    assert reloaded.load()
+    checkpoint.clear()
+    assert not reloaded.is_site_done(URL_SITE)
+    assert reloaded.resume_page(URL_SITE) == 2
+    assert len(reloaded.jobs_for(URL_SITE)) == 2
@@ -0,0 +1,106 @@
+"""
+Deduplicación con digests (JobIdSet) en cada modo de JOB_ID_DIGEST_BITS (64, 128 y 0 =
+cadenas), con y sin filtro de Bloom, y recálculo de la columna id_digest del índice
+cuando cambia el ancho. Un digest equivocado vuelve a agregar o descarta trabajos en silencio.
+
+    python -m pytest tests
+"""
+import hashlib
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ScrapJobs
+
+def make_job_ids(count, seed):
+    rng = random.Random(seed)
+    return [
+        ScrapJobs.generate_job_id(rng.choice(["IQVIA", "Parexel", "PSI CRO"]), f"Clinical Research Associate {rng.random()}",
+                                  f"https://jobs.example/{rng.getrandbits(64):x}")
+        for _ in range(count)
+    ]
+
+HISTORY = make_job_ids(3000, 1)
+UNSEEN = make_job_ids(3000, 2)
+
+def job(job_id):
+    return {'job_id': job_id, 'Empresa': "IQVIA", 'Puesto': "CRA", 'Link de Aplicación': job_id, 'Ubicacion': "Buenos Aires"}
+
+@pytest.mark.parametrize('bits', [64, 128])
+def test_job_id_digest_is_stable(bits):
+    # Los digests guardados en el índice solo se recalculan si cambia el ancho: la función no puede cambiar
+    assert ScrapJobs.job_id_digest("IQVIA::CRA II::https://x.com/1", bits) == \
+        hashlib.blake2b("IQVIA::CRA II::https://x.com/1".encode('utf-8'), digest_size=bits // 8).digest()
+    assert len(ScrapJobs.job_id_digest("a", bits)) == bits // 8
+
+@pytest.mark.parametrize('bloom_bits_per_id', [0, 10])
+@pytest.mark.parametrize('bits', [64, 128])
+def test_membership(bits, bloom_bits_per_id):
+    # Historial desordenado y con repetidos, como puede devolverlo el índice
+    digests = [ScrapJobs.job_id_digest(job_id, bits) for job_id in HISTORY + HISTORY[:100]]
+    random.Random(3).shuffle(digests)
+    job_id_set = ScrapJobs.JobIdSet(digests, bits=bits, bloom_bits_per_id=bloom_bits_per_id)
+
+    # El historial incluye digests que terminan en bytes nulos, que NumPy recorta al leer un elemento
+    assert any(digest.endswith(b'\x00') for digest in digests)
+    assert len(job_id_set) == len(HISTORY)
+    assert all(job_id in job_id_set for job_id in HISTORY)
+    assert not any(job_id in job_id_set for job_id in UNSEEN)
+
+    job_id_set.add(UNSEEN[0])
+    assert UNSEEN[0] in job_id_set
+    assert UNSEEN[1] not in job_id_set
+    assert len(job_id_set) == len(HISTORY) + 1
+
+@pytest.mark.parametrize('bits', [64, 128])
+def test_empty_history(bits):
+    job_id_set = ScrapJobs.JobIdSet(bits=bits, bloom_bits_per_id=10)
+    assert HISTORY[0] not in job_id_set
+    job_id_set.add(HISTORY[0])
+    assert HISTORY[0] in job_id_set
+
+@pytest.mark.parametrize('bits', [64, 128])
+def test_registry_with_digests(bits):
+    registry = ScrapJobs.JobIdRegistry(ScrapJobs.JobIdSet([ScrapJobs.job_id_digest(job_id, bits) for job_id in HISTORY], bits=bits))
+    assert not registry.add_if_new(HISTORY[5])
+    assert registry.add_if_new(UNSEEN[5])
+    assert not registry.add_if_new(UNSEEN[5])
+    assert registry.mark_seen_if_known(HISTORY[:10])
+    assert not registry.mark_seen_if_known([HISTORY[0], UNSEEN[6]])
+
+def test_strings_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(ScrapJobs, 'JOB_ID_DIGEST_BITS', 0)
+    job_index = ScrapJobs.JobIndex(str(tmp_path / 'index.db'))
+    job_index.add_jobs(job(job_id) for job_id in HISTORY)
+    registry = ScrapJobs.JobIdRegistry(job_index.load_job_ids())
+    job_index.close()
+
+    assert isinstance(registry.ids, set)
+    assert not registry.add_if_new(HISTORY[7])
+    assert registry.add_if_new(UNSEEN[7])
+
+@pytest.mark.parametrize('old_bits, new_bits', [(64, 128), (128, 64), (0, 64), (0, 128)])
+def test_index_rebuilds_digests_when_width_changes(tmp_path, monkeypatch, old_bits, new_bits):
+    path = str(tmp_path / 'index.db')
+    monkeypatch.setattr(ScrapJobs, 'JOB_ID_DIGEST_BITS', old_bits)
+    job_index = ScrapJobs.JobIndex(path)
+    job_index.add_jobs(job(job_id) for job_id in HISTORY)
+    job_index.close()
+
+    monkeypatch.setattr(ScrapJobs, 'JOB_ID_DIGEST_BITS', new_bits)
+    job_index = ScrapJobs.JobIndex(path)
+    job_index.add_jobs(job(job_id) for job_id in UNSEEN[:10]) # Ofertas agregadas ya con el nuevo ancho
+    digests = job_index.load_job_digests()
+    job_index.close()
+
+    # tolist() quitaría los bytes nulos del final de un digest: se comparan los bytes crudos
+    raw, width = digests.tobytes(), new_bits // 8
+    expected = [ScrapJobs.job_id_digest(job_id, new_bits) for job_id in HISTORY + UNSEEN[:10]]
+    assert sorted(raw[start:start + width] for start in range(0, len(raw), width)) == sorted(expected)
+    job_id_set = ScrapJobs.JobIdSet(digests, bits=new_bits)
+    assert all(job_id in job_id_set for job_id in HISTORY + UNSEEN[:10])
+    assert not any(job_id in job_id_set for job_id in UNSEEN[10:])
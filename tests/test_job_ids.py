@@ -0,0 +1,70 @@
+"""
+Equivalencia entre generate_job_ids (vectorizada) y generate_job_id (fila por fila):
+los IDs del historial tienen que coincidir byte a byte con los que genera el scraper.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ScrapJobs
+
+ID_COLUMNS = ['Empresa', 'Puesto', 'Link de Aplicación']
+
+def row_wise_ids(df):
+    """IDs de referencia: generate_job_id aplicado a cada fila (None si falta la columna)."""
+    return [
+        ScrapJobs.generate_job_id(*(row.get(column) for column in ID_COLUMNS))
+        for row in df.to_dict('records')
+    ]
+
+def assert_same_ids(df):
+    assert ScrapJobs.generate_job_ids(df).tolist() == row_wise_ids(df)
+
+def test_missing_values():
+    df = pd.DataFrame({
+        'Empresa': ['IQVIA', np.nan, None, pd.NA, ''],
+        'Puesto': [None, 'CRA II', pd.NA, np.nan, 'Data Manager'],
+        'Link de Aplicación': [pd.NA, None, 'https://x.com/1', '', np.nan],
+    }, dtype=object)
+    assert_same_ids(df)
+
+def test_numbers_and_float_columns():
+    df = pd.DataFrame({
+        'Empresa': [1, 2.5, 3, 0],
+        'Puesto': [10.0, np.nan, 7.25, -1.0], # Columna float con NaN
+        'Link de Aplicación': ['https://x.com/a', 42, 3.0, None],
+    })
+    assert df['Puesto'].dtype == float
+    assert_same_ids(df)
+
+def test_irregular_whitespace():
+    df = pd.DataFrame({
+        'Empresa': ['  ICON plc 2 ', 'Medpace\t', '\nSyneos   Health', ' PSI CRO'],
+        'Puesto': ['Clinical\n\nResearch  Associate', ' \t ', 'Site  Activation\r\nSpecialist', 'Trial Manager'],
+        'Link de Aplicación': [' https://x.com/a ', '/en/job/1 ', '\thttps://x.com/b', 'https://x.com/c\n'],
+    })
+    assert_same_ids(df)
+
+def test_missing_columns():
+    df = pd.DataFrame({'Puesto': ['CRA', None], 'Otra': [1, 2]})
+    assert_same_ids(df)
+
+def test_random_rows():
+    rng = random.Random(20240601)
+    pieces = ['IQVIA', 'CRA  II', ' Medpace ', '\tData\nManager', '/job/1', 'https://x.com/2', '', ' ', '\u00a0']
+    values = pieces + [None, np.nan, pd.NA, 0, 1.5, 7]
+
+    def value():
+        if rng.random() < 0.5:
+            return rng.choice(values)
+        return ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+
+    df = pd.DataFrame([{column: value() for column in ID_COLUMNS} for _ in range(3000)], dtype=object)
+    assert_same_ids(df)
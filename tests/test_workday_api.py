@@ -0,0 +1,96 @@
+"""
+scrape_workday_api contra el servidor de reproducción de los benchmarks: los filtros
+de la URL pública se envían como facets, la paginación avanza por offset y los enlaces
+(y con ellos los job_id) son los mismos que producía el scraping por clic en el navegador.
+
+    python -m pytest tests
+"""
+import io
+import json
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+import ScrapJobs
+import bench_scrapjobs
+
+IQVIA_URL = "https://iqvia.wd1.myworkdayjobs.com/en-US/IQVIA?locations=8a3f99567bc501f02cab6b679a01a0c3"
+
+class RecordingHandler(bench_scrapjobs.ReplayHandler):
+    """ReplayHandler que además guarda el cuerpo JSON de cada consulta a la API."""
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.payloads.append(json.loads(body))
+        self.rfile = io.BytesIO(body)
+        super().do_POST()
+
+@pytest.fixture
+def replay_server(monkeypatch):
+    monkeypatch.setattr(ScrapJobs, 'DELAY_SCALE', 0)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.fixtures = {bench_scrapjobs.site_slug(company): fixture for company, fixture in bench_scrapjobs.SITE_FIXTURES.items()}
+    server.requests = 0
+    server.payloads = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def replay_config(server, **pagination):
+    """Configuración de IQVIA WorkDay con la API apuntando al servidor de reproducción."""
+    config = ScrapJobs.SITE_CONFIGS[IQVIA_URL]
+    api_url = f"{server.url}/{bench_scrapjobs.site_slug(config['company_name'])}/wday/jobs"
+    return dict(config, pagination=dict(config["pagination"], api_url=api_url, **pagination))
+
+def fixture_postings(page_num):
+    return json.loads(bench_scrapjobs.render_fixture("workday.json", page_num, page_size=20))["jobPostings"]
+
+def test_facets_and_offset_pagination(replay_server):
+    jobs = ScrapJobs.scrape_workday_api(IQVIA_URL, replay_config(replay_server), ScrapJobs.JobIdRegistry())
+
+    assert [payload["appliedFacets"] for payload in replay_server.payloads] == [{"locations": ["8a3f99567bc501f02cab6b679a01a0c3"]}] * 5
+    assert [(payload["offset"], payload["limit"]) for payload in replay_server.payloads] == [(0, 20), (20, 20), (40, 20), (60, 20), (80, 20)]
+    # El servidor informa total = 100: no se pide una sexta página vacía
+    assert len(jobs) == 100
+    assert len({job['job_id'] for job in jobs}) == 100
+
+def test_links_and_job_ids_match_click_scraper(replay_server):
+    config = replay_config(replay_server)
+    jobs = ScrapJobs.scrape_workday_api(IQVIA_URL, config, ScrapJobs.JobIdRegistry())
+
+    postings = [posting for page_num in range(1, 6) for posting in fixture_postings(page_num)]
+    assert len(jobs) == len(postings)
+    for job, posting in zip(jobs, postings):
+        # La interfaz web enlaza cada oferta con href="/en-US/IQVIA<externalPath>", resuelto contra la URL del sitio
+        click_link = ScrapJobs.get_full_url(IQVIA_URL, "/en-US/IQVIA" + posting["externalPath"])
+        assert job['Link de Aplicación'] == click_link
+        assert job['Puesto'] == ScrapJobs.clean_text(posting["title"])
+        assert job['Ubicacion'] == ScrapJobs.clean_text(posting["locationsText"])
+        assert job['job_id'] == ScrapJobs.generate_job_id(config["company_name"], posting["title"], click_link)
+
+def test_link_base_override(replay_server):
+    link_base = f"{replay_server.url}/iqvia-workday"
+    config = replay_config(replay_server, link_base=link_base, max_pages=1)
+    jobs = ScrapJobs.scrape_workday_api(IQVIA_URL, config, ScrapJobs.JobIdRegistry())
+
+    assert len(replay_server.payloads) == 1
+    assert [job['Link de Aplicación'] for job in jobs] == [link_base + posting["externalPath"] for posting in fixture_postings(1)]
+
+def test_known_jobs_are_not_returned(replay_server):
+    config = replay_config(replay_server)
+    registry = ScrapJobs.JobIdRegistry()
+    first_run = ScrapJobs.scrape_workday_api(IQVIA_URL, config, registry)
+    replay_server.payloads.clear()
+
+    assert ScrapJobs.scrape_workday_api(IQVIA_URL, config, registry, incremental=True) == []
+    assert len(replay_server.payloads) == ScrapJobs.get_stop_after_known_pages(config)
+    assert len(first_run) == 100